@@ -3,8 +3,6 @@ import json
 import sys
 from langchain.agents import create_agent
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
-from coze_coding_utils.runtime_ctx.context import default_headers
 
 # 添加src目录到sys.path以便导入utils
 workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
@@ -13,6 +11,10 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 from utils.helper import graph_helper
+from storage.database.checkpointer import get_checkpointer
+from agents.history import ToolResultCompactionMiddleware
+from agents.tool_execution import ParallelToolCallMiddleware
+from agents.request_headers import RequestHeadersMiddleware
 
 # 导入工具
 from tools.web_search_tool import search_employment_market, get_employment_trend
@@ -44,18 +46,12 @@ from tools.recruitment_spider_51job import search_51job
 
 LLM_CONFIG = "config/agent_llm_config.json"
 
-in_memory_checkpointer = None
-
-# 开发环境默认使用内存记忆, 生产环境默认无记忆
-if graph_helper.is_dev_env():
-    in_memory_checkpointer = MemorySaver()
-
 def build_agent(ctx=None):
     """
     构建并返回就业指导Agent。
     
     Args:
-        ctx: 上下文对象
+        ctx: 上下文对象（保留参数）；agent 在请求间复用，请求头由 RequestHeadersMiddleware 按每次调用的上下文注入
         
     Returns:
         LangChain Agent实例
@@ -82,8 +78,7 @@ def build_agent(ctx=None):
             "thinking": {
                 "type": cfg['config'].get('thinking', 'disabled')
             }
-        },
-        default_headers=default_headers(ctx) if ctx else {}
+        }
     )
     
     # 准备工具列表
@@ -114,12 +109,16 @@ def build_agent(ctx=None):
     ]
     
     # 创建Agent
-    global in_memory_checkpointer
+    # 开发环境使用有界内存记忆, 生产环境使用 Postgres 持久化记忆
+    # 历史超出 token 预算时压缩较早轮次的大块工具结果，只保留文件路径等引用
+    # 同一轮的多个工具调用限流并发执行，并按工具超时
+    # agent 在请求间复用，logid 等请求头在每次调用模型时按运行时上下文注入
     agent = create_agent(
         model=llm,
         system_prompt=cfg.get("sp", ""),
         tools=tools,
-        checkpointer=in_memory_checkpointer
+        middleware=[RequestHeadersMiddleware(), ToolResultCompactionMiddleware(), ParallelToolCallMiddleware()],
+        checkpointer=get_checkpointer()
     )
     
     return agent
\ No newline at end of file
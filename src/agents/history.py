@@ -0,0 +1,153 @@
+"""
+会话历史压缩
+
+thread_id 即 session_id，长会话的消息列表会不断增长，read_local_jobs 的表格、简历全文、
+HTML 报告确认信息等大块工具输出会在之后每一轮都重新发给模型。
+ToolResultCompactionMiddleware 在调用模型前检查历史的 token 估算值，超出预算时把较早轮次的大块
+工具结果（以及上传文件的全文）替换为简短摘要，只保留文件路径、URL 等引用，使每轮输入 token 保持平稳。
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.runtime import Runtime
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "24000"))  # 超过该估算 token 数时开始压缩
+COMPACT_MIN_CHARS = 800  # 短于该长度的内容不压缩
+SUMMARY_PREVIEW_CHARS = 300  # 摘要保留的原文前缀长度
+MAX_REFERENCES = 10
+
+COMPACTED_MARKER = "[历史内容已压缩]"
+FILE_CONTENT_MARKER = "\n\nFile Content:\n"
+
+# 文件路径与 URL 引用，压缩后保留，模型可据此重新调用工具读取
+REFERENCE_RE = re.compile(
+    r"https?://[^\s`'\"()（）<>|]+"
+    r"|(?:/|assets/|tests/|config/)[^\s`'\"()（）<>|*，。；]+\.(?:png|jpe?g|html?|xlsx?|csv|md|pdf|docx?|pptx?|json|txt)"
+)
+
+
+def extract_references(text: str, limit: int = MAX_REFERENCES) -> List[str]:
+    """提取文本中的文件路径和 URL（去重并保持出现顺序）"""
+    refs = list(dict.fromkeys(m.group(0).rstrip(".,") for m in REFERENCE_RE.finditer(text)))
+    return refs[:limit]
+
+
+def _preview(text: str, limit: int = SUMMARY_PREVIEW_CHARS) -> str:
+    collapsed = " ".join(text.split())
+    return collapsed if len(collapsed) <= limit else collapsed[:limit] + "…"
+
+
+def compact_text(text: str, *, source: str) -> str:
+    """把大块文本替换为：来源 + 原始长度 + 前缀摘要 + 引用列表"""
+    lines = [
+        f"{COMPACTED_MARKER} 来源：{source}，原始长度 {len(text)} 字符",
+        f"摘要：{_preview(text)}",
+    ]
+    refs = extract_references(text)
+    if refs:
+        lines.append("引用：" + "，".join(refs))
+    lines.append("如需完整内容，请根据引用重新调用相应工具读取。")
+    return "\n".join(lines)
+
+
+def _message_text(message: AnyMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+def _compact_tool_message(message: ToolMessage) -> Optional[ToolMessage]:
+    text = _message_text(message)
+    if len(text) < COMPACT_MIN_CHARS or text.startswith(COMPACTED_MARKER):
+        return None
+    return ToolMessage(
+        content=compact_text(text, source=f"工具 {message.name or '未知'}"),
+        tool_call_id=message.tool_call_id,
+        name=message.name,
+        id=message.id,
+        status=message.status,
+    )
+
+
+def _compact_human_message(message: HumanMessage) -> Optional[HumanMessage]:
+    """只压缩上传文件的全文部分，用户输入的文字保留"""
+    if isinstance(message.content, str) or not message.content:
+        return None
+    changed = False
+    new_parts: List[Any] = []
+    for part in message.content:
+        text = part.get("text", "") if isinstance(part, dict) and part.get("type") == "text" else ""
+        idx = text.find(FILE_CONTENT_MARKER)
+        if idx >= 0 and len(text) - idx >= COMPACT_MIN_CHARS and COMPACTED_MARKER not in text:
+            header = text[:idx]
+            body = text[idx + len(FILE_CONTENT_MARKER):]
+            new_parts.append({"type": "text", "text": header + FILE_CONTENT_MARKER + compact_text(body, source="上传文件")})
+            changed = True
+        else:
+            new_parts.append(part)
+    if not changed:
+        return None
+    return HumanMessage(content=new_parts, id=message.id)
+
+
+def compact_history(messages: List[AnyMessage], *, token_budget: int = HISTORY_TOKEN_BUDGET) -> List[AnyMessage]:
+    """
+    返回需要替换的消息（与原消息 id 相同）。从最早的消息开始压缩，直到估算 token 数回到预算内；
+    当前轮（最后一条用户消息及其之后）的内容不压缩，保证本轮工具结果完整可用。
+    """
+    total = count_tokens_approximately(messages)
+    if total <= token_budget:
+        return []
+
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=len(messages))
+    replacements: List[AnyMessage] = []
+    for message in messages[:last_human]:
+        if total <= token_budget:
+            break
+        if message.id is None:
+            continue
+        if isinstance(message, ToolMessage):
+            compacted = _compact_tool_message(message)
+        elif isinstance(message, HumanMessage):
+            compacted = _compact_human_message(message)
+        else:
+            compacted = None
+        if compacted is None:
+            continue
+        total -= count_tokens_approximately([message]) - count_tokens_approximately([compacted])
+        replacements.append(compacted)
+    return replacements
+
+
+class ToolResultCompactionMiddleware(AgentMiddleware):
+    """调用模型前压缩较早轮次的大块工具结果；替换写回状态，checkpoint 中的历史同步变小"""
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET):
+        super().__init__()
+        self.token_budget = token_budget
+
+    def before_model(self, state: AgentState, runtime: Runtime) -> Optional[Dict[str, Any]]:
+        replacements = compact_history(state["messages"], token_budget=self.token_budget)
+        if not replacements:
+            return None
+        logger.info(f"Compacted {len(replacements)} history messages to fit token budget {self.token_budget}")
+        # add_messages 按 id 覆盖原消息
+        return {"messages": replacements}
+
+    async def abefore_model(self, state: AgentState, runtime: Runtime) -> Optional[Dict[str, Any]]:
+        return self.before_model(state, runtime)
@@ -0,0 +1,47 @@
+"""
+按请求注入模型调用的请求头
+
+agent 在进程内只构建一次并在请求间复用（graph_helper.get_agent_instance），logid、泳道环境等与单次请求相关的
+请求头不能在构建时写进 ChatOpenAI 的 default_headers。RequestHeadersMiddleware 在每次调用模型前，
+从运行时上下文（graph.stream / ainvoke 传入的 context=ctx）生成请求头，作为 extra_headers 随本次调用发送。
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+from coze_coding_utils.runtime_ctx.context import Context, default_headers
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ModelRequest, ModelResponse
+
+
+def request_headers(request: ModelRequest) -> Dict[str, str]:
+    """当前请求的上下文对应的请求头；没有上下文（如直接 invoke）时为空"""
+    runtime = request.runtime
+    ctx = getattr(runtime, "context", None) if runtime is not None else None
+    return default_headers(ctx) if isinstance(ctx, Context) else {}
+
+
+class RequestHeadersMiddleware(AgentMiddleware):
+    """把运行时上下文生成的请求头合并进本次模型调用的 extra_headers"""
+
+    @staticmethod
+    def _with_headers(request: ModelRequest) -> ModelRequest:
+        headers = request_headers(request)
+        if not headers:
+            return request
+        settings = dict(request.model_settings)
+        settings["extra_headers"] = {**(settings.get("extra_headers") or {}), **headers}
+        return request.override(model_settings=settings)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> Any:
+        return handler(self._with_headers(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> Any:
+        return await handler(self._with_headers(request))
@@ -0,0 +1,178 @@
+"""
+并行工具调用
+
+模型在一轮中同时发起多个工具调用（如薪资图、技能图、词云）时，create_agent 会把每个调用作为独立的
+tools 任务（Send）并发执行，每个任务结束即把 ToolMessage 推送到 messages 流。
+ParallelToolCallMiddleware 包装每个工具调用：
+
+- 限制同一轮（同一会话的同一 superstep）内同时执行的工具数（TOOL_MAX_PARALLELISM），
+  避免多个爬虫/绘图工具同时占满 CPU 和外部连接
+- 按工具设置超时，超时返回 error 状态的 ToolMessage，卡住的工具不会拖住整轮结果和下一次模型调用；
+  超时的工具在后台继续运行，结束前仍占用本轮的名额
+- 同步工具在进程内共享的有界线程池（TOOL_EXECUTOR_WORKERS）中执行，超时后仍在运行的工具跨轮次、
+  跨会话计入同一上限，不会无限制地堆积线程
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Awaitable, Dict, Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt.tool_node import ToolCallRequest
+from langgraph.types import Command
+
+logger = logging.getLogger(__name__)
+
+TOOL_MAX_PARALLELISM = int(os.getenv("TOOL_MAX_PARALLELISM", "4"))  # 同一轮最多并发执行的工具数
+TOOL_EXECUTOR_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", "16"))  # 进程内同时执行的同步工具上限（含超时仍在运行的）
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "180"))
+# 单独设置超时的工具（秒），可用 TOOL_TIMEOUTS='{"search_51job": 600}' 覆盖
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "search_51job": 300,
+    "generate_multi_chart_report": 240,
+    "generate_html_report": 240,
+    **json.loads(os.getenv("TOOL_TIMEOUTS", "{}")),
+}
+
+
+def _timeout_message(request: ToolCallRequest, timeout: float) -> ToolMessage:
+    name = request.tool_call["name"]
+    return ToolMessage(
+        content=f"❌ 工具 {name} 执行超时（超过 {timeout:g} 秒），请缩小查询范围后重试或改用其他工具。",
+        tool_call_id=request.tool_call["id"],
+        name=name,
+        status="error",
+    )
+
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    """同步工具共用的线程池，首次使用时创建并复用"""
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(max_workers=max(1, TOOL_EXECUTOR_WORKERS), thread_name_prefix="tool")
+    return _tool_executor
+
+
+class _TurnLimiter:
+    """按轮次分配信号量，同一轮内限流，不同会话互不影响；该轮的调用全部结束后释放"""
+
+    def __init__(self, limit: int, factory: Callable[[int], Any] = threading.Semaphore):
+        self.limit = max(1, limit)
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._slots: Dict[str, list] = {}  # key -> [信号量, 引用计数]
+
+    def checkout(self, key: str):
+        with self._lock:
+            slot = self._slots.setdefault(key, [self._factory(self.limit), 0])
+            slot[1] += 1
+            return slot[0]
+
+    def checkin(self, key: str) -> None:
+        with self._lock:
+            slot = self._slots[key]
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._slots[key]
+
+
+class ParallelToolCallMiddleware(AgentMiddleware):
+    """限制同一轮的并发工具数，并按工具超时"""
+
+    def __init__(
+        self,
+        max_parallelism: int = TOOL_MAX_PARALLELISM,
+        *,
+        default_timeout: float = DEFAULT_TOOL_TIMEOUT,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__()
+        self.default_timeout = default_timeout
+        self.timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+        self._limiter = _TurnLimiter(max_parallelism)
+        self._async_limiter = _TurnLimiter(max_parallelism, asyncio.Semaphore)
+
+    def _timeout_for(self, name: str) -> float:
+        return float(self.timeouts.get(name, self.default_timeout))
+
+    @staticmethod
+    def _turn_key(request: ToolCallRequest) -> str:
+        """同一轮的工具调用是同一 superstep 中的多个 tools 任务"""
+        config = (request.runtime.config if request.runtime else None) or {}
+        thread_id = (config.get("configurable") or {}).get("thread_id", "")
+        step = (config.get("metadata") or {}).get("langgraph_step", "")
+        return f"{thread_id}:{step}"
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        name = request.tool_call["name"]
+        timeout = self._timeout_for(name)
+        key = self._turn_key(request)
+        semaphore = self._limiter.checkout(key)
+        semaphore.acquire()
+        # 在共享线程池中执行以便超时返回；超时后工具继续运行至结束，结果丢弃
+        ctx = contextvars.copy_context()
+
+        def _release() -> None:
+            semaphore.release()
+            self._limiter.checkin(key)
+
+        def _run():
+            try:
+                return ctx.run(handler, request)
+            finally:
+                # 名额由执行线程在工具真正结束时归还：超时的工具仍在运行，继续占用名额
+                _release()
+
+        try:
+            future = _get_tool_executor().submit(_run)
+        except BaseException:
+            _release()
+            raise
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            logger.error(f"Tool {name} timed out after {timeout}s")
+            return _timeout_message(request, timeout)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        name = request.tool_call["name"]
+        timeout = self._timeout_for(name)
+        key = self._turn_key(request)
+        semaphore = self._async_limiter.checkout(key)
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._async_limiter.checkin(key)
+            raise
+
+        def _release(_task=None) -> None:
+            semaphore.release()
+            self._async_limiter.checkin(key)
+
+        # 超时后不取消：同步工具在线程池中执行，取消协程并不能停止线程；任务结束时再归还名额
+        task = asyncio.ensure_future(handler(request))
+        task.add_done_callback(_release)
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            logger.error(f"Tool {name} timed out after {timeout}s")
+            return _timeout_message(request, timeout)
+        return task.result()
@@ -6,9 +6,11 @@ import logging
 from typing import Any, Dict, Iterable, AsyncIterable, AsyncGenerator, Optional
 import threading
 import contextvars
+from contextlib import asynccontextmanager
 import cozeloop
 import uvicorn
 import time
+import uuid
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -40,9 +42,20 @@ from utils.helper.agent_helper import (
     to_client_message,
     agent_iter_server_messages,
 )
+from utils.messages.sse import SSEEncoder, CoalesceOptions, encode_sse_event, coalesce_answers, resolve_coalesce_options
 from utils.log.parser import LangGraphParser
+from storage.database.db import check_db_health, dispose_async_engine, get_pool_metrics
+from storage.database.checkpointer import get_checkpointer, postgres_backend_enabled
+from tools.tool_cache import get_tool_cache_metrics
 from utils.log.err_trace import extract_core_stack
 from utils.log.loop_trace import init_run_config, init_agent_config
+from utils.helper.warmup_helper import (
+    WARMUP_ENABLED,
+    WARMUP_SYNTHETIC_PROMPT,
+    mark_ready,
+    run_warmup,
+    warmup_state,
+)
 
 
 # 超时配置常量
@@ -66,7 +79,7 @@ class GraphService:
     
     @staticmethod
     def _sse_event(data: Any) -> str:
-        return f"event: message\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+        return encode_sse_event(data)
 
     # 流式运行（原始迭代器）：本地调用使用
     def stream(self, payload: Dict[str, Any], run_config: RunnableConfig, ctx=Context) -> Iterable[Any]:
@@ -123,7 +136,9 @@ class GraphService:
             self.running_tasks.pop(run_id, None)
 
     # 流式运行（SSE 格式化）：HTTP 路由使用
-    async def stream_sse(self, payload: Dict[str, Any], ctx=None) -> AsyncGenerator[str, None]:
+    async def stream_sse(
+        self, payload: Dict[str, Any], ctx=None, coalesce: Optional[CoalesceOptions] = None
+    ) -> AsyncGenerator[str, None]:
         if ctx is None:
             ctx = new_context(method="stream_sse")
 
@@ -135,9 +150,15 @@ class GraphService:
         else:
             run_config = init_run_config(graph, ctx)  # vibeflow
 
+        # 每次回复一个编码器，answer token 只序列化增量部分
+        encoder = SSEEncoder()
+        chunks = self.astream(payload, graph, run_config=run_config, ctx=ctx)
+        if coalesce is not None:
+            # 合帧模式：连续的 answer token 按时间/字节数合并为一帧
+            chunks = coalesce_answers(chunks, coalesce)
         try:
-            async for chunk in self.astream(payload, graph, run_config=run_config, ctx=ctx):
-                yield self._sse_event(chunk)
+            async for chunk in chunks:
+                yield encoder.encode(chunk)
         finally:
             # 清理任务记录
             self.running_tasks.pop(run_id, None)
@@ -250,7 +271,8 @@ class GraphService:
                         )
                         loop.call_soon_threadsafe(q.put_nowait, timeout_msg)
                         return
-                    loop.call_soon_threadsafe(q.put_nowait, sm.dict())
+                    # 直接传递 ServerMessage，由 stream_sse 的编码器序列化，避免逐 token asdict
+                    loop.call_soon_threadsafe(q.put_nowait, sm)
                     last_seq = sm.sequence_id
             except Exception as ex:
                 # 异常作为结束事件推送
@@ -276,7 +298,62 @@ class GraphService:
 
 
 service = GraphService()
-app = FastAPI()
+
+
+def _warmup_synthetic_request() -> None:
+    """以 WARMUP_SYNTHETIC_PROMPT 完整跑一次请求（模型调用、工具链路、cozeloop 上报）；使用一次性会话，结束后删除"""
+    session_id = f"warmup-{uuid.uuid4().hex}"
+    payload = {
+        "type": "query",
+        "session_id": session_id,
+        "content": {"query": {"prompt": [{"type": "text", "content": {"text": WARMUP_SYNTHETIC_PROMPT}}]}},
+    }
+    ctx = new_context(method="warmup")
+    run_config = init_agent_config(service._get_graph(ctx), ctx)
+    try:
+        for _ in service.stream(payload, run_config=run_config, ctx=ctx):
+            pass
+    finally:
+        cozeloop.flush()
+        checkpointer = get_checkpointer()
+        if checkpointer is not None:
+            checkpointer.delete_thread(session_id)
+
+
+async def _startup_db_check() -> None:
+    """启动时的数据库健康检查（异步引擎，退避重试不阻塞事件循环）；失败只记录日志"""
+    try:
+        await check_db_health()
+    except Exception as e:
+        logger.error(f"Database health check failed at startup: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 预热在后台线程执行，不阻塞端口监听；完成前 /ready 返回 503
+    loop = asyncio.get_running_loop()
+    warmup_task = None
+    db_check_task = None
+    if WARMUP_ENABLED:
+        extra_steps = {}
+        if postgres_backend_enabled():
+            # 健康检查在主事件循环中执行（异步引擎与其绑定），数据库不可用时 /ready 返回 503
+            extra_steps["database"] = lambda: asyncio.run_coroutine_threadsafe(check_db_health(), loop).result()
+        if WARMUP_SYNTHETIC_PROMPT and graph_helper.is_agent_proj():
+            extra_steps["synthetic_request"] = _warmup_synthetic_request
+        warmup_task = loop.run_in_executor(None, lambda: run_warmup(extra_steps=extra_steps))
+    else:
+        mark_ready()
+        if postgres_backend_enabled():
+            db_check_task = asyncio.create_task(_startup_db_check())
+    yield
+    for task in (warmup_task, db_check_task):
+        if task is not None and not task.done():
+            task.cancel()
+    await dispose_async_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 添加静态文件服务
 app.mount("/static", StaticFiles(directory="web"), name="static")
@@ -377,6 +454,9 @@ async def http_stream_run(request: Request):
         logger.error(f"JSON decode error in http_stream_run: {e}, traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON format:{extract_core_stack()}")
 
+    # 可选合帧：?coalesce_ms=30&coalesce_bytes=2048，或通过 STREAM_COALESCE_MS 全局开启
+    coalesce = resolve_coalesce_options(request.query_params)
+
     # 包装stream_sse为可取消的任务
     async def cancellable_stream():
         # 将真正的流式任务登记到 running_tasks，确保 /cancel 能定位到它
@@ -386,7 +466,7 @@ async def http_stream_run(request: Request):
             logger.info(f"Registered streaming task for run_id: {run_id}")
 
         try:
-            async for chunk in service.stream_sse(payload, ctx):
+            async for chunk in service.stream_sse(payload, ctx, coalesce=coalesce):
                 yield chunk
         except asyncio.CancelledError:
             logger.info(f"Stream cancelled for run_id: {run_id}")
@@ -457,11 +537,21 @@ async def health_check():
         return {
             "status": "ok",
             "message": "Service is running",
+            # 仅包含已创建的连接池，不会触发数据库连接
+            "db_pool": get_pool_metrics(),
+            "tool_cache": get_tool_cache_metrics(),
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=str(e))
 
 
+@app.get("/ready")
+async def readiness_check():
+    """就绪检查：预热完成前返回 503，负载均衡据此只向已预热的实例转发流量"""
+    snapshot = warmup_state.snapshot()
+    return JSONResponse(status_code=200 if warmup_state.ready else 503, content=snapshot)
+
+
 @app.get(path="/graph_parameter")
 async def http_graph_inout_parameter(request: Request):
     return service.graph_inout_schema()
@@ -0,0 +1,276 @@
+"""
+LangGraph 会话记忆（checkpointer）
+
+- 生产环境：基于 PGDATABASE_URL 的 PostgresSaver，连接池 + pipeline 批量写入，
+  大对象 zstd 压缩，后台按 TTL 清理长期不活跃的会话；
+  PostgresSaver 只实现同步接口，异步接口（/run 的 ainvoke）在线程池中调用同步实现，两条路径共用一个连接池
+- 开发环境：按会话数 LRU 淘汰的内存版 BoundedMemorySaver，避免长时间运行的 dev server 内存无限增长
+"""
+
+import os
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import zstandard
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from sqlalchemy.engine.url import make_url
+
+from storage.database.db import get_db_url, get_pool_budget
+from utils.helper import graph_helper
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_HOURS", "72")) * 3600  # 会话最后活跃后的保留时长
+CHECKPOINT_PRUNE_INTERVAL = int(os.getenv("CHECKPOINT_PRUNE_INTERVAL", "3600"))  # 清理任务执行间隔（秒）
+CHECKPOINT_PRUNE_BATCH = 500  # 每批删除的会话数
+MEMORY_CHECKPOINT_MAX_THREADS = int(os.getenv("MEMORY_CHECKPOINT_MAX_THREADS", "200"))  # 内存版最多保留的会话数
+CHECKPOINT_POOL_MIN_SIZE = 2  # 常驻连接数（不超过预留的连接数）
+COMPRESS_THRESHOLD = 1024  # 序列化结果超过该大小才压缩
+COMPRESS_SUFFIX = "+zstd"
+
+# 最后活跃时间早于 TTL 的会话；checkpoint 中的 ts 为 ISO 时间
+SELECT_EXPIRED_THREADS_SQL = """
+select thread_id from checkpoints
+group by thread_id
+having max((checkpoint ->> 'ts')::timestamptz) < now() - make_interval(secs => %s)
+limit %s
+"""
+DELETE_THREADS_SQLS = (
+    "delete from checkpoint_writes where thread_id = any(%s)",
+    "delete from checkpoint_blobs where thread_id = any(%s)",
+    "delete from checkpoints where thread_id = any(%s)",
+)
+
+
+class CompressedSerializer(SerializerProtocol):
+    """在默认序列化结果之上做 zstd 压缩，类型标记追加 +zstd；消息历史等大对象体积可明显缩小"""
+
+    def __init__(self, inner: Optional[SerializerProtocol] = None, *, threshold: int = COMPRESS_THRESHOLD, level: int = 3):
+        self.inner = inner or JsonPlusSerializer()
+        self.threshold = threshold
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.threshold:
+            return type_, data
+        return type_ + COMPRESS_SUFFIX, zstandard.compress(data, self.level)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(COMPRESS_SUFFIX):
+            type_ = type_[:-len(COMPRESS_SUFFIX)]
+            payload = zstandard.decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """按会话（thread_id）LRU 淘汰的内存 checkpointer"""
+
+    def __init__(self, *, max_threads: int = MEMORY_CHECKPOINT_MAX_THREADS, serde: Optional[SerializerProtocol] = None):
+        super().__init__(serde=serde)
+        self.max_threads = max(1, max_threads)
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+
+    def _touch(self, config: RunnableConfig) -> None:
+        thread_id = (config.get("configurable") or {}).get("thread_id")
+        if thread_id is None:
+            return
+        evicted: List[str] = []
+        with self._lru_lock:
+            self._lru[thread_id] = None
+            self._lru.move_to_end(thread_id)
+            while len(self._lru) > self.max_threads:
+                evicted.append(self._lru.popitem(last=False)[0])
+        for old_thread_id in evicted:
+            self.delete_thread(old_thread_id)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self._touch(config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._touch(config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+class ThreadedAsyncMixin:
+    """为只实现同步接口的 checkpointer 补齐异步接口：在默认线程池中调用对应的同步方法，不阻塞事件循环"""
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+@lru_cache(maxsize=None)
+def postgres_saver_class() -> type:
+    """生产环境使用的 checkpointer 类型：PostgresSaver + 线程池异步接口（首次调用时才导入 psycopg）"""
+    from langgraph.checkpoint.postgres import PostgresSaver
+
+    class ThreadedPostgresSaver(ThreadedAsyncMixin, PostgresSaver):
+        pass
+
+    return ThreadedPostgresSaver
+
+
+def _to_conninfo(url: str) -> str:
+    """SQLAlchemy 风格连接串（postgresql+psycopg2://）转换为 libpq 连接串"""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def prune_expired_threads(pool, *, ttl_seconds: int = CHECKPOINT_TTL_SECONDS, batch_size: int = CHECKPOINT_PRUNE_BATCH) -> int:
+    """删除最后活跃时间早于 TTL 的会话，按批删除，返回删除的会话数"""
+    total = 0
+    while True:
+        with pool.connection() as conn:
+            with conn.transaction():
+                rows = conn.execute(SELECT_EXPIRED_THREADS_SQL, (ttl_seconds, batch_size)).fetchall()
+                thread_ids = [row["thread_id"] if isinstance(row, dict) else row[0] for row in rows]
+                if not thread_ids:
+                    return total
+                for sql in DELETE_THREADS_SQLS:
+                    conn.execute(sql, (thread_ids,))
+        total += len(thread_ids)
+        logger.info(f"Pruned {len(thread_ids)} expired checkpoint threads (total: {total})")
+
+
+def _start_pruner(pool, interval: int) -> threading.Event:
+    """后台线程定期清理过期会话，返回用于停止的 Event"""
+    stop = threading.Event()
+
+    def _loop():
+        while not stop.wait(interval):
+            try:
+                prune_expired_threads(pool)
+            except Exception as e:
+                logger.error(f"Error pruning expired checkpoints: {e}")
+
+    threading.Thread(target=_loop, name="checkpoint-pruner", daemon=True).start()
+    return stop
+
+
+def _create_postgres_checkpointer() -> BaseCheckpointSaver:
+    from psycopg.rows import dict_row
+    from psycopg_pool import ConnectionPool
+
+    url = get_db_url()
+    if not url:
+        raise ValueError("PGDATABASE_URL is not set")
+    # 连接数取自进程的连接预算中为 checkpointer 预留的部分（CHECKPOINT_POOL_SIZE），不在引擎连接池之外另算
+    max_size = get_pool_budget()["checkpoint"]
+    pool = ConnectionPool(
+        conninfo=_to_conninfo(url),
+        min_size=min(CHECKPOINT_POOL_MIN_SIZE, max_size),
+        max_size=max_size,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=True,
+    )
+    # PostgresSaver 在每次 put/put_writes 内用 pipeline + executemany 批量写入 blobs 与 writes
+    saver = postgres_saver_class()(pool, serde=CompressedSerializer())
+    saver.setup()
+    if CHECKPOINT_PRUNE_INTERVAL > 0:
+        _start_pruner(pool, CHECKPOINT_PRUNE_INTERVAL)
+    return saver
+
+
+def postgres_backend_enabled() -> bool:
+    """生产环境且 CHECKPOINT_BACKEND=postgres（默认）时会话记忆依赖 PostgreSQL"""
+    return not graph_helper.is_dev_env() and os.getenv("CHECKPOINT_BACKEND", "postgres") == "postgres"
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_checkpointer_ready = False
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    返回进程内共享的 checkpointer
+    - 开发环境：BoundedMemorySaver
+    - 生产环境：PostgresSaver；CHECKPOINT_BACKEND=none 或数据库不可用时退回无记忆（None）
+    """
+    global _checkpointer, _checkpointer_ready
+    if _checkpointer_ready:
+        return _checkpointer
+    with _checkpointer_lock:
+        if not _checkpointer_ready:
+            if graph_helper.is_dev_env():
+                _checkpointer = BoundedMemorySaver(serde=CompressedSerializer())
+            elif postgres_backend_enabled():
+                try:
+                    _checkpointer = _create_postgres_checkpointer()
+                except Exception as e:
+                    logger.error(f"Error creating postgres checkpointer, running without memory: {e}")
+                    _checkpointer = None
+            _checkpointer_ready = True
+    return _checkpointer
+
+
+__all__ = [
+    "CompressedSerializer",
+    "BoundedMemorySaver",
+    "ThreadedAsyncMixin",
+    "postgres_saver_class",
+    "prune_expired_threads",
+    "postgres_backend_enabled",
+    "get_checkpointer",
+]
@@ -1,12 +1,22 @@
 import os
 import time
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import logging
 logger = logging.getLogger(__name__)
 
 MAX_RETRY_TIME = 20  # 连接最大重试时间（秒）
+POOL_RECYCLE = 1800  # 连接回收时间（秒）
+POOL_TIMEOUT = 30  # 获取连接的最大等待时间（秒）
 # Load environment variables from .env if present
 try:
     from dotenv import load_dotenv
@@ -37,28 +47,137 @@ def get_db_url() -> str:
     return url
 _engine = None
 _SessionLocal = None
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+# asyncio.Lock 绑定创建时所在的事件循环，按 loop 分别创建
+_async_engine_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+_async_engine_locks_guard = threading.Lock()
+
+
+def get_pool_budget() -> Dict[str, int]:
+    """
+    按 worker 数切分整个部署的连接预算，再分给进程内的各个连接池，返回各池的连接上限
+    - DB_MAX_CONNECTIONS: 所有 worker 共享的连接上限（默认 100）
+    - WEB_CONCURRENCY: 进程数（默认 1）
+    - CHECKPOINT_POOL_SIZE: 会话记忆（psycopg 连接池）预留的连接数（默认每进程预算的 1/4）
+    每个进程可用 budget // workers 个连接：先为 checkpointer 预留，其余由同步、异步引擎平分，
+    各池之和不超过每进程预算
+    """
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    budget = max(3, int(os.getenv("DB_MAX_CONNECTIONS", "100")))
+    per_worker = max(3, budget // workers)  # 三个池各至少一个连接
+    checkpoint = int(os.getenv("CHECKPOINT_POOL_SIZE", str(per_worker // 4)))
+    checkpoint = min(max(1, checkpoint), per_worker - 2)
+    engines = per_worker - checkpoint
+    return {
+        "per_worker": per_worker,
+        "checkpoint": checkpoint,
+        "sync": engines // 2,
+        "async": engines - engines // 2,
+    }
+
+
+def get_pool_sizing(engine: str = "sync") -> Tuple[int, int]:
+    """引擎连接池（engine 为 "sync" 或 "async"）的 (pool_size, max_overflow)：一半常驻、一半作为溢出"""
+    total = get_pool_budget()[engine]
+    pool_size = max(1, total // 2)
+    return pool_size, total - pool_size
+
+
+class _PoolWaitStats:
+    """记录连接池 checkout 等待时间"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += elapsed
+            if elapsed > self.wait_max:
+                self.wait_max = elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.wait_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(avg * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _TimedQueuePool(QueuePool):
+    """记录 checkout 等待时间的 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = _PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class _TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """记录 checkout 等待时间的 AsyncAdaptedQueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = _PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+def _pool_kwargs(url: str, pool_class, engine: str = "sync") -> Dict[str, Any]:
+    """连接池参数（按 engine 对应的预算）；SQLite 内存库使用单连接池，不做池化配置"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    size, overflow = get_pool_sizing(engine)
+    return {
+        "poolclass": pool_class,
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_timeout": POOL_TIMEOUT,
+    }
+
+
+def _to_async_url(url: str) -> str:
+    """将同步连接串转换为异步驱动：PostgreSQL 使用 psycopg(v3) 异步模式，SQLite 使用 aiosqlite"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql" and parsed.get_driver_name() in ("psycopg2", "psycopg", ""):
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    elif backend == "sqlite" and parsed.get_driver_name() != "aiosqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
 
 def _create_engine_with_retry():
     url = get_db_url()
     if url is None or url == "":
         logger.error("PGDATABASE_URL is not set")
         raise ValueError("PGDATABASE_URL is not set")
-    size = 100
-    overflow = 100
-    recycle = 1800
-    timeout = 30
-    engine = create_engine(
-        url,
-        pool_size=size,
-        max_overflow=overflow,
-        pool_pre_ping=True,
-        pool_recycle=recycle,
-        pool_timeout=timeout,
-    )
-    # 验证连接，带重试
+    engine = create_engine(url, **_pool_kwargs(url, _TimedQueuePool))
+    # 验证连接，带重试；在事件循环线程中调用时只尝试一次，time.sleep 重试会阻塞整个事件循环
+    max_retry_time = 0 if _in_event_loop() else MAX_RETRY_TIME
     start_time = time.time()
     last_error = None
-    while time.time() - start_time < MAX_RETRY_TIME:
+    while True:
         try:
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
@@ -66,11 +185,22 @@ def _create_engine_with_retry():
         except OperationalError as e:
             last_error = e
             elapsed = time.time() - start_time
+            if elapsed >= max_retry_time:
+                break
             logger.warning(f"Database connection failed, retrying... (elapsed: {elapsed:.1f}s)")
-            time.sleep(min(1, MAX_RETRY_TIME - elapsed))
-    logger.error(f"Database connection failed after {MAX_RETRY_TIME}s: {last_error}")
+            time.sleep(min(1, max_retry_time - elapsed))
+    logger.error(f"Database connection failed after {max_retry_time}s: {last_error}")
     raise last_error
 
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
 def get_engine():
     global _engine
     if _engine is None:
@@ -86,9 +216,112 @@ def get_sessionmaker():
 def get_session():
     return get_sessionmaker()()
 
+
+async def check_db_health(engine: Optional[AsyncEngine] = None, *, max_retry_time: float = MAX_RETRY_TIME) -> bool:
+    """异步健康检查：执行 SELECT 1，失败时以 asyncio.sleep 退避重试，不阻塞事件循环"""
+    engine = engine or await get_async_engine(check=False)
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    last_error = None
+    while loop.time() - start_time < max_retry_time:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return True
+        except OperationalError as e:
+            last_error = e
+            elapsed = loop.time() - start_time
+            logger.warning(f"Database connection failed, retrying... (elapsed: {elapsed:.1f}s)")
+            await asyncio.sleep(max(0.0, min(1, max_retry_time - elapsed)))
+    logger.error(f"Database connection failed after {max_retry_time}s: {last_error}")
+    if last_error is not None:
+        raise last_error
+    return False
+
+
+def _get_async_engine_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    with _async_engine_locks_guard:
+        lock = _async_engine_locks.get(loop)
+        if lock is None:
+            lock = _async_engine_locks[loop] = asyncio.Lock()
+        return lock
+
+
+async def get_async_engine(*, check: bool = True) -> AsyncEngine:
+    """获取进程内共享的异步引擎；首次创建时（check=True）执行非阻塞健康检查"""
+    global _async_engine
+    if _async_engine is not None:
+        return _async_engine
+    async with _get_async_engine_lock():
+        if _async_engine is None:
+            url = get_db_url()
+            if url is None or url == "":
+                logger.error("PGDATABASE_URL is not set")
+                raise ValueError("PGDATABASE_URL is not set")
+            async_url = _to_async_url(url)
+            engine = create_async_engine(async_url, **_pool_kwargs(async_url, _TimedAsyncAdaptedQueuePool, "async"))
+            if check:
+                await check_db_health(engine)
+            _async_engine = engine
+    return _async_engine
+
+
+async def get_async_sessionmaker() -> async_sessionmaker:
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(bind=await get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+
+async def get_async_session() -> AsyncSession:
+    """返回新的 AsyncSession，调用方负责关闭（推荐 async with）"""
+    return (await get_async_sessionmaker())()
+
+
+def _engine_pool_metrics(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    metrics: Dict[str, Any] = {"pool": pool.__class__.__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            metrics[name] = fn()
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        metrics.update(wait_stats.snapshot())
+    return metrics
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """返回已创建引擎的连接池指标（checked-out / overflow / 等待时间），不会触发引擎创建"""
+    metrics: Dict[str, Any] = {}
+    if _engine is not None:
+        metrics["sync"] = _engine_pool_metrics(_engine)
+    if _async_engine is not None:
+        metrics["async"] = _engine_pool_metrics(_async_engine.sync_engine)
+    return metrics
+
+
+async def dispose_async_engine() -> None:
+    """关闭异步引擎及连接池（进程退出时调用）"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
 __all__ = [
     "get_db_url",
     "get_engine",
     "get_sessionmaker",
     "get_session",
+    "get_pool_budget",
+    "get_pool_sizing",
+    "get_pool_metrics",
+    "check_db_health",
+    "get_async_engine",
+    "get_async_sessionmaker",
+    "get_async_session",
+    "dispose_async_engine",
 ]
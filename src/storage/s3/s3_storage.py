@@ -1,10 +1,18 @@
 import os
 import re
+import json
+import time
+import base64
+import io
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Optional, Any, Dict, List, TypedDict, Iterable
+from typing import Optional, Any, Dict, List, TypedDict, Iterable, Iterator, Callable
 from uuid import uuid4
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from boto3.s3.transfer import TransferConfig
 import logging
@@ -13,6 +21,15 @@ logger = logging.getLogger(__name__)
 # 允许的文件名字符集（面向用户输入的约束）
 FILE_NAME_ALLOWED_RE = re.compile(r"^[A-Za-z0-9._\-/]+$")
 
+# 分片上传默认并发数，可通过环境变量按代理层限流情况调整
+DEFAULT_UPLOAD_CONCURRENCY = int(os.getenv("COZE_BUCKET_UPLOAD_CONCURRENCY", "4"))
+# 批量对象操作（upload_many/exists_many 等）的默认并发数
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("COZE_BUCKET_BATCH_CONCURRENCY", "8"))
+# DeleteObjects 单次请求最多 1000 个 key
+DELETE_OBJECTS_MAX_KEYS = 1000
+# 流式读取的默认分块大小
+DEFAULT_READ_CHUNK_SIZE = 1024 * 1024
+
 
 class ListFilesResult(TypedDict):
     # list_files 的返回结构类型
@@ -20,15 +37,177 @@ class ListFilesResult(TypedDict):
     is_truncated: bool
     next_continuation_token: Optional[str]
 
+
+class UploadItem(TypedDict, total=False):
+    # upload_many 的单个上传项；content_type 缺省为 application/octet-stream
+    file_content: bytes
+    file_name: str
+    content_type: str
+
+
+class DeleteManyResult(TypedDict):
+    # delete_many 的返回结构类型
+    deleted: List[str]
+    errors: List[Dict[str, str]]
+
+class StorageTokenProvider:
+    """x-storage-token 提供者：缓存 token 至过期前，过期时加锁只刷新一次（single-flight）"""
+
+    def __init__(self, *, default_ttl: float = 300.0, refresh_skew: float = 60.0):
+        # default_ttl: token 无法解析出 exp 时的缓存时长（秒）
+        # refresh_skew: 距离过期还剩多少秒时提前刷新
+        self.default_ttl = default_ttl
+        self.refresh_skew = refresh_skew
+        self._token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch_token(self) -> str:
+        from coze_workload_identity import Client as CozeClient
+        coze_client = CozeClient()
+        try:
+            return coze_client.get_access_token()
+        finally:
+            try:
+                coze_client.close()
+            except Exception:
+                # 资源释放失败不影响后续流程
+                pass
+
+    def _parse_expiry(self, token: str) -> Optional[float]:
+        """token 为 JWT 时读取 exp 声明，否则返回 None"""
+        parts = token.split(".") if isinstance(token, str) else []
+        if len(parts) != 3:
+            return None
+        try:
+            payload = parts[1] + "=" * (-len(parts[1]) % 4)
+            exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+            return float(exp) if exp else None
+        except Exception:
+            return None
+
+    def _is_fresh(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at - self.refresh_skew
+
+    def get_token(self) -> str:
+        if self._is_fresh(time.time()):
+            return self._token
+        with self._lock:
+            # 等锁期间其他线程可能已经刷新完成
+            now = time.time()
+            if self._is_fresh(now):
+                return self._token
+            token = self._fetch_token()
+            expires_at = self._parse_expiry(token)
+            if expires_at is None:
+                # 无法解析过期时间时，按 default_ttl 缓存（保证刷新前至少可用 refresh_skew 秒）
+                expires_at = now + max(self.default_ttl, self.refresh_skew * 2)
+            self._token = token
+            self._expires_at = expires_at
+            return token
+
+    def invalidate(self) -> None:
+        """丢弃缓存的 token（如服务端返回鉴权失败），下次调用重新获取"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+
+_default_token_provider = StorageTokenProvider(
+    default_ttl=float(os.getenv("COZE_STORAGE_TOKEN_TTL", "300")),
+)
+
+
+def get_storage_token_provider() -> StorageTokenProvider:
+    """进程内所有存储实例与签名请求共享的 token 提供者"""
+    return _default_token_provider
+
+
+class _PartBufferPool:
+    """固定大小的分片缓冲区池：最多分配 limit 个 bytearray 并循环复用，限制在途内存"""
+
+    def __init__(self, part_size: int, limit: int):
+        self.part_size = part_size
+        self.limit = limit
+        self._free: List[bytearray] = []
+        self._allocated = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> bytearray:
+        with self._cond:
+            while not self._free and self._allocated >= self.limit:
+                self._cond.wait()
+            if self._free:
+                return self._free.pop()
+            self._allocated += 1
+            return bytearray(self.part_size)
+
+    def release(self, buf: bytearray) -> None:
+        with self._cond:
+            # 被截断过的尾片缓冲区不再复用
+            if len(buf) == self.part_size:
+                self._free.append(buf)
+            else:
+                self._allocated -= 1
+            self._cond.notify()
+
+
+class S3ObjectReader(io.RawIOBase):
+    """对象的只读、可 seek 文件视图：每次 readinto 发起一次 Range 请求，适合读取 Parquet footer/row group 等局部内容"""
+
+    def __init__(self, storage: "S3SyncStorage", *, file_key: str, bucket: Optional[str] = None, size: Optional[int] = None):
+        super().__init__()
+        self._storage = storage
+        self._file_key = file_key
+        self._bucket = bucket
+        self._size = size if size is not None else storage.get_file_size(file_key=file_key, bucket=bucket)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b) -> int:
+        if self._pos >= self._size or len(b) == 0:
+            return 0
+        end = min(self._pos + len(b), self._size) - 1
+        data = self._storage.read_range(file_key=self._file_key, start=self._pos, end=end, bucket=self._bucket)
+        n = len(data)
+        memoryview(b)[:n] = data
+        self._pos += n
+        return n
+
+
 class S3SyncStorage:
     """S3兼容存储实现"""
 
-    def __init__(self, *, endpoint_url: Optional[str] = None, access_key: str, secret_key: str, bucket_name: str, region: str = "cn-beijing"):
+    def __init__(self, *, endpoint_url: Optional[str] = None, access_key: str, secret_key: str, bucket_name: str, region: str = "cn-beijing",
+                 token_provider: Optional[StorageTokenProvider] = None):
         self.endpoint_url = os.environ.get("COZE_BUCKET_ENDPOINT_URL") or endpoint_url or ''
         self.access_key = access_key
         self.secret_key = secret_key
         self.bucket_name = bucket_name
         self.region = region
+        self.token_provider = token_provider or get_storage_token_provider()
         self._client = None
 
     def _get_client(self):
@@ -58,28 +237,30 @@ class S3SyncStorage:
                 aws_access_key_id=self.access_key,
                 aws_secret_access_key=self.secret_key,
                 region_name=self.region,
+                # 批量/分片并发时复用连接，避免超过默认 10 个连接的池上限
+                config=Config(max_pool_connections=max(10, DEFAULT_BATCH_CONCURRENCY, DEFAULT_UPLOAD_CONCURRENCY * 2)),
             )
 
-            # 注册 before-call 钩子，发送前注入 x-storage-token 头
+            # 注册 before-call 钩子，发送前注入 x-storage-token 头（token 由共享提供者缓存）
+            token_provider = self.token_provider
+
             def _inject_header(**kwargs):
                 try:
-                    from coze_workload_identity import Client as CozeClient
-                    coze_client = CozeClient()
-                    try:
-                        token = coze_client.get_access_token()
-                    except Exception as e:
-                        logger.error("Error loading COZE_WORKLOAD_IDENTITY_TOKEN: %s", e)
-                        token = None
-                        raise e
-                    finally:
-                        coze_client.close()
+                    token = token_provider.get_token()
                     params = kwargs.get("params", {})
                     headers = params.setdefault("headers", {})
                     headers["x-storage-token"] = token
                 except Exception as e:
                     logger.error("Error loading COZE_WORKLOAD_IDENTITY_TOKEN: %s", e)
                     pass
+            # 鉴权失败时丢弃缓存的 token，避免持续使用已失效的 token
+            def _invalidate_on_auth_error(http_response=None, **kwargs):
+                status = getattr(http_response, "status_code", None)
+                if status in (401, 403):
+                    token_provider.invalidate()
+
             client.meta.events.register("before-call.s3", _inject_header)
+            client.meta.events.register("after-call.s3", _invalidate_on_auth_error)
             self._client = client
         return self._client
 
@@ -198,6 +379,74 @@ class S3SyncStorage:
             logger.error(self._error_msg("Error reading file from S3", e))
             raise e
 
+    def get_file_size(self, *, file_key: str, bucket: Optional[str] = None) -> int:
+        """通过 head_object 获取对象大小（字节）"""
+        try:
+            client = self._get_client()
+            target_bucket = self._resolve_bucket(bucket)
+            resp = client.head_object(Bucket=target_bucket, Key=file_key)
+            return int(resp.get("ContentLength", 0))
+        except Exception as e:
+            logger.error(self._error_msg("Error reading file size from S3", e))
+            raise e
+
+    def read_range(self, *, file_key: str, start: int, end: Optional[int] = None, bucket: Optional[str] = None) -> bytes:
+        """按字节范围读取对象；end 为闭区间（与 HTTP Range 一致），为空时读到对象末尾"""
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"invalid range: start={start}, end={end}")
+        try:
+            client = self._get_client()
+            target_bucket = self._resolve_bucket(bucket)
+            byte_range = f"bytes={start}-{'' if end is None else end}"
+            resp = client.get_object(Bucket=target_bucket, Key=file_key, Range=byte_range)
+            body = resp.get("Body")
+            if body is None:
+                raise RuntimeError("S3 get_object returned no Body")
+            try:
+                return body.read()
+            finally:
+                try:
+                    body.close()
+                except Exception as ce:
+                    logger.debug("Failed to close S3 response body: %s", ce)
+        except Exception as e:
+            logger.error(self._error_msg("Error reading file range from S3", e))
+            raise e
+
+    def iter_file(self, *, file_key: str, bucket: Optional[str] = None, chunk_size: int = DEFAULT_READ_CHUNK_SIZE,
+                  start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """流式读取对象，逐块产生 bytes，内存占用与 chunk_size 相当；可选 start/end（闭区间）只读取部分内容
+        可直接作为 FastAPI StreamingResponse 的内容迭代器
+        """
+        try:
+            client = self._get_client()
+            target_bucket = self._resolve_bucket(bucket)
+            kwargs: Dict[str, Any] = {"Bucket": target_bucket, "Key": file_key}
+            if start > 0 or end is not None:
+                kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+            resp = client.get_object(**kwargs)
+        except Exception as e:
+            logger.error(self._error_msg("Error streaming file from S3", e))
+            raise e
+
+        body = resp.get("Body")
+        if body is None:
+            raise RuntimeError("S3 get_object returned no Body")
+        try:
+            for chunk in body.iter_chunks(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            try:
+                body.close()
+            except Exception as ce:
+                logger.debug("Failed to close S3 response body: %s", ce)
+
+    def open_file(self, *, file_key: str, bucket: Optional[str] = None,
+                  buffer_size: int = DEFAULT_READ_CHUNK_SIZE) -> io.BufferedReader:
+        """以只读、可 seek 的文件对象打开对象，底层按需发起 Range 请求（如 pyarrow/pandas 直接读取 Parquet）"""
+        return io.BufferedReader(S3ObjectReader(self, file_key=file_key, bucket=bucket), buffer_size=buffer_size)
+
     def list_files(self, *, prefix: Optional[str] = None, bucket: Optional[str] = None, max_keys: int = 1000, continuation_token: Optional[str] = None) -> ListFilesResult:
         """列出对象，支持前缀过滤与分页；返回 keys/is_truncated/next_continuation_token。"""
         try:
@@ -230,21 +479,95 @@ class S3SyncStorage:
             logger.error(self._error_msg("Error listing files in S3", e))
             raise e
 
+    def upload_many(self, *, items: Iterable[UploadItem], bucket: Optional[str] = None,
+                    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[str]:
+        """批量上传，并发执行 put_object；返回与 items 顺序一致的对象 key 列表
+        任一失败时先删除本批次已上传成功的对象再抛出首个异常，调用方不会留下部分上传的结果
+        """
+        items = list(items)
+        # 提前校验全部文件名，避免部分上传后才发现非法输入
+        for item in items:
+            self._validate_file_name(item["file_name"])
+        if not items:
+            return []
+        self._get_client()
+
+        def _upload(item: UploadItem) -> str:
+            return self.upload_file(
+                file_content=item["file_content"],
+                file_name=item["file_name"],
+                content_type=item.get("content_type") or "application/octet-stream",
+                bucket=bucket,
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(items))), thread_name_prefix="s3-batch") as executor:
+            futures = [executor.submit(_upload, item) for item in items]
+            wait(futures)
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            self._rollback_uploads([f.result() for f in futures if f.exception() is None], bucket=bucket)
+            raise errors[0]
+        return [f.result() for f in futures]
+
+    def _rollback_uploads(self, file_keys: List[str], *, bucket: Optional[str] = None) -> None:
+        """批量上传部分失败时删除已上传的对象；删除失败只记录日志（附带残留的 key）"""
+        if not file_keys:
+            return
+        logger.error("Batch upload failed, deleting %d uploaded file(s)", len(file_keys))
+        try:
+            result = self.delete_many(file_keys=file_keys, bucket=bucket)
+            leftover = [err["key"] for err in result["errors"]]
+        except Exception:
+            leftover = file_keys
+        if leftover:
+            logger.error("Failed to roll back uploaded file(s), left in bucket: %s", leftover)
+
+    def delete_many(self, *, file_keys: Iterable[str], bucket: Optional[str] = None) -> DeleteManyResult:
+        """批量删除，使用 DeleteObjects 每 1000 个 key 一次请求；返回已删除的 key 与失败明细"""
+        keys = list(dict.fromkeys(file_keys))
+        result: DeleteManyResult = {"deleted": [], "errors": []}
+        if not keys:
+            return result
+        try:
+            client = self._get_client()
+            target_bucket = self._resolve_bucket(bucket)
+            for start in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+                batch = keys[start:start + DELETE_OBJECTS_MAX_KEYS]
+                resp = client.delete_objects(
+                    Bucket=target_bucket,
+                    Delete={"Objects": [{"Key": k} for k in batch], "Quiet": False},
+                )
+                result["deleted"].extend(d.get("Key") for d in resp.get("Deleted", []) or [] if d.get("Key"))
+                for err in resp.get("Errors", []) or []:
+                    result["errors"].append({
+                        "key": err.get("Key", ""),
+                        "code": err.get("Code", ""),
+                        "message": err.get("Message", ""),
+                    })
+            if result["errors"]:
+                logger.error("Error deleting %d file(s) from S3: %s", len(result["errors"]), result["errors"][:5])
+            return result
+        except Exception as e:
+            logger.error(self._error_msg("Error deleting files from S3", e))
+            raise e
+
+    def exists_many(self, *, file_keys: Iterable[str], bucket: Optional[str] = None,
+                    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> Dict[str, bool]:
+        """批量检查对象是否存在，并发执行 head_object；返回 key -> 是否存在"""
+        keys = list(dict.fromkeys(file_keys))
+        if not keys:
+            return {}
+        self._get_client()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(keys))), thread_name_prefix="s3-batch") as executor:
+            flags = executor.map(lambda k: self.file_exists(file_key=k, bucket=bucket), keys)
+            return dict(zip(keys, flags))
+
     def generate_presigned_url(self, *, key: str, bucket: Optional[str] = None, expire_time: int = 1800) -> str:
         """通过 S3 Proxy 生成签名 URL。"""
         import json
         import urllib.request as urllib_request
         try:
-            from coze_workload_identity import Client as CozeClient
-            coze_client = CozeClient()
-            try:
-                token = coze_client.get_access_token()
-            finally:
-                try:
-                    coze_client.close()
-                except Exception:
-                    # 资源释放失败不影响后续流程
-                    pass
+            token = self.token_provider.get_token()
         except Exception as e:
             logger.error(f"Error loading x-storage-token: {e}")
             raise RuntimeError(f"获取 x-storage-token 失败: {e}")
@@ -297,8 +620,8 @@ class S3SyncStorage:
             bucket: Optional[str] = None,
             multipart_chunksize: int = 5 * 1024 * 1024,
             multipart_threshold: int = 5 * 1024 * 1024,
-            max_concurrency: int = 1,
-            use_threads: bool = False,
+            max_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+            use_threads: bool = True,
     ) -> str:
         """流式上传（文件对象）
         - fileobj: 任何带有 read() 方法的文件对象（如 open(..., 'rb') 返回的对象、io.BytesIO 等）
@@ -307,8 +630,8 @@ class S3SyncStorage:
         - bucket: 目标桶；为空时取环境变量或实例默认值
         - multipart_chunksize: 分片大小（默认 5MB，以适配代理层限制）
         - multipart_threshold: 触发分片上传的阈值（默认 5MB）
-        - max_concurrency: 并发分片上传的并发数（默认 1，避免代理层节流影响）
-        - use_threads: 是否启用线程并发（默认 False）
+        - max_concurrency: 并发分片上传的并发数（默认 DEFAULT_UPLOAD_CONCURRENCY，代理层节流时可调小）
+        - use_threads: 是否启用线程并发（默认 True；max_concurrency 为 1 时等价于串行）
         返回：最终写入的对象 key
         """
         try:
@@ -364,18 +687,23 @@ class S3SyncStorage:
 
     def trunk_upload_file(self, *, chunk_iter: Iterable[bytes], file_name: str,
                            content_type: str = "application/octet-stream", bucket: Optional[str] = None,
-                           part_size: int = 5 * 1024 * 1024) -> str:
+                           part_size: int = 5 * 1024 * 1024,
+                           max_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+                           progress_callback: Optional[Callable[[int, float], None]] = None) -> str:
         """流式上传（字节迭代器，显式分片 Multipart Upload）
         - chunk_iter: 可迭代对象，逐块产生 bytes；每块大小可变（内部累积到 part_size 再上传），最后一块可小于 5MB
         - file_name: 原始文件名，用于生成唯一 key
         - content_type: MIME 类型
         - bucket: 目标桶；为空时取环境或实例默认值
         - part_size: 每个 part 的最小大小（除最后一个）；默认 5MB
+        - max_concurrency: 并发上传的分片数；在途内存上限约为 (max_concurrency + 1) * part_size
+        - progress_callback: 每个分片完成后回调 (已上传字节数, 已耗时秒数)
         返回：最终写入的对象 key
         """
         client = self._get_client()
         target_bucket = self._resolve_bucket(bucket)
         key = self._generate_object_key(original_name=file_name)
+        max_concurrency = max(1, max_concurrency)
 
         # 初始化分片上传
         try:
@@ -385,40 +713,158 @@ class S3SyncStorage:
             logger.error(self._error_msg("create_multipart_upload failed", e))
             raise e
 
-        parts = []
-        part_number = 1
-        buffer = bytearray()
+        # 上传中的分片 + 正在填充的分片，各占一个缓冲区
+        pool = _PartBufferPool(part_size, max_concurrency + 1)
+        parts: List[Dict[str, Any]] = []
+        in_flight = set()
+        uploaded_bytes = 0
+        start_time = time.time()
+
+        def _upload_part(part_number: int, buf: bytearray) -> Dict[str, Any]:
+            try:
+                resp = client.upload_part(Bucket=target_bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
+                                          Body=buf)
+                return {"PartNumber": part_number, "ETag": resp["ETag"], "Size": len(buf)}
+            finally:
+                pool.release(buf)
+
+        def _collect(done) -> None:
+            nonlocal uploaded_bytes
+            for fut in done:
+                in_flight.discard(fut)
+                part = fut.result()
+                uploaded_bytes += part.pop("Size")
+                parts.append(part)
+                if progress_callback is not None:
+                    progress_callback(uploaded_bytes, time.time() - start_time)
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="s3-part")
         try:
+            part_number = 1
+            buf = pool.acquire()
+            view = memoryview(buf)
+            filled = 0
             for chunk in chunk_iter:
                 if not chunk:
                     continue
-                buffer.extend(chunk)
-                while len(buffer) >= part_size:
-                    data = bytes(buffer[:part_size])
-                    buffer = buffer[part_size:]
-                    resp = client.upload_part(Bucket=target_bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
-                                              Body=data)
-                    parts.append({"PartNumber": part_number, "ETag": resp["ETag"]})
-                    part_number += 1
-
-            # 上传最后不足 part_size 的余量
-            if len(buffer) > 0:
-                resp = client.upload_part(Bucket=target_bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
-                                          Body=bytes(buffer))
-                parts.append({"PartNumber": part_number, "ETag": resp["ETag"]})
+                src = memoryview(chunk)
+                offset = 0
+                while offset < len(src):
+                    take = min(part_size - filled, len(src) - offset)
+                    view[filled:filled + take] = src[offset:offset + take]
+                    filled += take
+                    offset += take
+                    if filled == part_size:
+                        view.release()
+                        # 在途分片达到上限时等待任意一个完成，再继续读取输入
+                        if len(in_flight) >= max_concurrency:
+                            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            _collect(done)
+                        in_flight.add(executor.submit(_upload_part, part_number, buf))
+                        part_number += 1
+                        buf = pool.acquire()
+                        view = memoryview(buf)
+                        filled = 0
+                src.release()
+
+            # 上传最后不足 part_size 的余量（空输入时也上传一个空分片，保证 complete 有效）
+            view.release()
+            if filled > 0 or part_number == 1:
+                del buf[filled:]
+                in_flight.add(executor.submit(_upload_part, part_number, buf))
+            else:
+                pool.release(buf)
+
+            if in_flight:
+                done, _ = wait(in_flight)
+                _collect(done)
 
             # 完成分片
+            parts.sort(key=lambda p: p["PartNumber"])
             client.complete_multipart_upload(
                 Bucket=target_bucket,
                 Key=key,
                 UploadId=upload_id,
                 MultipartUpload={"Parts": parts},
             )
+            elapsed = max(time.time() - start_time, 1e-6)
+            logger.info(
+                "multipart upload finished: key=%s parts=%d bytes=%d elapsed=%.2fs throughput=%.2fMB/s",
+                key, len(parts), uploaded_bytes, elapsed, uploaded_bytes / elapsed / (1024 * 1024),
+            )
             return key
         except Exception as e:
             logger.error(self._error_msg("multipart upload failed", e))
+            # 先取消排队的分片并等待正在上传的分片结束，再中止上传，避免中止后仍有 UploadPart 请求留下孤立分片
+            executor.shutdown(wait=True, cancel_futures=True)
             try:
                 client.abort_multipart_upload(Bucket=target_bucket, Key=key, UploadId=upload_id)
             except Exception as ae:
                 logger.error(self._error_msg("abort_multipart_upload failed", ae))
             raise e
+        finally:
+            executor.shutdown(wait=True)
+
+
+class AsyncS3Storage:
+    """S3SyncStorage 的异步封装：在线程池中执行 boto3 调用，用信号量限制同时进行的对象操作数"""
+
+    def __init__(self, storage: S3SyncStorage, *, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY):
+        self.storage = storage
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 延迟到事件循环内创建，避免绑定到错误的 loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, func: Callable[..., Any], **kwargs) -> Any:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(func, **kwargs)
+
+    async def upload_file(self, *, file_content: bytes, file_name: str, content_type: str = "application/octet-stream", bucket: Optional[str] = None) -> str:
+        return await self._run(self.storage.upload_file, file_content=file_content, file_name=file_name,
+                               content_type=content_type, bucket=bucket)
+
+    async def delete_file(self, *, file_key: str, bucket: Optional[str] = None) -> bool:
+        return await self._run(self.storage.delete_file, file_key=file_key, bucket=bucket)
+
+    async def file_exists(self, *, file_key: str, bucket: Optional[str] = None) -> bool:
+        return await self._run(self.storage.file_exists, file_key=file_key, bucket=bucket)
+
+    async def read_file(self, *, file_key: str, bucket: Optional[str] = None) -> bytes:
+        return await self._run(self.storage.read_file, file_key=file_key, bucket=bucket)
+
+    async def read_range(self, *, file_key: str, start: int, end: Optional[int] = None, bucket: Optional[str] = None) -> bytes:
+        return await self._run(self.storage.read_range, file_key=file_key, start=start, end=end, bucket=bucket)
+
+    async def upload_many(self, *, items: Iterable[UploadItem], bucket: Optional[str] = None) -> List[str]:
+        """并发上传，返回与 items 顺序一致的 key 列表；任一失败时与同步版本一样删除已上传的对象后抛出异常"""
+        items = list(items)
+        for item in items:
+            self.storage._validate_file_name(item["file_name"])
+        results = await asyncio.gather(*(
+            self.upload_file(
+                file_content=item["file_content"],
+                file_name=item["file_name"],
+                content_type=item.get("content_type") or "application/octet-stream",
+                bucket=bucket,
+            )
+            for item in items
+        ), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self._run(self.storage._rollback_uploads,
+                            file_keys=[r for r in results if not isinstance(r, BaseException)], bucket=bucket)
+            raise errors[0]
+        return list(results)
+
+    async def delete_many(self, *, file_keys: Iterable[str], bucket: Optional[str] = None) -> DeleteManyResult:
+        return await self._run(self.storage.delete_many, file_keys=list(file_keys), bucket=bucket)
+
+    async def exists_many(self, *, file_keys: Iterable[str], bucket: Optional[str] = None) -> Dict[str, bool]:
+        keys = list(dict.fromkeys(file_keys))
+        flags = await asyncio.gather(*(self.file_exists(file_key=k, bucket=bucket) for k in keys))
+        return dict(zip(keys, flags))
@@ -0,0 +1,297 @@
+"""
+图表输出管理
+
+assets/charts 下的图表和词云原本只增不减，list_generated_charts 每次都要遍历目录并逐个取文件大小。
+这里用 SQLite 为图表建立元数据索引（所属会话、生成工具、参数哈希、大小、创建/访问时间）：
+
+- 图表文件名带绘制参数的哈希（chart_path），不同数据的同名图表不会互相覆盖
+- 图表工具保存文件后调用 register_chart 登记，会话取自当前工具调用的 thread_id；同一图表可属于多个会话
+  （chart_owners），缓存命中直接复用已有图表时由 claim_charts 把图表加入当前会话
+- 淘汰：超过 CHART_TTL_DAYS 未被访问的图表，以及登记图表的总大小超过 CHART_DISK_QUOTA_MB 时最久未访问的图表
+  会被删除；只统计和淘汰经 register_chart 登记的图表，目录中原有或手动放入的文件只索引、不删除
+- 查询按会话过滤、分页，只读取当前页的记录
+- 目录中手动增删的文件在首次查询时同步，之后每隔 CHART_SYNC_INTERVAL 秒同步一次
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHARTS_DIR = "assets/charts"
+CHART_INDEX_PATH = os.getenv("CHART_INDEX_PATH", "assets/index/charts.sqlite3")
+CHART_TTL_DAYS = float(os.getenv("CHART_TTL_DAYS", "30"))
+CHART_DISK_QUOTA_MB = float(os.getenv("CHART_DISK_QUOTA_MB", "500"))
+CHART_SYNC_INTERVAL = float(os.getenv("CHART_SYNC_INTERVAL", "300"))  # 秒
+CHART_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    path TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL DEFAULT '',
+    tool TEXT NOT NULL DEFAULT '',
+    params_hash TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    managed INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS charts_session_created ON charts (session_id, created_at);
+CREATE INDEX IF NOT EXISTS charts_created ON charts (created_at);
+CREATE INDEX IF NOT EXISTS charts_managed_accessed ON charts (managed, accessed_at);
+CREATE TABLE IF NOT EXISTS chart_owners (
+    path TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    PRIMARY KEY (path, session_id)
+);
+CREATE INDEX IF NOT EXISTS chart_owners_session ON chart_owners (session_id);
+INSERT OR IGNORE INTO chart_owners (path, session_id) SELECT path, session_id FROM charts WHERE session_id != '';
+"""
+
+
+@dataclass(frozen=True)
+class ChartRecord:
+    path: str
+    session_id: str
+    tool: str
+    params_hash: str
+    size: int
+    created_at: float
+    accessed_at: float
+
+
+def params_hash(params: Any) -> str:
+    """生成参数的稳定哈希（相同参数生成的图表可据此识别）"""
+    payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def chart_path(output_dir: str, stem: str, params: Any, suffix: str = ".png") -> str:
+    """图表输出路径：<stem>_<参数哈希前 8 位><suffix>，相同参数得到相同路径"""
+    return os.path.join(output_dir, f"{stem}_{params_hash(params)[:8]}{suffix}")
+
+
+def current_session_id() -> str:
+    """当前工具调用所属的会话（LangGraph thread_id）；不在工具调用中时为空串"""
+    try:
+        from langchain_core.runnables.config import ensure_config
+        return str((ensure_config().get("configurable") or {}).get("thread_id") or "")
+    except Exception:
+        return ""
+
+
+class ChartStore:
+    """图表元数据索引与淘汰（线程安全，写操作串行）"""
+
+    def __init__(self, charts_dir: str = CHARTS_DIR, db_path: str = CHART_INDEX_PATH,
+                 ttl_days: float = CHART_TTL_DAYS, quota_mb: float = CHART_DISK_QUOTA_MB,
+                 sync_interval: float = CHART_SYNC_INTERVAL):
+        self.charts_dir = charts_dir
+        self.db_path = db_path
+        self.ttl = ttl_days * 86400
+        self.quota = int(quota_mb * 1024 * 1024)
+        self.sync_interval = sync_interval
+        self._write_lock = threading.Lock()
+        self._synced_at: Optional[float] = None
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _key(self, path: str) -> str:
+        """索引中统一使用 assets/charts/<文件名> 形式的路径"""
+        return os.path.join(self.charts_dir, os.path.basename(path))
+
+    # ---------- 登记与访问 ----------
+
+    def register(self, path: str, *, tool: str = "", params: Any = None,
+                 session_id: Optional[str] = None) -> None:
+        """登记新生成（或被覆盖）的图表并加入当前会话，随后按 TTL 与磁盘配额淘汰旧图表"""
+        key = self._key(path)
+        size = os.path.getsize(path)
+        now = time.time()
+        session_id = current_session_id() if session_id is None else session_id
+        with self._write_lock:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO charts (path, session_id, tool, params_hash, size, created_at, accessed_at, managed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+                    "ON CONFLICT(path) DO UPDATE SET tool = excluded.tool, "
+                    "params_hash = excluded.params_hash, size = excluded.size, created_at = excluded.created_at, "
+                    "accessed_at = excluded.accessed_at, managed = 1, "
+                    "session_id = CASE WHEN charts.session_id = '' THEN excluded.session_id ELSE charts.session_id END",
+                    (key, session_id, tool, params_hash(params) if params is not None else "", size, now, now),
+                )
+                if session_id:
+                    conn.execute("INSERT OR IGNORE INTO chart_owners (path, session_id) VALUES (?, ?)", (key, session_id))
+            self._evict(now, keep=key)
+
+    def claim(self, paths: List[str], session_id: Optional[str] = None) -> None:
+        """把已登记的图表加入会话并记录访问（缓存命中、复用其它会话生成的图表时调用）"""
+        session_id = current_session_id() if session_id is None else session_id
+        keys = [self._key(path) for path in paths]
+        now = time.time()
+        with self._write_lock:
+            with self._connect() as conn:
+                for key in keys:
+                    if conn.execute("UPDATE charts SET accessed_at = ? WHERE path = ?", (now, key)).rowcount and session_id:
+                        conn.execute("INSERT OR IGNORE INTO chart_owners (path, session_id) VALUES (?, ?)",
+                                     (key, session_id))
+
+    def touch(self, path: str) -> None:
+        """记录一次访问（报告引用图表时调用），LRU 淘汰据此判断"""
+        with self._connect() as conn:
+            conn.execute("UPDATE charts SET accessed_at = ? WHERE path = ?", (time.time(), self._key(path)))
+
+    def _delete(self, conn: sqlite3.Connection, paths: List[str]) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to evict chart {path}: {e}")
+                continue
+            conn.execute("DELETE FROM charts WHERE path = ?", (path,))
+            conn.execute("DELETE FROM chart_owners WHERE path = ?", (path,))
+
+    def _evict(self, now: float, keep: Optional[str] = None) -> List[str]:
+        """调用方持有写锁；返回被删除的图表"""
+        evicted: List[str] = []
+        with self._connect() as conn:
+            if self.ttl > 0:
+                expired = [path for (path,) in conn.execute(
+                    "SELECT path FROM charts WHERE managed = 1 AND accessed_at < ? AND path != ?",
+                    (now - self.ttl, keep or ""),
+                )]
+                self._delete(conn, expired)
+                evicted += expired
+            if self.quota > 0:
+                # 未登记的文件不会被淘汰，也不计入配额
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM charts WHERE managed = 1").fetchone()[0]
+                if total > self.quota:
+                    victims = []
+                    for path, size in conn.execute(
+                        "SELECT path, size FROM charts WHERE managed = 1 AND path != ? ORDER BY accessed_at",
+                        (keep or "",),
+                    ):
+                        if total <= self.quota:
+                            break
+                        victims.append(path)
+                        total -= size
+                    self._delete(conn, victims)
+                    evicted += victims
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} chart(s)")
+        return evicted
+
+    def evict(self) -> List[str]:
+        with self._write_lock:
+            return self._evict(time.time())
+
+    # ---------- 同步与查询 ----------
+
+    def sync(self, force: bool = False) -> None:
+        """把目录中未登记的文件补入索引（不参与淘汰），删除已不存在文件的记录"""
+        now = time.time()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        with self._write_lock:
+            on_disk = {}
+            try:
+                with os.scandir(self.charts_dir) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.lower().endswith(CHART_SUFFIXES):
+                            stat = entry.stat()
+                            on_disk[self._key(entry.name)] = (stat.st_size, stat.st_mtime)
+            except FileNotFoundError:
+                pass
+            with self._connect() as conn:
+                known = {path for (path,) in conn.execute("SELECT path FROM charts")}
+                removed = [(p,) for p in known - set(on_disk)]
+                conn.executemany("DELETE FROM charts WHERE path = ?", removed)
+                conn.executemany("DELETE FROM chart_owners WHERE path = ?", removed)
+                conn.executemany(
+                    "INSERT INTO charts (path, size, created_at, accessed_at, managed) VALUES (?, ?, ?, ?, 0)",
+                    [(path, size, mtime, mtime) for path, (size, mtime) in on_disk.items() if path not in known],
+                )
+            self._synced_at = now
+
+    def list(self, session_id: Optional[str] = None, page: int = 1,
+             page_size: int = 20) -> Tuple[List[ChartRecord], int]:
+        """按创建时间倒序分页列出图表，返回 (当前页记录, 总数)；session_id 为 None 时列出全部"""
+        self.sync()
+        where, params = (
+            ("WHERE path IN (SELECT path FROM chart_owners WHERE session_id = ?)", [session_id])
+            if session_id is not None else ("", [])
+        )
+        page, page_size = max(1, page), max(1, page_size)
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM charts {where}", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT path, session_id, tool, params_hash, size, created_at, accessed_at FROM charts "
+                f"{where} ORDER BY created_at DESC, path LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+        records = [ChartRecord(*row) for row in rows]
+        # 只检查当前页的文件是否仍然存在
+        missing = [r.path for r in records if not os.path.exists(r.path)]
+        if missing:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM charts WHERE path = ?", [(p,) for p in missing])
+                conn.executemany("DELETE FROM chart_owners WHERE path = ?", [(p,) for p in missing])
+            records = [r for r in records if r.path not in missing]
+            total -= len(missing)
+        return records, total
+
+
+_store: Optional[ChartStore] = None
+_store_lock = threading.Lock()
+
+
+def get_chart_store() -> ChartStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ChartStore()
+    return _store
+
+
+def register_chart(path: str, *, tool: str = "", params: Any = None) -> None:
+    """登记图表；索引不可用时只记录日志，不影响图表生成"""
+    try:
+        get_chart_store().register(path, tool=tool, params=params)
+    except Exception as e:
+        logger.warning(f"Failed to register chart {path}: {e}")
+
+
+def claim_charts(paths: List[str]) -> None:
+    """把已登记的图表加入当前会话；索引不可用时只记录日志"""
+    try:
+        get_chart_store().claim(paths)
+    except Exception as e:
+        logger.warning(f"Failed to claim charts {paths}: {e}")
+
+
+def touch_chart(path: str) -> None:
+    try:
+        get_chart_store().touch(path)
+    except Exception as e:
+        logger.warning(f"Failed to touch chart {path}: {e}")
@@ -2,10 +2,14 @@
 保存爬取的数据到 CSV/Excel 文件
 """
 
-import pandas as pd
 import datetime
+import logging
 import os
 
+from tools.tool_cache import invalidate_tool_cache
+
+logger = logging.getLogger(__name__)
+
 
 class DataSaver(object):
     """数据保存工具，支持 CSV 和 Excel 格式"""
@@ -59,9 +63,13 @@ class DataSaver(object):
             return
         
         try:
+            import pandas as pd
             df = pd.DataFrame(self.data_list)
             df.to_csv(self.file_path_csv, index=False, encoding='utf-8-sig')
             print(f"成功保存到 CSV 文件: {self.file_path_csv}")
+            # 新数据落盘后，读取/列出本地数据的工具缓存失效
+            invalidate_tool_cache("read_local_jobs", "list_available_jobs")
+            self._update_index()
             return self.file_path_csv
         except Exception as e:
             print(f"保存 CSV 文件失败: {e}")
@@ -74,14 +82,26 @@ class DataSaver(object):
             return
         
         try:
+            import pandas as pd
             df = pd.DataFrame(self.data_list)
             df.to_excel(self.file_path_excel, index=False)
             print(f"成功保存到 Excel 文件: {self.file_path_excel}")
+            # 新数据落盘后，读取/列出本地数据的工具缓存失效
+            invalidate_tool_cache("read_local_jobs", "list_available_jobs")
+            self._update_index()
             return self.file_path_excel
         except Exception as e:
             print(f"保存 Excel 文件失败: {e}")
             return None
     
+    def _update_index(self):
+        """把新保存的文件计入词频索引（失败不影响保存结果，查询时会再次同步）"""
+        try:
+            from tools.job_index import get_job_index
+            get_job_index()
+        except Exception as e:
+            logger.warning(f"Failed to update job index: {e}")
+
     def save(self):
         """保存数据（默认保存为 Excel 格式）"""
         return self.save_to_excel()
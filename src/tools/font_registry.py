@@ -0,0 +1,192 @@
+"""
+中文字体注册表
+
+可视化工具与词云工具共用：
+- 进程内只解析一次中文字体（环境变量 > 缓存文件 > 常见安装路径 > matplotlib 字体列表扫描），
+  解析结果写入缓存文件，下次启动无需再扫描字体列表
+- FontProperties 与 PIL FreeType 字体对象按字号缓存复用（进程内共享）
+- 词云布局时每个词、每次缩小字号都会 ImageFont.truetype 一次；font_data 把字体文件读入内存一次，
+  作为 WordCloud 的 font_path 传入，之后每次都从内存创建字体，不再重复读取数 MB 的 TTC 文件
+"""
+
+import os
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 常见中文字体（字体族名, 安装路径），按优先级排列
+CJK_FONT_CANDIDATES = [
+    ("WenQuanYi Zen Hei", "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc"),  # 文泉驿正黑
+    ("WenQuanYi Micro Hei", "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc"),  # 文泉驿微米黑
+    ("AR PL UMing CN", "/usr/share/fonts/truetype/arphic/uming.ttc"),
+    ("AR PL UKai CN", "/usr/share/fonts/truetype/arphic/ukai.ttc"),
+    ("Noto Sans CJK SC", "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc"),
+]
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FontInfo:
+    family: str
+    path: str
+
+
+def _cache_file() -> str:
+    """解析结果缓存文件，可用 FONT_CACHE_FILE 指定"""
+    return os.getenv("FONT_CACHE_FILE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "employment-agent", "font_cache.json"
+    )
+
+
+def _load_cached() -> Optional[FontInfo]:
+    try:
+        with open(_cache_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = data.get("path")
+    if data.get("version") != CACHE_VERSION or not path or not os.path.isfile(path):
+        return None
+    # 字体文件被替换后重新解析
+    if data.get("mtime") != os.path.getmtime(path):
+        return None
+    return FontInfo(data["family"], path)
+
+
+def _save_cached(font: FontInfo) -> None:
+    path = _cache_file()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "family": font.family, "path": font.path,
+                       "mtime": os.path.getmtime(font.path)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write font cache {path}: {e}")
+
+
+def _family_of(path: str) -> str:
+    """读取字体文件的族名（matplotlib 使用族名匹配字体）"""
+    from matplotlib import ft2font
+    return ft2font.FT2Font(path).family_name
+
+
+def _scan_font_manager() -> Optional[FontInfo]:
+    """慢路径：遍历 matplotlib 已知的系统字体"""
+    import matplotlib.font_manager as fm
+
+    by_name = {f.name: f.fname for f in fm.fontManager.ttflist}
+    for family, _ in CJK_FONT_CANDIDATES:
+        if family in by_name:
+            return FontInfo(family, by_name[family])
+    return None
+
+
+def _resolve() -> Optional[FontInfo]:
+    override = os.getenv("CHINESE_FONT_PATH")
+    if override:
+        if os.path.isfile(override):
+            return FontInfo(_family_of(override), override)
+        logger.warning(f"CHINESE_FONT_PATH does not exist: {override}")
+
+    font = _load_cached()
+    if font is not None:
+        return font
+
+    font = next((FontInfo(family, path) for family, path in CJK_FONT_CANDIDATES if os.path.isfile(path)), None)
+    if font is None:
+        font = _scan_font_manager()
+    if font is not None:
+        _save_cached(font)
+    return font
+
+
+_resolved = False
+_font: Optional[FontInfo] = None
+_lock = threading.Lock()
+
+
+def resolve_cjk_font() -> Optional[FontInfo]:
+    """返回可用的中文字体，找不到时返回 None（进程内只解析一次）"""
+    global _resolved, _font
+    if _resolved:
+        return _font
+    with _lock:
+        if not _resolved:
+            _font = _resolve()
+            _resolved = True
+    return _font
+
+
+def reset_font_registry() -> None:
+    """清空进程内的解析结果与字体对象缓存（字体安装变化后或测试使用）"""
+    global _resolved, _font
+    with _lock:
+        _resolved, _font = False, None
+    font_properties.cache_clear()
+    truetype.cache_clear()
+    font_data.cache_clear()
+
+
+def configure_matplotlib(mpl: Any) -> Optional[FontInfo]:
+    """把中文字体设为 matplotlib 默认无衬线字体（mpl 为 matplotlib 或 pyplot 模块）；返回使用的字体"""
+    font = resolve_cjk_font()
+    if font is not None:
+        import matplotlib.font_manager as fm
+
+        # 缓存命中时字体可能不在 matplotlib 的字体列表里，单独注册这一个文件
+        if font.family not in {f.name for f in fm.fontManager.ttflist}:
+            fm.fontManager.addfont(font.path)
+        mpl.rcParams['font.sans-serif'] = [font.family, 'DejaVu Sans']
+    else:
+        mpl.rcParams['font.sans-serif'] = ['DejaVu Sans']
+    mpl.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+    return font
+
+
+@lru_cache(maxsize=32)
+def font_properties(size: Optional[float] = None, weight: Optional[str] = None):
+    """中文字体的 FontProperties；没有中文字体时返回默认字体"""
+    from matplotlib.font_manager import FontProperties
+
+    font = resolve_cjk_font()
+    return FontProperties(fname=font.path if font else None, size=size, weight=weight)
+
+
+_truetype_lock = threading.Lock()
+
+
+@lru_cache(maxsize=512)
+def truetype(font_path: str, size: int, index: int = 0):
+    """按 (字体文件, 字号, 索引) 复用 PIL FreeType 字体对象（进程内共享，加锁创建）"""
+    from PIL import ImageFont
+    with _truetype_lock:
+        return ImageFont.truetype(font_path, size, index=index)
+
+
+class FontData:
+    """已读入内存的字体文件，可作为 WordCloud 的 font_path / ImageFont.truetype 的 font 参数；
+    PIL 每次创建字体都调用 read()，这里始终返回完整内容"""
+
+    def __init__(self, path: str, data: bytes):
+        self.path = path
+        self.data = data
+
+    def read(self, *args) -> bytes:
+        return self.data
+
+    def __repr__(self) -> str:
+        return f"FontData({self.path!r}, {len(self.data)} bytes)"
+
+
+@lru_cache(maxsize=8)
+def font_data(font_path: str) -> FontData:
+    """读入字体文件（进程内每个文件只读一次，各线程共享）"""
+    with open(font_path, "rb") as f:
+        return FontData(font_path, f.read())
@@ -0,0 +1,535 @@
+"""
+招聘数据词频索引
+
+assets/jobs_data 下爬取/采集的招聘数据（CSV/Excel）按文件增量汇总为词频表，保存在 SQLite 文件中：
+- 维度：字段（skill 技能 / title 职位名称 / company 公司名称）× 搜索关键词 × 城市 × 发布日期，
+  同一职位中重复出现的技能只计一次（统计的是“多少个职位要求该技能”）
+- 每个数据文件记录 (mtime, 大小)，只重新统计新增或变化的文件；文件删除后其计数一并删除
+- DataSaver 保存后立即更新；查询前检查一次目录，手动放入的文件也会被统计
+
+词云、技能图表未提供数据时直接查询 top_terms，按关键词、城市、时间窗口过滤，不再使用写死的示例数据。
+
+同一次统计中按发布时间把职位归入周/月时间桶，每个 (文件, 周期, 时间桶, 城市) 一行，记录职位数和
+月薪分布（按 0.5k 分档的直方图）。trend 查询只读取范围内的时间桶并合并直方图求中位数，
+趋势图与就业趋势工具直接使用真实数据。
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOBS_DATA_DIR = "assets/jobs_data"
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "assets/index/jobs.sqlite3")
+DATA_FILE_SUFFIXES = (".xlsx", ".xls", ".csv")
+DATA_FILE_MARK = "_招聘数据"
+
+FIELD_SKILL = "skill"
+FIELD_TITLE = "title"
+FIELD_COMPANY = "company"
+
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+SALARY_BIN = 0.5  # 月薪直方图分档（千元）
+
+# 候选列名（爬虫 / 八爪鱼导出的列名不完全一致）
+TITLE_COLUMNS = ("职位名称", "岗位名称", "title")
+COMPANY_COLUMNS = ("公司名称", "企业名称", "company")
+LOCATION_COLUMNS = ("工作地点", "地点", "城市", "location")
+DATE_COLUMNS = ("发布时间", "发布日期", "更新时间", "publish_time")
+SALARY_COLUMNS = ("薪资", "薪酬", "薪资范围", "salary")
+TEXT_COLUMNS = ("职位描述", "岗位职责", "任职要求", "职位要求", "岗位要求", "description")
+TAG_COLUMNS = ("技能标签", "技能要求", "职位标签", "标签", "skills", "tags")
+
+# 技能词表：在职位名称、描述中按词匹配（英文不区分大小写）
+SKILL_TERMS = [
+    "Python", "Java", "JavaScript", "TypeScript", "SQL", "Go", "Rust", "C++", "C#", "PHP", "Ruby",
+    "Swift", "Kotlin", "Scala", "R语言", "MATLAB", "Shell",
+    "React", "Vue", "Angular", "Node.js", "HTML", "CSS", "Flutter", "ReactNative", "Electron", "小程序",
+    "Spring", "SpringBoot", "SpringCloud", "MyBatis", "Django", "Flask", "FastAPI",
+    "MySQL", "PostgreSQL", "Oracle", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ",
+    "Hadoop", "Spark", "Flink", "Hive", "HBase", "大数据", "数据仓库", "ETL",
+    "Linux", "Git", "Docker", "Kubernetes", "DevOps", "微服务", "云计算", "AWS", "Serverless",
+    "机器学习", "深度学习", "人工智能", "算法", "自然语言处理", "NLP", "计算机视觉", "推荐系统", "大模型", "LLM",
+    "TensorFlow", "PyTorch", "Keras", "Pandas", "NumPy", "Matplotlib",
+    "数据分析", "数据挖掘", "数据可视化", "统计学", "Excel", "Tableau", "PowerBI", "SPSS", "SAS",
+    "测试", "自动化测试", "性能优化", "系统设计", "架构", "网络安全",
+    "产品经理", "产品设计", "UI设计", "UX设计", "Figma", "Axure", "项目管理", "敏捷开发", "Scrum",
+    "Unity", "Unreal", "游戏开发", "嵌入式", "物联网", "区块链",
+    "英语", "沟通能力", "团队合作", "业务理解", "抗压能力",
+]
+_SKILL_CANONICAL = {term.lower(): term for term in SKILL_TERMS}
+_SKILL_PATTERN = re.compile(
+    r"(?<![A-Za-z0-9+#.])("
+    + "|".join(re.escape(term) for term in sorted(SKILL_TERMS, key=len, reverse=True))
+    + r")(?![A-Za-z0-9+#])",
+    re.IGNORECASE,
+)
+_TAG_SPLIT = re.compile(r"[,，、/|;；\s]+")
+_BRACKETS = re.compile(r"[（(【\[][^）)】\]]*[）)】\]]")
+_CITY_SPLIT = re.compile(r"[-－—·/\s]")
+
+
+# ==================== 字段解析 ====================
+
+def _clean(value: Any) -> str:
+    """缺失值（None/NaN）返回空串"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+
+def _first(row: Dict[str, Any], columns: Iterable[str]) -> str:
+    for column in columns:
+        value = _clean(row.get(column))
+        if value:
+            return value
+    return ""
+
+
+def parse_source_name(path: str) -> Tuple[str, str]:
+    """从文件名解析 (搜索关键词, 城市)：{关键词}_{城市}_招聘数据.xlsx 或 {关键词}_招聘数据.xlsx"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem = stem.split(DATA_FILE_MARK)[0]
+    keyword, _, city = stem.partition("_")
+    return keyword, city
+
+
+def parse_publish_date(value: Any, reference: datetime.date) -> Optional[datetime.date]:
+    """
+    解析发布时间，支持日期对象、"2024-01-15"、"2024年1月15日"、"01-15"（补全年份）、
+    "今天"/"昨天"/"3天前"/"2小时前" 等相对时间；reference 为数据采集日期
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = _clean(value)
+    if not text:
+        return None
+
+    match = re.search(r"(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})", text)
+    if match:
+        try:
+            return datetime.date(*map(int, match.groups()))
+        except ValueError:
+            return None
+    match = re.search(r"(\d{1,2})\s*[-/.月]\s*(\d{1,2})", text)
+    if match:
+        try:
+            day = datetime.date(reference.year, int(match.group(1)), int(match.group(2)))
+        except ValueError:
+            return None
+        # 跨年：不带年份的日期晚于采集日期时属于上一年
+        return day.replace(year=day.year - 1) if day > reference else day
+    if any(word in text for word in ("刚刚", "今天", "分钟前", "小时前")):
+        return reference
+    if "昨天" in text:
+        return reference - datetime.timedelta(days=1)
+    match = re.search(r"(\d+)\s*天前", text)
+    if match:
+        return reference - datetime.timedelta(days=int(match.group(1)))
+    return None
+
+
+_SALARY_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(千|万|[kK]|元)?\s*(?:[-~～至到]\s*(\d+(?:\.\d+)?))?\s*(千|万|[kK]|元)?"
+    r"\s*(?:/|每)?\s*(月|年|天|日|小时|时)?"
+)
+_SALARY_UNITS = {"千": 1.0, "k": 1.0, "K": 1.0, "万": 10.0, "元": 0.001}
+_SALARY_PERIODS = {"年": 1 / 12, "天": 21.75, "日": 21.75, "小时": 21.75 * 8, "时": 21.75 * 8}
+
+
+def parse_monthly_salary(value: Any) -> Optional[float]:
+    """
+    薪资文本换算为月薪（千元，区间取中值），如 "1-1.5万/月" -> 12.5、"4.5-6千/月" -> 5.25、
+    "15-25K·13薪" -> 20、"20万/年" -> 16.7、"1.5万-2万/月" -> 17.5、"8千-1万" -> 9；"面议" 等无法解析时返回 None
+    """
+    text = _clean(value)
+    match = _SALARY_PATTERN.search(text)
+    if not match:
+        return None
+    low, low_unit, high, high_unit, period = match.groups()
+    # 区间两端可各自带单位；只写一个单位时两端共用
+    low_unit = low_unit or high_unit
+    high_unit = high_unit or low_unit
+    if low_unit:
+        amount = (float(low) * _SALARY_UNITS[low_unit] + float(high or low) * _SALARY_UNITS[high_unit]) / 2
+    else:
+        amount = (float(low) + float(high or low)) / 2
+        if amount >= 1000:
+            amount /= 1000  # 未写单位的大数按元计
+    amount *= _SALARY_PERIODS.get(period, 1.0)
+    return amount if amount > 0 else None
+
+
+def bucket_of(day: datetime.date, period: str) -> str:
+    """时间桶：周取当周周一（"2025-03-17"），月取 "2025-03" """
+    if period == PERIOD_WEEK:
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    return day.strftime("%Y-%m")
+
+
+def _histogram_median(histogram: Dict[float, int]) -> Optional[float]:
+    total = sum(histogram.values())
+    if not total:
+        return None
+    values = sorted(histogram)
+    lower_rank, upper_rank = (total - 1) // 2, total // 2
+    lower = upper = None
+    seen = 0
+    for value in values:
+        seen += histogram[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return (lower + upper) / 2
+
+
+@dataclass(frozen=True)
+class TrendPoint:
+    bucket: str  # 周："2025-03-17"（周一）；月："2025-03"
+    postings: int
+    median_salary: Optional[float]  # 月薪中位数（千元），没有可解析的薪资时为 None
+    salary_samples: int
+
+
+def extract_skills(row: Dict[str, Any]) -> List[str]:
+    """职位要求的技能（去重）：技能标签列逐个计入，名称/描述中按技能词表匹配"""
+    skills = []
+    for column in TAG_COLUMNS:
+        for tag in _TAG_SPLIT.split(_clean(row.get(column))):
+            if len(tag) > 1:
+                skills.append(_SKILL_CANONICAL.get(tag.lower(), tag))
+    text = " ".join(_clean(row.get(column)) for column in TITLE_COLUMNS + TEXT_COLUMNS)
+    skills.extend(_SKILL_CANONICAL[m.lower()] for m in _SKILL_PATTERN.findall(text))
+    return list(dict.fromkeys(skills))
+
+
+def normalize_title(title: str) -> str:
+    """去掉职位名称中的括号备注，如 "数据分析师（应届）" -> "数据分析师" """
+    return _BRACKETS.sub("", title).strip() or title
+
+
+def row_city(row: Dict[str, Any], default: str) -> str:
+    """工作地点取第一段（"深圳-南山区" -> "深圳"），缺失时使用文件名中的城市"""
+    location = _first(row, LOCATION_COLUMNS)
+    if location:
+        return _CITY_SPLIT.split(location, 1)[0]
+    return default
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    import pandas as pd
+
+    if path.endswith(".csv"):
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_excel(path)
+    return df.to_dict("records")
+
+
+# ==================== 索引 ====================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    city TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS term_counts (
+    source_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    city TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (source_id, field, term, city, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS term_counts_field_day ON term_counts (field, day);
+CREATE TABLE IF NOT EXISTS trend_buckets (
+    source_id INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    city TEXT NOT NULL,
+    postings INTEGER NOT NULL,
+    salaries TEXT NOT NULL,
+    PRIMARY KEY (source_id, period, bucket, city)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trend_buckets_period_bucket ON trend_buckets (period, bucket);
+"""
+SCHEMA_VERSION = 2  # 结构变化时递增，旧索引整体重建
+
+
+class JobIndex:
+    """assets/jobs_data 的增量词频索引（线程安全，写操作串行）"""
+
+    def __init__(self, data_dir: str = JOBS_DATA_DIR, db_path: str = JOB_INDEX_PATH):
+        self.data_dir = data_dir
+        self.db_path = db_path
+        self._write_lock = threading.Lock()
+        self._dir_state: Optional[Tuple] = None
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS term_counts; "
+                                   "DROP TABLE IF EXISTS trend_buckets;")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- 更新 ----------
+
+    def _data_files(self) -> Dict[str, os.stat_result]:
+        """目录中的数据文件；同一次爬取同时保存了 CSV 和 Excel 时只取较新的一个，避免重复计数"""
+        latest: Dict[str, Tuple[str, os.stat_result]] = {}
+        try:
+            with os.scandir(self.data_dir) as it:
+                for entry in it:
+                    if not entry.is_file() or not entry.name.endswith(DATA_FILE_SUFFIXES):
+                        continue
+                    stem = os.path.splitext(entry.name)[0]
+                    stat = entry.stat()
+                    if stem not in latest or stat.st_mtime_ns > latest[stem][1].st_mtime_ns:
+                        latest[stem] = (entry.path, stat)
+        except FileNotFoundError:
+            return {}
+        return {path: stat for path, stat in latest.values()}
+
+    def refresh(self, force: bool = False) -> int:
+        """统计新增/变化的文件并删除已不存在文件的计数，返回重新统计的文件数"""
+        files = self._data_files()
+        state = tuple(sorted((path, st.st_mtime_ns, st.st_size) for path, st in files.items()))
+        if not force and state == self._dir_state:
+            return 0
+
+        with self._write_lock:
+            with self._connect() as conn:
+                known = {path: (mtime_ns, size) for path, mtime_ns, size
+                         in conn.execute("SELECT path, mtime_ns, size FROM sources")}
+            for path in set(known) - set(files):
+                self._remove(path)
+            updated = 0
+            for path, stat in files.items():
+                if force or known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                    try:
+                        self._ingest(path, stat)
+                        updated += 1
+                    except Exception as e:
+                        logger.warning(f"Failed to index {path}: {e}")
+            self._dir_state = state
+        if updated:
+            logger.info(f"Job index updated: {updated} file(s)")
+        return updated
+
+    def _remove(self, path: str) -> None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM sources WHERE path = ?", (path,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM term_counts WHERE source_id = ?", row)
+                conn.execute("DELETE FROM trend_buckets WHERE source_id = ?", row)
+                conn.execute("DELETE FROM sources WHERE id = ?", row)
+
+    def _ingest(self, path: str, stat: os.stat_result) -> None:
+        rows = read_rows(path)
+        keyword, file_city = parse_source_name(path)
+        reference = datetime.date.fromtimestamp(stat.st_mtime)
+
+        counts: Dict[Tuple[str, str, str, str], int] = {}
+
+        # (周期, 时间桶, 城市) -> [职位数, {月薪分档: 职位数}]
+        trends: Dict[Tuple[str, str, str], list] = {}
+
+        def _add(field: str, term: str, city: str, day: str) -> None:
+            key = (field, term, city, day)
+            counts[key] = counts.get(key, 0) + 1
+
+        for row in rows:
+            city = row_city(row, file_city)
+            published = parse_publish_date(_first(row, DATE_COLUMNS) or None, reference)
+            day = published.isoformat() if published else ""
+            if published:
+                salary = parse_monthly_salary(_first(row, SALARY_COLUMNS))
+                for period in (PERIOD_WEEK, PERIOD_MONTH):
+                    bucket = trends.setdefault((period, bucket_of(published, period), city), [0, {}])
+                    bucket[0] += 1
+                    if salary is not None:
+                        salary_bin = round(salary / SALARY_BIN) * SALARY_BIN
+                        bucket[1][salary_bin] = bucket[1].get(salary_bin, 0) + 1
+            title = _first(row, TITLE_COLUMNS)
+            if title:
+                _add(FIELD_TITLE, normalize_title(title), city, day)
+            company = _first(row, COMPANY_COLUMNS)
+            if company:
+                _add(FIELD_COMPANY, company, city, day)
+            for skill in extract_skills(row):
+                _add(FIELD_SKILL, skill, city, day)
+
+        # 文件内容变化时整体替换该文件的计数
+        self._remove(path)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO sources (path, mtime_ns, size, keyword, city, rows) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, keyword, file_city, len(rows)),
+            )
+            source_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO term_counts (source_id, field, term, city, day, count) VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_id, *key, count) for key, count in counts.items()],
+            )
+            conn.executemany(
+                "INSERT INTO trend_buckets (source_id, period, bucket, city, postings, salaries) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_id, *key, postings, json.dumps(histogram))
+                 for key, (postings, histogram) in trends.items()],
+            )
+
+    # ---------- 查询 ----------
+
+    @staticmethod
+    def _filters(keyword: Optional[str], city: Optional[str], days: Optional[int],
+                 today: Optional[datetime.date]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if keyword:
+            # 关键词与文件名中的搜索词互相包含即可匹配（"数据分析师" ~ "数据分析"）
+            clauses.append("(instr(?, s.keyword) > 0 OR instr(s.keyword, ?) > 0)")
+            params += [keyword, keyword]
+        if city:
+            clauses.append("t.city = ?")
+            params.append(city)
+        if days:
+            since = (today or datetime.date.today()) - datetime.timedelta(days=days)
+            clauses.append("t.day >= ?")
+            params.append(since.isoformat())
+        return (" AND " + " AND ".join(clauses)) if clauses else "", params
+
+    def top_terms(self, field: str, keyword: Optional[str] = None, city: Optional[str] = None,
+                  days: Optional[int] = None, limit: int = 20,
+                  today: Optional[datetime.date] = None) -> List[Tuple[str, int]]:
+        """
+        出现次数最多的前 limit 个词
+
+        Args:
+            field: "skill"、"title" 或 "company"
+            keyword: 搜索关键词（匹配数据文件名中的关键词）
+            city: 城市
+            days: 只统计最近 days 天发布的职位（没有发布时间的职位不计入）
+        """
+        where, params = self._filters(keyword, city, days, today)
+        sql = (
+            "SELECT t.term, SUM(t.count) AS n FROM term_counts t JOIN sources s ON s.id = t.source_id "
+            f"WHERE t.field = ?{where} GROUP BY t.term ORDER BY n DESC, t.term LIMIT ?"
+        )
+        with self._connect() as conn:
+            return [(term, int(n)) for term, n in conn.execute(sql, [field, *params, limit])]
+
+    def posting_count(self, keyword: Optional[str] = None, city: Optional[str] = None,
+                      days: Optional[int] = None, today: Optional[datetime.date] = None) -> int:
+        """符合条件的职位数（每个职位恰有一个职位名称）"""
+        where, params = self._filters(keyword, city, days, today)
+        sql = (
+            "SELECT COALESCE(SUM(t.count), 0) FROM term_counts t JOIN sources s ON s.id = t.source_id "
+            f"WHERE t.field = ?{where}"
+        )
+        with self._connect() as conn:
+            return int(conn.execute(sql, [FIELD_TITLE, *params]).fetchone()[0])
+
+    def trend(self, keyword: Optional[str] = None, city: Optional[str] = None, period: str = PERIOD_MONTH,
+              since: Optional[datetime.date] = None, until: Optional[datetime.date] = None) -> List[TrendPoint]:
+        """
+        按时间桶汇总的职位数与月薪中位数（按时间升序）
+
+        Args:
+            keyword: 搜索关键词（匹配数据文件名中的关键词）
+            city: 城市
+            period: "week" 或 "month"
+            since/until: 只返回该日期范围内的时间桶（含两端所在的桶）
+        """
+        clauses, params = ["t.period = ?"], [period]
+        if keyword:
+            clauses.append("(instr(?, s.keyword) > 0 OR instr(s.keyword, ?) > 0)")
+            params += [keyword, keyword]
+        if city:
+            clauses.append("t.city = ?")
+            params.append(city)
+        if since:
+            clauses.append("t.bucket >= ?")
+            params.append(bucket_of(since, period))
+        if until:
+            clauses.append("t.bucket <= ?")
+            params.append(bucket_of(until, period))
+        sql = (
+            "SELECT t.bucket, t.postings, t.salaries FROM trend_buckets t JOIN sources s ON s.id = t.source_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY t.bucket"
+        )
+
+        merged: Dict[str, list] = {}
+        with self._connect() as conn:
+            for bucket, postings, salaries in conn.execute(sql, params):
+                entry = merged.setdefault(bucket, [0, {}])
+                entry[0] += postings
+                for salary_bin, n in json.loads(salaries).items():
+                    entry[1][float(salary_bin)] = entry[1].get(float(salary_bin), 0) + n
+        return [
+            TrendPoint(bucket, postings, _histogram_median(histogram), sum(histogram.values()))
+            for bucket, (postings, histogram) in merged.items()
+        ]
+
+
+_index: Optional[JobIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_job_index(refresh: bool = True) -> JobIndex:
+    """进程内共享的索引；默认先同步目录中的变化（只 stat 文件，未变化时不读取数据）"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = JobIndex()
+    if refresh:
+        _index.refresh()
+    return _index
+
+
+def top_terms(field: str, keyword: Optional[str] = None, city: Optional[str] = None,
+              days: Optional[int] = None, limit: int = 20) -> List[Tuple[str, int]]:
+    """查询本地招聘数据的高频词；索引不可用时返回空列表，调用方回退到示例数据"""
+    try:
+        return get_job_index().top_terms(field, keyword=keyword, city=city, days=days, limit=limit)
+    except Exception as e:
+        logger.warning(f"Job index query failed: {e}")
+        return []
+
+
+def trend(keyword: Optional[str] = None, city: Optional[str] = None, period: str = PERIOD_MONTH,
+          last: Optional[int] = None) -> List[TrendPoint]:
+    """查询本地招聘数据的时间趋势，last 只保留最近的若干个时间桶；索引不可用时返回空列表"""
+    try:
+        points = get_job_index().trend(keyword=keyword, city=city, period=period)
+    except Exception as e:
+        logger.warning(f"Job index trend query failed: {e}")
+        return []
+    return points[-last:] if last else points
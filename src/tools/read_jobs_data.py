@@ -5,12 +5,13 @@
 """
 
 import os
-import pandas as pd
 from langchain.tools import tool
+from tools.tool_cache import memoize_tool
 from typing import Optional
 
 
 @tool
+@memoize_tool(ttl=600, watch=["assets/jobs_data"])
 def read_local_jobs(
     keyword: str,
     file_type: str = "excel",
@@ -53,6 +54,8 @@ def read_local_jobs(
         )
 
     try:
+        import pandas as pd
+
         # 读取文件
         if file_type == "excel":
             df = pd.read_excel(file_path)
@@ -137,6 +140,7 @@ def read_local_jobs(
 
 
 @tool
+@memoize_tool(ttl=600, watch=["assets/jobs_data"])
 def list_available_jobs() -> str:
     """
     列出所有可用的招聘数据文件
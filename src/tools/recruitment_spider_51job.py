@@ -6,7 +6,6 @@
 import re
 import time
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote
 from langchain.tools import tool
 
@@ -56,6 +55,8 @@ def search_51job(
             f"&keywordtype=2&lang=c&stype=2&postchannel=0000&fromType=1&confirmdate=9"
         )
         
+        from bs4 import BeautifulSoup
+
         # 初始化数据保存器
         saver = DataSaver(keyword, citys)
         
@@ -0,0 +1,319 @@
+"""
+HTML报告的渲染资源
+
+- Markdown 在服务端渲染为 HTML，代码块用 Pygments 高亮（替代浏览器端的 marked.js + highlight.js），
+  渲染结果按内容哈希缓存，同一段分析内容重复生成报告时不再重新解析
+- 与原 marked.js 渲染的差异：正文中的原始 HTML 按文本转义输出（内容来自模型生成，避免注入标签和脚本）；
+  裸 URL 与 marked 一样自动转为链接
+
+离线导出（offline=True）时报告不依赖任何外部网络：
+- assets/charts 下的图表缩放、重新压缩后以 base64 data URI 内联（默认 WebP）
+- Font Awesome 从本地 vendor 目录读取，只保留报告用到的图标规则，字体文件内联；
+  vendor 目录不存在时不加载图标字体，图标位置留空，页面其余部分不受影响
+- Google Fonts 不再引用，回退到系统字体
+"""
+
+import os
+import re
+import io
+import base64
+import hashlib
+import threading
+import mimetypes
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from markupsafe import Markup
+
+from tools.chart_store import touch_chart
+
+REPORT_IMAGE_MAX_WIDTH = int(os.getenv("REPORT_IMAGE_MAX_WIDTH", "1280"))
+REPORT_IMAGE_FORMAT = os.getenv("REPORT_IMAGE_FORMAT", "webp").lower()  # webp / png
+REPORT_IMAGE_QUALITY = int(os.getenv("REPORT_IMAGE_QUALITY", "85"))
+CODE_HIGHLIGHT_STYLE = "github-dark"
+MARKDOWN_CACHE_SIZE = int(os.getenv("MARKDOWN_CACHE_SIZE", "256"))
+
+
+def _workspace_path() -> str:
+    return os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+
+
+def charts_dir() -> str:
+    return os.path.join(_workspace_path(), "assets", "charts")
+
+
+def vendor_dir() -> str:
+    """本地化的第三方前端资源目录，可用 REPORT_VENDOR_DIR 指定"""
+    return os.getenv("REPORT_VENDOR_DIR") or os.path.join(_workspace_path(), "assets", "vendor")
+
+
+# ==================== Markdown ====================
+# markdown-it / Pygments 在首次生成报告时才导入
+
+@lru_cache(maxsize=1)
+def _formatter():
+    from pygments.formatters import HtmlFormatter
+    return HtmlFormatter(nowrap=True, style=CODE_HIGHLIGHT_STYLE)
+
+
+def _highlight_code(code: str, lang: str, attrs: str) -> str:
+    """未指定或无法识别语言时返回空串，由 markdown-it 按普通代码块转义输出"""
+    from pygments import highlight
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    if not lang:
+        return ""
+    try:
+        lexer = get_lexer_by_name(lang)
+    except ClassNotFound:
+        return ""
+    return highlight(code, lexer, _formatter())
+
+
+# 裸 URL（GFM 自动链接）；结尾的标点不算在链接内
+_BARE_URL_RE = re.compile(r"(?:https?://|www\.)[^\s<>\"'（）【】，。；：！？、]+[^\s<>\"'（）【】，。；：！？、.,;:!?)\]]")
+
+
+def _autolink_bare_urls(state) -> None:
+    """core 规则：把链接之外的文本中的裸 URL 转为链接（markdown-it 自带的 linkify 需要额外依赖 linkify-it-py）"""
+    from markdown_it.token import Token
+
+    for block in state.tokens:
+        if block.type != "inline" or not block.children:
+            continue
+        children, link_depth = [], 0
+        for token in block.children:
+            if token.type == "link_open":
+                link_depth += 1
+            elif token.type == "link_close":
+                link_depth -= 1
+            if token.type != "text" or link_depth or not _BARE_URL_RE.search(token.content):
+                children.append(token)
+                continue
+            pos = 0
+            for match in _BARE_URL_RE.finditer(token.content):
+                url = match.group(0)
+                href = state.md.normalizeLink(url if url.startswith("http") else "http://" + url)
+                if not state.md.validateLink(href):
+                    continue
+                if match.start() > pos:
+                    children.append(_text_token(token.content[pos:match.start()], token.level))
+                children.append(Token("link_open", "a", 1, attrs={"href": href}, level=token.level))
+                children.append(_text_token(url, token.level + 1))
+                children.append(Token("link_close", "a", -1, level=token.level))
+                pos = match.end()
+            if pos < len(token.content):
+                children.append(_text_token(token.content[pos:], token.level))
+        block.children = children
+
+
+def _text_token(content: str, level: int):
+    from markdown_it.token import Token
+    return Token("text", "", 0, content=content, level=level)
+
+
+@lru_cache(maxsize=1)
+def _markdown_parser():
+    from markdown_it import MarkdownIt
+    md = (
+        MarkdownIt("commonmark", {"breaks": True, "html": False, "highlight": _highlight_code})
+        .enable("table")
+        .enable("strikethrough")
+    )
+    md.core.ruler.push("autolink_bare_urls", _autolink_bare_urls)
+    return md
+
+
+_markdown_cache: "OrderedDict[str, str]" = OrderedDict()
+_markdown_cache_lock = threading.Lock()
+
+
+def render_markdown(text: Optional[str]) -> Markup:
+    """Markdown 转 HTML（GFM 表格/删除线，换行即 <br>，裸 URL 自动链接，原始 HTML 按文本转义）"""
+    text = text or ""
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _markdown_cache_lock:
+        html = _markdown_cache.get(key)
+        if html is not None:
+            _markdown_cache.move_to_end(key)
+            return Markup(html)
+
+    html = _markdown_parser().render(text)
+    with _markdown_cache_lock:
+        _markdown_cache[key] = html
+        while len(_markdown_cache) > MARKDOWN_CACHE_SIZE:
+            _markdown_cache.popitem(last=False)
+    return Markup(html)
+
+
+@lru_cache(maxsize=1)
+def highlight_css(scope: str = ".section-content pre") -> str:
+    """代码高亮样式，作用域限定在报告正文的代码块内"""
+    return _formatter().get_style_defs(scope)
+
+
+# ==================== 图片内联 ====================
+
+def resolve_chart_path(src: str) -> Optional[str]:
+    """只内联 assets/charts 下已存在的文件；外链和 data URI 保持不变"""
+    if not src or re.match(r"^(?:[a-z][a-z0-9+.-]*:|//)", src, re.I):
+        return None
+    # markdown-it 会对图片地址做百分号编码
+    name = os.path.basename(unquote(src).replace("\\", "/"))
+    path = os.path.join(charts_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+@lru_cache(maxsize=256)
+def _encode_image(path: str, mtime_ns: int, size: int, fmt: str, max_width: int, quality: int) -> str:
+    """mtime/size 作为缓存键的一部分，图表被重新生成后自动失效"""
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+    if Image is not None:
+        try:
+            with Image.open(path) as img:
+                img.load()
+                if img.width > max_width:
+                    height = round(img.height * max_width / img.width)
+                    img = img.resize((max_width, height), Image.LANCZOS)
+                buf = io.BytesIO()
+                if fmt == "webp":
+                    img.save(buf, format="WEBP", quality=quality, method=6)
+                    mime = "image/webp"
+                else:
+                    if img.mode not in ("RGB", "RGBA", "L", "P"):
+                        img = img.convert("RGBA")
+                    img.save(buf, format="PNG", optimize=True)
+                    mime = "image/png"
+                return f"data:{mime};base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+        except OSError:
+            pass
+
+    # 无法解码的图片原样内联
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def image_data_uri(path: str) -> str:
+    stat = os.stat(path)
+    return _encode_image(path, stat.st_mtime_ns, stat.st_size,
+                         REPORT_IMAGE_FORMAT, REPORT_IMAGE_MAX_WIDTH, REPORT_IMAGE_QUALITY)
+
+
+_IMG_SRC_PATTERN = re.compile(r'(<img\b[^>]*?\bsrc=")([^"]*)(")')
+
+
+def inline_images(html: str) -> Markup:
+    """把已渲染 HTML 中引用本地图表的 <img> 替换为 data URI"""
+    def _replace(match: re.Match) -> str:
+        path = resolve_chart_path(match.group(2))
+        if path is None:
+            return match.group(0)
+        touch_chart(path)
+        return f"{match.group(1)}{image_data_uri(path)}{match.group(3)}"
+
+    return Markup(_IMG_SRC_PATTERN.sub(_replace, str(html)))
+
+
+def chart_images(charts: Optional[Iterable[str]], offline: bool) -> List[Tuple[str, str]]:
+    """报告附带的图表：[(标题, src)]，在线模式引用相对路径，离线模式内联"""
+    images = []
+    for name in charts or []:
+        path = resolve_chart_path(name)
+        if path is None:
+            continue
+        touch_chart(path)
+        filename = os.path.basename(path)
+        src = image_data_uri(path) if offline else f"../charts/{filename}"
+        images.append((os.path.splitext(filename)[0], src))
+    return images
+
+
+# ==================== 图标字体 ====================
+
+_FA_STYLE_PREFIXES = {"fas": "fa-solid", "far": "fa-regular", "fab": "fa-brands"}
+_FA_ICON_RULE = re.compile(r"^(?:\.fa-[a-z0-9-]+:{1,2}(?:before|after)\s*,?\s*)+$")
+_CSS_URL = re.compile(r"url\(([^)]+)\)(\s*format\([^)]*\))?")
+
+
+def used_icons(*sources: str) -> Tuple[Set[str], Set[str]]:
+    """从模板源码等文本中收集用到的图标名和样式前缀"""
+    icons: Set[str] = set()
+    styles: Set[str] = set()
+    for source in sources:
+        icons.update(re.findall(r"\bfa-[a-z0-9-]+", source))
+        styles.update(s for s in re.findall(r"\b(fas|far|fab)\b", source))
+    return icons, styles
+
+
+def _inline_font_urls(block: str, base: str) -> Optional[str]:
+    """@font-face 只保留本地存在的 woff2 源并内联；没有可用字体时丢弃整条规则"""
+    sources = []
+    for match in _CSS_URL.finditer(block):
+        url = match.group(1).strip("'\"")
+        if not url.endswith(".woff2"):
+            continue
+        path = os.path.normpath(os.path.join(base, url))
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                data = base64.b64encode(f.read()).decode("ascii")
+            sources.append(f'url(data:font/woff2;base64,{data}) format("woff2")')
+    if not sources:
+        return None
+    return re.sub(r"src\s*:[^;}]*", "src:" + ",".join(sources), block)
+
+
+def _split_rules(css: str) -> List[str]:
+    """按顶层花括号切分规则，@keyframes/@media 等嵌套块整体保留"""
+    rules, depth, start = [], 0, 0
+    for i, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:i + 1])
+                start = i + 1
+    return rules
+
+
+def subset_icon_css(css: str, base: str, icons: Set[str], styles: Set[str]) -> str:
+    """去掉未使用图标的 content 规则和未使用样式的字体"""
+    wanted_fonts = {_FA_STYLE_PREFIXES[s] for s in styles}
+    parts = []
+    for rule in _split_rules(css):
+        selector = rule.split("{", 1)[0].strip()
+        if selector.startswith("@font-face"):
+            if not any(prefix in rule for prefix in wanted_fonts):
+                continue
+            rule = _inline_font_urls(rule, base)
+            if rule is None:
+                continue
+        elif _FA_ICON_RULE.match(selector):
+            names = set(re.findall(r"fa-[a-z0-9-]+", selector))
+            if not names & icons:
+                continue
+        parts.append(rule.strip())
+    return "".join(parts)
+
+
+@lru_cache(maxsize=8)
+def _icon_css(css_path: str, mtime_ns: int, icons: frozenset, styles: frozenset) -> str:
+    with open(css_path, "r", encoding="utf-8") as f:
+        css = f.read()
+    return subset_icon_css(css, os.path.dirname(css_path), set(icons), set(styles))
+
+
+def vendor_css(icons: Set[str], styles: Set[str]) -> str:
+    """本地 Font Awesome 的子集样式；未提供 vendor 资源时返回空串"""
+    css_path = os.path.join(vendor_dir(), "fontawesome", "css", "all.min.css")
+    if not os.path.isfile(css_path):
+        return ""
+    return _icon_css(css_path, os.stat(css_path).st_mtime_ns, frozenset(icons), frozenset(styles))
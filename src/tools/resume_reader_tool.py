@@ -4,6 +4,7 @@
 """
 
 from langchain.tools import tool, ToolRuntime
+from tools.tool_cache import memoize_tool
 import os
 from typing import Optional
 
@@ -125,6 +126,14 @@ def _read_text_file(file_path: str) -> str:
         return f.read().decode('utf-8', errors='ignore')
 
 
+def _resume_dir(params: dict) -> str:
+    """list_resume_files 监视的目录（与工具内的路径解析一致）"""
+    directory = params.get("directory") or "assets/resumes"
+    if os.path.isabs(directory):
+        return directory
+    return os.path.join(os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects"), directory)
+
+
 @tool
 def read_resume_file(
     file_path: str, 
@@ -211,6 +220,7 @@ def read_resume_file(
 
 
 @tool
+@memoize_tool(ttl=600, watch=[_resume_dir])
 def list_resume_files(
     directory: str = "assets/resumes",
     runtime: ToolRuntime = None
@@ -0,0 +1,247 @@
+"""
+工具结果缓存
+
+列表类工具（list_available_jobs、list_resume_files）、搜索类工具和图表/词云生成工具
+在参数相同、底层数据未变化时结果相同，而模型在同一会话及不同会话中经常重复调用。
+memoize_tool 以声明方式为这些函数加上进程内缓存：
+
+- 每个工具单独设置 TTL 和容量（LRU）
+- 参数规范化：按签名绑定默认值、字符串去除多余空白、忽略 runtime 等运行时参数
+- 失效：监视目录/文件（如 assets/jobs_data 中新增文件）、校验结果中引用的输出文件未被删除或覆盖，
+  以及手动调用 invalidate_tool_cache
+- 每个工具的命中/未命中统计，见 get_tool_cache_metrics
+
+用法（放在 @tool 下方，保持函数签名和 docstring 不变）：
+
+    @tool
+    @memoize_tool(ttl=600, watch=["assets/jobs_data"])
+    def list_available_jobs() -> str:
+        ...
+"""
+
+import os
+import re
+import json
+import time
+import inspect
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "1") != "0"
+DEFAULT_TOOL_CACHE_TTL = 300  # 秒
+DEFAULT_TOOL_CACHE_SIZE = 128  # 每个工具最多缓存的结果数
+
+# 工具返回文本中引用的输出文件（图表、词云、报告）
+OUTPUT_PATH_RE = re.compile(r"assets/[^\s`'\"()（）<>|*，。；]+\.(?:png|jpe?g|html?|svg|pdf)")
+
+WatchSpec = Union[str, Callable[[Dict[str, Any]], Optional[str]]]
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+def _normalize(value: Any) -> Any:
+    """参数规范化：字符串折叠空白，容器递归处理，字典按键排序"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _path_fingerprint(path: str) -> Fingerprint:
+    """目录取各文件的 (名称, mtime, 大小)，文件取自身；不存在时为空"""
+    try:
+        if os.path.isdir(path):
+            with os.scandir(path) as it:
+                entries = []
+                for entry in it:
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_mtime_ns, st.st_size))
+            return tuple(sorted(entries))
+        st = os.stat(path)
+        return ((path, st.st_mtime_ns, st.st_size),)
+    except OSError:
+        return ()
+
+
+def _output_paths(value: str) -> List[str]:
+    return list(dict.fromkeys(OUTPUT_PATH_RE.findall(value)))
+
+
+def _outputs_fingerprint(paths: Iterable[str]) -> Fingerprint:
+    result = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            result.append((path, -1, -1))
+        else:
+            result.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(result)
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires_at", "watch_fp", "outputs", "outputs_fp")
+
+    def __init__(self, value, expires_at, watch_fp, outputs, outputs_fp):
+        self.value = value
+        self.expires_at = expires_at
+        self.watch_fp = watch_fp
+        self.outputs = outputs
+        self.outputs_fp = outputs_fp
+
+
+class ToolCache:
+    """单个工具的缓存：TTL + LRU + 依赖文件指纹"""
+
+    def __init__(self, name: str, *, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, watch_fp: Fingerprint) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stale = (
+                    entry.expires_at < time.monotonic()
+                    or entry.watch_fp != watch_fp
+                    or (entry.outputs and _outputs_fingerprint(entry.outputs) != entry.outputs_fp)
+                )
+                if stale:
+                    del self._entries[key]
+                    self.invalidations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry.value
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any, watch_fp: Fingerprint, outputs: Sequence[str] = ()) -> None:
+        entry = _CacheEntry(value, time.monotonic() + self.ttl, watch_fp, tuple(outputs), _outputs_fingerprint(outputs))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+            }
+
+
+_registry: Dict[str, ToolCache] = {}
+_registry_lock = threading.Lock()
+
+
+def memoize_tool(
+    ttl: float = DEFAULT_TOOL_CACHE_TTL,
+    *,
+    maxsize: int = DEFAULT_TOOL_CACHE_SIZE,
+    watch: Sequence[WatchSpec] = (),
+    track_outputs: bool = False,
+    ignore: Sequence[str] = ("runtime",),
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    on_hit: Optional[Callable[[List[str]], None]] = None,
+):
+    """
+    工具结果缓存装饰器
+
+    Args:
+        ttl: 结果有效期（秒）
+        maxsize: 最多缓存的不同参数组合数
+        watch: 依赖的目录/文件；可以是路径，也可以是根据规范化后的参数返回路径的函数
+        track_outputs: 记录结果中引用的 assets/ 输出文件，文件被删除或覆盖后缓存失效
+        ignore: 不参与缓存键的参数名（运行时上下文等）
+        cache_if: 判断结果是否可缓存；默认不缓存以 ❌/⚠️/错误 开头的提示
+        on_hit: 缓存命中时以结果中引用的输出文件调用（需 track_outputs），如把复用的图表登记到当前会话
+    """
+    should_cache = cache_if or (lambda r: not (isinstance(r, str) and r.lstrip().startswith(("❌", "⚠️", "错误"))))
+
+    def decorator(func: Callable) -> Callable:
+        sig = inspect.signature(func)
+        cache = ToolCache(func.__name__, ttl=ttl, maxsize=maxsize)
+        with _registry_lock:
+            _registry[func.__name__] = cache
+
+        def _key_and_watch(args, kwargs) -> Tuple[str, Fingerprint]:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: _normalize(v) for k, v in bound.arguments.items() if k not in ignore}
+            key = json.dumps(params, ensure_ascii=False, sort_keys=True, default=repr)
+            fp: List[Tuple[str, int, int]] = []
+            for spec in watch:
+                path = spec(params) if callable(spec) else spec
+                if path:
+                    fp.append((path, 0, 0))
+                    fp.extend(_path_fingerprint(path))
+            return key, tuple(fp)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TOOL_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            key, watch_fp = _key_and_watch(args, kwargs)
+            hit, value = cache.get(key, watch_fp)
+            if hit:
+                logger.debug(f"Tool cache hit: {cache.name}")
+                if on_hit is not None and track_outputs and isinstance(value, str):
+                    on_hit(_output_paths(value))
+                return value
+            value = func(*args, **kwargs)
+            if should_cache(value):
+                outputs = _output_paths(value) if track_outputs and isinstance(value, str) else []
+                cache.put(key, value, watch_fp, outputs)
+            return value
+
+        wrapper.tool_cache = cache
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tool_cache(*tool_names: str) -> None:
+    """清空指定工具的缓存；不传参数时清空全部，供写入数据目录的代码调用"""
+    with _registry_lock:
+        caches = [_registry[n] for n in tool_names if n in _registry] if tool_names else list(_registry.values())
+    for cache in caches:
+        cache.clear()
+
+
+def get_tool_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """各工具缓存的命中/未命中统计"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.metrics() for cache in caches}
+
+
+__all__ = [
+    "memoize_tool",
+    "invalidate_tool_cache",
+    "get_tool_cache_metrics",
+]
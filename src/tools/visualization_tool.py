@@ -10,50 +10,330 @@
 
 import os
 import json
-import matplotlib
-matplotlib.use('Agg')  # 使用非交互式后端
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import pandas as pd
-import numpy as np
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Any, Tuple
 from langchain.tools import tool
-
-# 配置中文字体支持 - 使用已安装的中文字体
-# 优先使用 WenQuanYi Zen Hei，其次使用 Micro Hei
-chinese_font = 'WenQuanYi Zen Hei'  # 文泉驿正黑
+from tools.tool_cache import memoize_tool
+from tools.font_registry import configure_matplotlib
+from tools import job_index
+from tools.chart_store import chart_path, claim_charts, register_chart, get_chart_store, current_session_id
+
+CHART_DPI = int(os.getenv("CHART_DPI", "300"))  # 单独生成的图表
+REPORT_CHART_DPI = int(os.getenv("REPORT_CHART_DPI", "200"))  # 综合报告中的图表
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", str(min(3, os.cpu_count() or 1))))
+
+# 未提供数据时使用随机生成的示例数据；这类结果每次都不同，不缓存，也就不会通过缓存命中分给其它会话
+SAMPLE_DATA_WARNING = "> ⚠️ {panels}未提供数据，使用随机生成的示例数据绘制，仅作演示，不代表真实市场情况\n\n"
+_SAMPLE_DATA_MARK = "随机生成的示例数据"
+
+
+def _cacheable_chart_result(result: Any) -> bool:
+    """只缓存基于真实数据生成的图表；错误提示与示例数据结果不缓存"""
+    if not isinstance(result, str):
+        return True
+    return not result.lstrip().startswith(("❌", "⚠️", "错误")) and _SAMPLE_DATA_MARK not in result
+
+# matplotlib/numpy 在首次绘图时才导入：注册工具（import agents.agent）时不再扫描系统字体、加载样式
+# 中文字体由 font_registry 统一解析（与词云工具共用，结果持久化缓存）
+#
+# 绘图不经过 pyplot：pyplot 维护进程级的“当前图表”和图表注册表，多个线程同时绘图会互相干扰。
+# 每次绘图新建独立的 Figure + FigureCanvasAgg，图表对象用完即释放。
+# 样式与中文字体在首次绘图前写入 rcParams（只写一次，之后只读）；rc_context 等临时修改全局 rcParams 的
+# 方式在多线程下并不安全，单次调用的差异化样式直接作为参数传给各个绘图元素
+chinese_font = None  # 使用的中文字体族名
 font_found = False
 
-# 检查字体是否存在
-available_fonts = set(f.name for f in fm.fontManager.ttflist)
-if chinese_font in available_fonts:
-    plt.rcParams['font.sans-serif'] = [chinese_font, 'WenQuanYi Micro Hei', 'DejaVu Sans']
-    font_found = True
-else:
-    # 尝试其他中文字体
-    for font_name in ['WenQuanYi Micro Hei', 'AR PL UMing CN', 'AR PL UKai CN']:
-        if font_name in available_fonts:
-            plt.rcParams['font.sans-serif'] = [font_name, 'DejaVu Sans']
-            chinese_font = font_name
+_mpl_ready = False
+_mpl_lock = threading.Lock()
+
+
+def _init_matplotlib() -> None:
+    """完成中文字体与图表样式配置（只执行一次）"""
+    global _mpl_ready, chinese_font, font_found
+    if _mpl_ready:
+        return
+    with _mpl_lock:
+        if _mpl_ready:
+            return
+
+        import matplotlib
+        import matplotlib.style
+
+        # 设置图表样式；样式表自带字体列表，中文字体须在样式之后设置
+        try:
+            matplotlib.style.use('seaborn-v0_8')
+        except OSError:
+            # 如果seaborn-v0_8不可用，使用默认样式
+            matplotlib.style.use('default')
+
+        font = configure_matplotlib(matplotlib)
+        if font is not None:
+            chinese_font = font.family
             font_found = True
-            break
-    
-    if not font_found:
-        print(f"⚠️ 警告：未找到中文字体，使用默认字体")
-        print(f"可用的中文字体: {[f for f in available_fonts if 'WenQuanYi' in f or 'AR PL' in f or 'WQY' in f]}")
-        plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
+        else:
+            print(f"⚠️ 警告：未找到中文字体，使用默认字体")
+
+        _mpl_ready = True
+
+
+def _new_figure(figsize: Tuple[float, float], nrows: int = 1, ncols: int = 1, **kwargs):
+    """新建独立的 Figure（Agg 画布），返回 (fig, axes)；参数同 Figure.subplots"""
+    _init_matplotlib()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols, **kwargs)
+
+
+def _colormap(name: str):
+    import matplotlib
+    return matplotlib.colormaps[name]
+
+
+# ==================== 图表面板 ====================
+# 每种图表拆成“绘制到给定坐标轴”和“生成文字说明”两部分：单图工具与综合报告共用同一套绘制代码，
+# 综合报告可以把多个面板画进同一张图，统计说明也只计算一次
+
+def _save_figure(fig, filepath: str, dpi: int = CHART_DPI) -> None:
+    """先写临时文件再原子替换，列表/报告不会读到写了一半的图片"""
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        fig.savefig(tmp_path, dpi=dpi, bbox_inches='tight', format='png')
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _draw_salary(ax, job_title: str, salary_ranges: List[str], counts: List[int], data_note: str = "") -> None:
+    # 绘制柱状图
+    bars = ax.bar(salary_ranges, counts, color='steelblue', edgecolor='navy', alpha=0.7)
+
+    # 添加数值标签
+    for bar, count in zip(bars, counts):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{count}',
+               ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # 设置图表标题和标签
+    ax.set_xlabel('薪资区间', fontsize=12, fontweight='bold')
+    ax.set_ylabel('岗位数量', fontsize=12, fontweight='bold')
+    ax.set_title(f'{job_title} 薪资分布图 {data_note}',
+                fontsize=14, fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    # 添加统计信息
+    stats_text = f'总岗位数: {sum(counts)} | 平均薪资区间: {salary_ranges[len(salary_ranges) // 2]}'
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
+           fontsize=10, verticalalignment='top',
+           bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+
+def _salary_summary(job_title: str, salary_ranges: List[str], counts: List[int], data_source: str,
+                    filepath: str) -> str:
+    total_jobs = sum(counts)
+    max_index = counts.index(max(counts))
+    result = f"""
+## 📊 薪资分布图已生成
+
+**职位名称**：{job_title}
+**数据来源**：{data_source}
+**图表类型**：柱状图
+**保存路径**：{filepath}
+
+### 📈 数据概览
+- 总岗位数：{total_jobs}
+- 薪资区间：{salary_ranges[0]} 至 {salary_ranges[-1]}
+- 主要集中区间：{salary_ranges[max_index]}
+
+### 💡 分析建议
+"""
+    # 添加分析建议
+    result += f"- 该职位的主流薪资区间为 **{salary_ranges[max_index]}**，占所有岗位的 {counts[max_index]/total_jobs*100:.1f}%\n"
+    result += f"- 建议求职者根据自身能力，目标定在 {salary_ranges[max_index]} 及以上区间\n"
+    result += f"- 若想获得更高薪资（{salary_ranges[-1]}），建议提升核心技能和项目经验\n"
+    return result
+
+
+def _draw_trend(ax, title: str, labels: List[str], values: List[float], chart_type: str = "line",
+                unit: str = "岗位数") -> None:
+    if chart_type == "line":
+        # 折线图
+        ax.plot(labels, values, marker='o', linewidth=2, markersize=8,
+               color='#2E86AB', markerfacecolor='#A23B72')
+        ax.fill_between(labels, values, alpha=0.3, color='#2E86AB')
+    else:
+        # 柱状图
+        bars = ax.bar(labels, values, color='#F18F01', edgecolor='#C73E1D', alpha=0.8)
+        for bar, value in zip(bars, values):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                   f'{value}', ha='center', va='bottom', fontsize=10)
+
+    # 设置图表标题和标签
+    ax.set_xlabel('时间', fontsize=12, fontweight='bold')
+    ax.set_ylabel(unit, fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    # 添加趋势信息
+    if len(values) >= 2:
+        growth_rate = ((values[-1] - values[0]) / values[0]) * 100
+        trend_text = f'增长趋势: {"上升" if growth_rate > 0 else "下降"} {abs(growth_rate):.1f}%'
+        ax.text(0.02, 0.98, trend_text, transform=ax.transAxes,
+               fontsize=10, verticalalignment='top',
+               bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.5))
+
+
+def _trend_summary(title: str, labels: List[str], values: List[float], chart_type: str, unit: str,
+                   filepath: str) -> str:
+    result = f"""
+## 📈 趋势图已生成
+
+**图表标题**：{title}
+**图表类型**：{"折线图" if chart_type == "line" else "柱状图"}
+**数据点数**：{len(values)}
+**保存路径**：{filepath}
+
+### 📊 数据分析
+"""
+    # 添加趋势分析
+    if len(values) >= 2:
+        growth_rate = ((values[-1] - values[0]) / values[0]) * 100
+        result += f"- 整体趋势：{'上升 📈' if growth_rate > 0 else '下降 📉'}\n"
+        result += f"- 增长幅度：{abs(growth_rate):.1f}%\n"
+        result += f"- 最低值：{min(values)} {unit} ({labels[values.index(min(values))]})\n"
+        result += f"- 最高值：{max(values)} {unit} ({labels[values.index(max(values))]})\n"
+    return result
+
+
+def _draw_skills(ax, skills: List[str], counts: List[int], chart_type: str = "horizontal_bar") -> None:
+    import numpy as np
+
+    if chart_type == "horizontal_bar":
+        # 水平柱状图
+        y_pos = np.arange(len(skills))
+        cmap = _colormap('viridis')
+        colors = cmap(np.linspace(0.3, 0.9, len(skills)))
+
+        bars = ax.barh(y_pos, counts, color=colors, alpha=0.8)
+
+        # 添加数值标签
+        for bar, count in zip(bars, counts):
+            width = bar.get_width()
+            ax.text(width + 0.5, bar.get_y() + bar.get_height()/2.,
+                   f'{count}', ha='left', va='center', fontsize=10)
+
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(skills, fontsize=11)
+        ax.invert_yaxis()  # 最重要的技能在顶部
+        ax.set_xlabel('需求次数', fontsize=12, fontweight='bold')
+
+    else:
+        # 饼图
+        cmap = _colormap('Set3')
+        colors = cmap(np.linspace(0, 1, len(skills)))
+        wedges, texts, autotexts = ax.pie(counts, labels=skills, autopct='%1.1f%%',
+                                         colors=colors, startangle=90,
+                                         textprops={'fontsize': 10})
+
+        # 美化文本
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+    ax.set_title('技能需求分布图', fontsize=14, fontweight='bold', pad=20)
+
+
+def _skill_summary(skills: List[str], counts: List[int], chart_type: str, filepath: str) -> str:
+    result = f"""
+## 🎯 技能需求分布图已生成
+
+**图表类型**：{"水平柱状图" if chart_type == "horizontal_bar" else "饼图"}
+**技能数量**：{len(skills)}
+**保存路径**：{filepath}
+
+### 🔥 热门技能 TOP 5
+"""
+
+    # 排序并显示前5
+    sorted_data = sorted(zip(skills, counts), key=lambda x: x[1], reverse=True)
+    for i, (skill, count) in enumerate(sorted_data[:5]):
+        result += f"{i+1}. **{skill}** - 出现 {count} 次\n"
+
+    result += f"\n### 💡 学习建议\n"
+    top_skill = sorted_data[0][0]
+    result += f"- 优先掌握 **{top_skill}**，这是最热门的技能\n"
+    result += f"- 前3名技能覆盖率超过 {sum(c for _, c in sorted_data[:3])/sum(counts)*100:.0f}%，建议重点学习\n"
+    return result
+
+
+# 面板类型 -> (绘制函数, 单独出图时的尺寸)
+PANEL_DRAWERS = {
+    "salary": (_draw_salary, (12, 7)),
+    "trend": (_draw_trend, (12, 7)),
+    "skills": (_draw_skills, (12, 8)),
+}
+
+
+def _render_figure(kind: str, params: Dict[str, Any], filepath: str, dpi: int = CHART_DPI) -> str:
+    """绘制单个面板并保存为一张图（也是并行渲染时子进程执行的函数）"""
+    draw, figsize = PANEL_DRAWERS[kind]
+    fig, ax = _new_figure(figsize)
+    draw(ax, **params)
+    fig.tight_layout()
+    _save_figure(fig, filepath, dpi)
+    return filepath
+
+
+def _render_grid(panels: List[Tuple[str, Dict[str, Any]]], filepath: str, dpi: int = REPORT_CHART_DPI) -> str:
+    """所有面板画进同一张图（纵向排列），一次布局、一次保存"""
+    heights = [PANEL_DRAWERS[kind][1][1] for kind, _ in panels]
+    fig, axes = _new_figure((12, sum(heights)), len(panels), 1, squeeze=False,
+                            gridspec_kw={"height_ratios": heights})
+    for ax, (kind, params) in zip(axes[:, 0], panels):
+        PANEL_DRAWERS[kind][0](ax, **params)
+    fig.tight_layout(h_pad=3)
+    _save_figure(fig, filepath, dpi)
+    return filepath
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """并行渲染用的进程池（spawn 启动，不继承服务进程的线程与连接），首次使用时创建并复用"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
 
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+            _process_pool = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
 
-# 设置图表样式
-try:
-    plt.style.use('seaborn-v0_8')
-except:
-    # 如果seaborn-v0_8不可用，使用默认样式
-    plt.style.use('default')
+
+def _render_figures(jobs: List[Tuple[str, Dict[str, Any], str]], parallel: bool = False,
+                    dpi: int = REPORT_CHART_DPI) -> List[str]:
+    """批量出图：默认在当前进程依次绘制（共用已配置的样式与字体）；parallel=True 时分发到子进程"""
+    if parallel and len(jobs) > 1:
+        pool = _get_process_pool()
+        # 子进程的工作目录是进程池创建时的目录，传绝对路径；返回值仍为调用方给出的路径
+        futures = [pool.submit(_render_figure, kind, params, os.path.abspath(filepath), dpi)
+                   for kind, params, filepath in jobs]
+        for future in futures:
+            future.result()
+        return [filepath for _, _, filepath in jobs]
+    return [_render_figure(kind, params, filepath, dpi) for kind, params, filepath in jobs]
 
 
 @tool
+@memoize_tool(ttl=1800, track_outputs=True, on_hit=claim_charts, cache_if=_cacheable_chart_result)
 def generate_salary_distribution_chart(
     job_title: str,
     salary_ranges: Optional[List[str]] = None,
@@ -72,272 +352,171 @@ def generate_salary_distribution_chart(
     Returns:
         包含图片路径和图表说明的字符串
     """
+    import numpy as np
+
     try:
         # 创建输出目录
         output_dir = "assets/charts"
         os.makedirs(output_dir, exist_ok=True)
 
-        # 如果没有提供数据，生成示例数据用于演示
+        # 如果没有提供数据，生成示例数据用于演示（结果中注明，且不缓存）
+        sample_warning = ""
         if salary_ranges is None or counts is None:
             salary_ranges = ["0-10k", "10-15k", "15-20k", "20-30k", "30k+"]
             counts = np.random.randint(5, 30, size=len(salary_ranges)).tolist()
             data_note = "（示例数据）"
+            sample_warning = SAMPLE_DATA_WARNING.format(panels="薪资分布")
         else:
             data_note = ""
 
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(12, 7))
-
-        # 绘制柱状图
-        bars = ax.bar(salary_ranges, counts, color='steelblue', edgecolor='navy', alpha=0.7)
+        # 保存图表；文件名带参数哈希，其它会话用不同数据生成的同名图表不会覆盖本图
+        params = dict(job_title=job_title, salary_ranges=salary_ranges, counts=counts, data_note=data_note)
+        filepath = chart_path(output_dir, f"{job_title}_薪资分布", params)
+        _render_figure("salary", params, filepath)
+        register_chart(filepath, tool="generate_salary_distribution_chart", params=params)
 
-        # 添加数值标签
-        for bar, count in zip(bars, counts):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{count}',
-                   ha='center', va='bottom', fontsize=11, fontweight='bold')
-
-        # 设置图表标题和标签
-        ax.set_xlabel('薪资区间', fontsize=12, fontweight='bold')
-        ax.set_ylabel('岗位数量', fontsize=12, fontweight='bold')
-        ax.set_title(f'{job_title} 薪资分布图 {data_note}',
-                    fontsize=14, fontweight='bold', pad=20)
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-
-        # 添加统计信息
-        total_jobs = sum(counts)
-        avg_salary_index = len(salary_ranges) // 2
-        stats_text = f'总岗位数: {total_jobs} | 平均薪资区间: {salary_ranges[avg_salary_index]}'
-        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
-               fontsize=10, verticalalignment='top',
-               bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-
-        plt.tight_layout()
-
-        # 保存图表
-        filename = f"{job_title}_薪资分布.png"
-        filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        # 生成返回结果
-        result = f"""
-## 📊 薪资分布图已生成
-
-**职位名称**：{job_title}
-**数据来源**：{data_source}
-**图表类型**：柱状图
-**保存路径**：{filepath}
-
-### 📈 数据概览
-- 总岗位数：{total_jobs}
-- 薪资区间：{salary_ranges[0]} 至 {salary_ranges[-1]}
-- 主要集中区间：{salary_ranges[np.argmax(counts)]}
-
-### 💡 分析建议
-"""
-        # 添加分析建议
-        max_index = np.argmax(counts)
-        result += f"- 该职位的主流薪资区间为 **{salary_ranges[max_index]}**，占所有岗位的 {counts[max_index]/total_jobs*100:.1f}%\n"
-        result += f"- 建议求职者根据自身能力，目标定在 {salary_ranges[max_index]} 及以上区间\n"
-        result += f"- 若想获得更高薪资（{salary_ranges[-1]}），建议提升核心技能和项目经验\n"
-
-        return result
+        return sample_warning + _salary_summary(job_title, salary_ranges, counts, data_source, filepath)
 
     except Exception as e:
         return f"❌ 生成薪资分布图失败：{str(e)}"
 
 
+def _local_trend_series(keyword: Optional[str], city: Optional[str], period: str, metric: str,
+                        last: int = 12):
+    """本地招聘数据的趋势序列：(X轴标签, 数值, Y轴单位)；没有数据时返回 None"""
+    points = job_index.trend(keyword=keyword, city=city, period=period, last=last)
+    if metric == "salary":
+        points = [p for p in points if p.median_salary is not None]
+        values, unit = [round(p.median_salary, 1) for p in points], "月薪中位数(k)"
+    else:
+        values, unit = [p.postings for p in points], "岗位数"
+    if not points:
+        return None
+    # 周显示为 "03-17周"，月显示为 "2025-03"
+    labels = [f"{p.bucket[5:]}周" if period == job_index.PERIOD_WEEK else p.bucket for p in points]
+    return labels, values, unit
+
+
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts)
 def generate_trend_chart(
     title: str,
-    labels: List[str],
-    values: List[float],
+    labels: Optional[List[str]] = None,
+    values: Optional[List[float]] = None,
     chart_type: str = "line",
-    unit: str = "岗位数"
+    unit: str = "岗位数",
+    keyword: Optional[str] = None,
+    city: Optional[str] = None,
+    period: str = "month",
+    metric: str = "postings"
 ) -> str:
     """
     生成趋势图（折线图或柱状图）
 
     Args:
         title: 图表标题，如"前端开发需求趋势"
-        labels: X轴标签，如["1月", "2月", "3月", "4月", "5月", "6月"]
+        labels: X轴标签，如["1月", "2月", "3月", "4月", "5月", "6月"]；不提供时使用本地招聘数据
         values: Y轴数值，如[120, 150, 180, 200, 220, 250]
         chart_type: 图表类型，"line"（折线图）或"bar"（柱状图）
         unit: Y轴单位，如"岗位数"、"薪资(k)"
+        keyword: 未提供数据时，统计该搜索关键词下的职位（如"Python"）
+        city: 未提供数据时，只统计该城市的职位
+        period: 未提供数据时的时间粒度，"month"（按月）或"week"（按周）
+        metric: 未提供数据时的统计指标，"postings"（岗位数）或"salary"（月薪中位数）
 
     Returns:
         包含图片路径和图表说明的字符串
     """
+    if not labels or not values:
+        series = _local_trend_series(keyword, city, period, metric)
+        if series is None:
+            return "⚠️ 未提供趋势数据，本地招聘数据中也没有带发布时间的职位，请先采集数据或传入 labels/values"
+        labels, values, unit = series
+
     try:
         # 创建输出目录
         output_dir = "assets/charts"
         os.makedirs(output_dir, exist_ok=True)
 
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(12, 7))
-
-        if chart_type == "line":
-            # 折线图
-            ax.plot(labels, values, marker='o', linewidth=2, markersize=8,
-                   color='#2E86AB', markerfacecolor='#A23B72')
-            ax.fill_between(labels, values, alpha=0.3, color='#2E86AB')
-        else:
-            # 柱状图
-            bars = ax.bar(labels, values, color='#F18F01', edgecolor='#C73E1D', alpha=0.8)
-            for bar, value in zip(bars, values):
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{value}', ha='center', va='bottom', fontsize=10)
-
-        # 设置图表标题和标签
-        ax.set_xlabel('时间', fontsize=12, fontweight='bold')
-        ax.set_ylabel(unit, fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-
-        # 添加趋势信息
-        if len(values) >= 2:
-            growth_rate = ((values[-1] - values[0]) / values[0]) * 100
-            trend_text = f'增长趋势: {"上升" if growth_rate > 0 else "下降"} {abs(growth_rate):.1f}%'
-            ax.text(0.02, 0.98, trend_text, transform=ax.transAxes,
-                   fontsize=10, verticalalignment='top',
-                   bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.5))
-
-        plt.tight_layout()
-
         # 保存图表
-        filename = f"{title}.png".replace(" ", "_")
-        filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        # 生成返回结果
-        result = f"""
-## 📈 趋势图已生成
-
-**图表标题**：{title}
-**图表类型**：{"折线图" if chart_type == "line" else "柱状图"}
-**数据点数**：{len(values)}
-**保存路径**：{filepath}
-
-### 📊 数据分析
-"""
-        # 添加趋势分析
-        if len(values) >= 2:
-            growth_rate = ((values[-1] - values[0]) / values[0]) * 100
-            result += f"- 整体趋势：{'上升 📈' if growth_rate > 0 else '下降 📉'}\n"
-            result += f"- 增长幅度：{abs(growth_rate):.1f}%\n"
-            result += f"- 最低值：{min(values)} {unit} ({labels[values.index(min(values))]})\n"
-            result += f"- 最高值：{max(values)} {unit} ({labels[values.index(max(values))]})\n"
+        params = dict(title=title, labels=labels, values=values, chart_type=chart_type, unit=unit)
+        filepath = chart_path(output_dir, title.replace(" ", "_"), params)
+        _render_figure("trend", params, filepath)
+        register_chart(filepath, tool="generate_trend_chart", params=params)
 
-        return result
+        return _trend_summary(title, labels, values, chart_type, unit, filepath)
 
     except Exception as e:
         return f"❌ 生成趋势图失败：{str(e)}"
 
 
+def _local_skill_counts(keyword: Optional[str] = None, city: Optional[str] = None,
+                        days: Optional[int] = None, limit: int = 10):
+    """本地招聘数据中要求各技能的职位数：(技能列表, 次数列表)；没有数据时返回 None"""
+    terms = job_index.top_terms(job_index.FIELD_SKILL, keyword=keyword, city=city, days=days, limit=limit)
+    if not terms:
+        return None
+    return [term for term, _ in terms], [count for _, count in terms]
+
+
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts)
 def generate_skill_requirements_chart(
-    skills: List[str],
-    counts: List[int],
-    chart_type: str = "horizontal_bar"
+    skills: Optional[List[str]] = None,
+    counts: Optional[List[int]] = None,
+    chart_type: str = "horizontal_bar",
+    keyword: Optional[str] = None,
+    city: Optional[str] = None,
+    days: Optional[int] = None
 ) -> str:
     """
     生成技能需求分布图
 
     Args:
-        skills: 技能列表，如["Python", "JavaScript", "SQL", "Docker", "Git"]
+        skills: 技能列表，如["Python", "JavaScript", "SQL", "Docker", "Git"]；不提供时从本地招聘数据统计
         counts: 各技能的需求次数，如[25, 20, 18, 12, 10]
         chart_type: 图表类型，"horizontal_bar"（水平柱状图）或"pie"（饼图）
+        keyword: 未提供技能数据时，只统计该搜索关键词下的职位（如"数据分析"）
+        city: 未提供技能数据时，只统计该城市的职位
+        days: 未提供技能数据时，只统计最近N天发布的职位
 
     Returns:
         包含图片路径和图表说明的字符串
     """
+    if not skills or not counts:
+        # 本地招聘数据中要求各技能的职位数（前10名）
+        local = _local_skill_counts(keyword, city, days)
+        if local is None:
+            return "⚠️ 未提供技能数据，本地招聘数据中也没有符合条件的职位，请先采集数据或传入 skills/counts"
+        skills, counts = local
+
     try:
         # 创建输出目录
         output_dir = "assets/charts"
         os.makedirs(output_dir, exist_ok=True)
 
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(12, 8))
-
-        if chart_type == "horizontal_bar":
-            # 水平柱状图
-            y_pos = np.arange(len(skills))
-            cmap = plt.get_cmap('viridis')
-            colors = cmap(np.linspace(0.3, 0.9, len(skills)))
-
-            bars = ax.barh(y_pos, counts, color=colors, alpha=0.8)
-
-            # 添加数值标签
-            for i, (bar, count) in enumerate(zip(bars, counts)):
-                width = bar.get_width()
-                ax.text(width + 0.5, bar.get_y() + bar.get_height()/2.,
-                       f'{count}', ha='left', va='center', fontsize=10)
-
-            ax.set_yticks(y_pos)
-            ax.set_yticklabels(skills, fontsize=11)
-            ax.invert_yaxis()  # 最重要的技能在顶部
-            ax.set_xlabel('需求次数', fontsize=12, fontweight='bold')
-
-        else:
-            # 饼图
-            cmap = plt.get_cmap('Set3')
-            colors = cmap(np.linspace(0, 1, len(skills)))
-            wedges, texts, autotexts = ax.pie(counts, labels=skills, autopct='%1.1f%%',
-                                             colors=colors, startangle=90,
-                                             textprops={'fontsize': 10})
-
-            # 美化文本
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-
-        ax.set_title('技能需求分布图', fontsize=14, fontweight='bold', pad=20)
-
-        plt.tight_layout()
-
         # 保存图表
-        filename = f"技能需求分布_{'横向柱状图' if chart_type == 'horizontal_bar' else '饼图'}.png"
-        filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        # 生成返回结果
-        result = f"""
-## 🎯 技能需求分布图已生成
+        params = dict(skills=skills, counts=counts, chart_type=chart_type)
+        filepath = chart_path(output_dir, f"技能需求分布_{'横向柱状图' if chart_type == 'horizontal_bar' else '饼图'}", params)
+        _render_figure("skills", params, filepath)
+        register_chart(filepath, tool="generate_skill_requirements_chart", params=params)
 
-**图表类型**：{"水平柱状图" if chart_type == "horizontal_bar" else "饼图"}
-**技能数量**：{len(skills)}
-**保存路径**：{filepath}
-
-### 🔥 热门技能 TOP 5
-"""
-
-        # 排序并显示前5
-        sorted_data = sorted(zip(skills, counts), key=lambda x: x[1], reverse=True)
-        for i, (skill, count) in enumerate(sorted_data[:5]):
-            result += f"{i+1}. **{skill}** - 出现 {count} 次\n"
-
-        result += f"\n### 💡 学习建议\n"
-        top_skill = sorted_data[0][0]
-        result += f"- 优先掌握 **{top_skill}**，这是最热门的技能\n"
-        result += f"- 前3名技能覆盖率超过 {(sorted_data[0][1] + sorted_data[1][1] + sorted_data[2][1])/sum(counts)*100:.0f}%，建议重点学习\n"
-
-        return result
+        return _skill_summary(skills, counts, chart_type, filepath)
 
     except Exception as e:
         return f"❌ 生成技能需求图失败：{str(e)}"
 
 
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts,
+              cache_if=_cacheable_chart_result)
 def generate_multi_chart_report(
     job_title: str,
     salary_data: Optional[Dict[str, Any]] = None,
     trend_data: Optional[Dict[str, Any]] = None,
-    skill_data: Optional[Dict[str, Any]] = None
+    skill_data: Optional[Dict[str, Any]] = None,
+    layout: str = "grid",
+    parallel: bool = False
 ) -> str:
     """
     生成综合分析报告（包含多个图表）
@@ -347,10 +526,14 @@ def generate_multi_chart_report(
         salary_data: 薪资数据，如{"ranges": ["0-10k", "10-20k"], "counts": [10, 20]}
         trend_data: 趋势数据，如{"labels": ["1月", "2月"], "values": [100, 120]}
         skill_data: 技能数据，如{"skills": ["Python", "JS"], "counts": [25, 20]}
+        layout: "grid"（所有图表合成一张综合图，默认）或"separate"（每个图表单独保存）
+        parallel: layout="separate" 时是否在多个子进程中并行绘制
 
     Returns:
         包含所有图表的综合报告
     """
+    import numpy as np
+
     try:
         output_dir = "assets/charts"
         os.makedirs(output_dir, exist_ok=True)
@@ -358,48 +541,87 @@ def generate_multi_chart_report(
         report_parts = []
         report_parts.append(f"# 📊 {job_title} 综合分析报告\n")
 
-        # 如果没有提供数据，生成示例数据
-        if salary_data is None and trend_data is None and skill_data is None:
-            report_parts.append("> ⚠️ 未提供具体数据，使用示例数据生成演示图表\n\n")
+        sample_panels = []  # 使用随机示例数据的面板，报告中注明，且结果不缓存
+
+        # 先准备各面板的数据，再统一绘制；(面板类型, 绘制参数, 单独保存时的文件名前缀, 说明生成函数)
+        panels = []
+
+        trend_note = None
 
-        # 生成薪资分布图
+        # 薪资分布
         if salary_data is None:
             salary_ranges = ["0-10k", "10-15k", "15-20k", "20-30k", "30k+"]
             salary_counts = np.random.randint(5, 30, size=len(salary_ranges)).tolist()
-            report_parts.append(generate_salary_distribution_chart(job_title, salary_ranges, salary_counts))
+            data_note = "（示例数据）"
+            sample_panels.append("薪资分布")
         else:
-            report_parts.append(generate_salary_distribution_chart(
-                job_title,
-                salary_data.get("ranges"),
-                salary_data.get("counts")
-            ))
-
-        report_parts.append("\n---\n\n")
-
-        # 生成趋势图
+            salary_ranges, salary_counts, data_note = salary_data.get("ranges"), salary_data.get("counts"), ""
+        panels.append((
+            "salary",
+            dict(job_title=job_title, salary_ranges=salary_ranges, counts=salary_counts, data_note=data_note),
+            f"{job_title}_薪资分布",
+            lambda path: _salary_summary(job_title, salary_ranges, salary_counts, "search", path),
+        ))
+
+        # 需求趋势：使用本地招聘数据的真实趋势，没有数据时不再生成随机曲线
+        trend_title = f"{job_title}需求趋势"
         if trend_data is None:
-            trend_labels = ["1月", "2月", "3月", "4月", "5月", "6月"]
-            trend_values = np.cumsum(np.random.randint(10, 30, size=6)).tolist()
-            report_parts.append(generate_trend_chart(f"{job_title}需求趋势", trend_labels, trend_values))
+            series = _local_trend_series(job_title, None, job_index.PERIOD_MONTH, "postings", last=6)
+            trend_labels, trend_values = (series[0], series[1]) if series else (None, None)
         else:
-            report_parts.append(generate_trend_chart(
-                f"{job_title}需求趋势",
-                trend_data.get("labels"),
-                trend_data.get("values")
+            trend_labels, trend_values = trend_data.get("labels"), trend_data.get("values")
+        if trend_labels and trend_values:
+            panels.append((
+                "trend",
+                dict(title=trend_title, labels=trend_labels, values=trend_values),
+                trend_title.replace(" ", "_"),
+                lambda path: _trend_summary(trend_title, trend_labels, trend_values, "line", "岗位数", path),
             ))
+        else:
+            trend_note = "> ⚠️ 本地招聘数据中没有该职位带发布时间的记录，未生成需求趋势图\n"
 
-        report_parts.append("\n---\n\n")
-
-        # 生成技能需求图
+        # 技能需求
         if skill_data is None:
-            skill_names = ["Python", "JavaScript", "SQL", "Docker", "Git", "AWS", "React", "Linux"]
-            skill_counts = np.random.randint(10, 40, size=len(skill_names)).tolist()
-            report_parts.append(generate_skill_requirements_chart(skill_names, skill_counts))
+            local = _local_skill_counts(job_title)
+            if local is None:
+                skill_names = ["Python", "JavaScript", "SQL", "Docker", "Git", "AWS", "React", "Linux"]
+                skill_counts = np.random.randint(10, 40, size=len(skill_names)).tolist()
+                sample_panels.append("技能需求")
+            else:
+                skill_names, skill_counts = local
         else:
-            report_parts.append(generate_skill_requirements_chart(
-                skill_data.get("skills"),
-                skill_data.get("counts")
-            ))
+            skill_names, skill_counts = skill_data.get("skills"), skill_data.get("counts")
+        panels.append((
+            "skills",
+            dict(skills=skill_names, counts=skill_counts),
+            "技能需求分布_横向柱状图",
+            lambda path: _skill_summary(skill_names, skill_counts, "horizontal_bar", path),
+        ))
+
+        if sample_panels:
+            report_parts.append(SAMPLE_DATA_WARNING.format(panels="、".join(sample_panels)))
+
+        # 一次性绘制；图表在当前进程登记（并行绘制时子进程不访问图表索引）
+        if layout == "separate":
+            paths = _render_figures(
+                [(kind, params, chart_path(output_dir, stem, dict(kind=kind, **params)))
+                 for kind, params, stem, _ in panels],
+                parallel=parallel,
+            )
+            for (kind, params, _, _), path in zip(panels, paths):
+                register_chart(path, tool="generate_multi_chart_report", params=dict(kind=kind, **params))
+        else:
+            grid_params = [dict(kind=kind, **params) for kind, params, _, _ in panels]
+            grid_path = _render_grid([(kind, params) for kind, params, _, _ in panels],
+                                     chart_path(output_dir, f"{job_title}_综合分析", grid_params))
+            register_chart(grid_path, tool="generate_multi_chart_report", params=grid_params)
+            paths = [grid_path] * len(panels)
+            report_parts.append(f"**综合图表**：{grid_path}\n\n")
+
+        sections = [summarize(path) for (_, _, _, summarize), path in zip(panels, paths)]
+        if trend_note:
+            sections.insert(1, trend_note)
+        report_parts.append("\n---\n\n".join(sections))
 
         return "".join(report_parts)
 
@@ -408,34 +630,43 @@ def generate_multi_chart_report(
 
 
 @tool
-def list_generated_charts() -> str:
+def list_generated_charts(page: int = 1, page_size: int = 20, scope: str = "session") -> str:
     """
-    列出所有已生成的图表文件
+    列出已生成的图表文件（按生成时间倒序，分页）
+
+    Args:
+        page: 页码，从1开始
+        page_size: 每页数量，默认20
+        scope: "session"（只列出当前会话生成的图表，默认）或"all"（所有图表）
 
     Returns:
-        可用的图表文件列表
+        当前页的图表文件列表
     """
     charts_dir = "assets/charts"
 
     if not os.path.exists(charts_dir):
         return f"⚠️ 图表目录不存在：{charts_dir}\n\n请先生成图表。"
 
-    files = []
-    for filename in os.listdir(charts_dir):
-        if filename.endswith(('.png', '.jpg', '.jpeg')):
-            files.append(filename)
+    # 不在会话中调用时列出全部图表
+    session_id = current_session_id() if scope == "session" else None
+    records, total = get_chart_store().list(session_id=session_id or None, page=page, page_size=page_size)
 
-    if not files:
+    if not total:
+        if session_id:
+            return "⚠️ 当前会话还没有生成图表。\n\n请使用可视化工具生成图表，或使用 scope=\"all\" 查看所有图表。"
         return f"⚠️ 目录 '{charts_dir}' 中没有图表文件。\n\n请使用可视化工具生成图表。"
 
+    page_size = max(1, page_size)
+    pages = (total + page_size - 1) // page_size
     result = f"## 📁 已生成的图表\n\n"
-    result += f"共找到 {len(files)} 个图表文件：\n\n"
-
-    for filename in sorted(files):
-        filepath = os.path.join(charts_dir, filename)
-        file_size = os.path.getsize(filepath)
-        result += f"- **{filename}**\n"
-        result += f"  - 路径：{filepath}\n"
-        result += f"  - 大小：{file_size/1024:.1f} KB\n\n"
+    result += f"共找到 {total} 个图表文件（第 {max(1, page)}/{pages} 页）：\n\n"
+
+    for record in records:
+        result += f"- **{os.path.basename(record.path)}**\n"
+        result += f"  - 路径：{record.path}\n"
+        result += f"  - 大小：{record.size/1024:.1f} KB\n\n"
+
+    if page < pages:
+        result += f"还有更多图表，使用 page={page + 1} 查看下一页。\n"
 
     return result
@@ -3,6 +3,8 @@ import requests
 from typing import Optional
 from pydantic import BaseModel, Field
 from langchain.tools import tool, ToolRuntime
+from tools.tool_cache import memoize_tool
+from tools import job_index
 from cozeloop.decorator import observe
 from coze_coding_utils.runtime_ctx.context import Context, default_headers
 
@@ -133,6 +135,7 @@ def web_search(
 
 
 @tool
+@memoize_tool(ttl=1800)
 def search_employment_market(query: str, runtime: ToolRuntime) -> str:
     """
     搜索就业市场信息，包括岗位需求、薪资水平、行业趋势等。
@@ -177,10 +180,51 @@ def search_employment_market(query: str, runtime: ToolRuntime) -> str:
     return "\n".join(result_lines)
 
 
+def _local_trend_report(industry: str, location: str = "") -> Optional[str]:
+    """本地招聘数据中有该方向的职位时，直接汇总岗位数与薪资的月度/周度趋势"""
+    city = location if location and location != "全国" else None
+    months = job_index.trend(keyword=industry, city=city, period=job_index.PERIOD_MONTH, last=12)
+    if not months:
+        return None
+    weeks = job_index.trend(keyword=industry, city=city, period=job_index.PERIOD_WEEK, last=8)
+
+    def _salary(point) -> str:
+        return f"{point.median_salary:.1f}k" if point.median_salary is not None else "-"
+
+    report_lines = [f"# {industry}就业趋势分析报告"]
+    if location:
+        report_lines.append(f"**地区**：{location}")
+    report_lines.append(f"**数据来源**：本地招聘数据（共 {sum(p.postings for p in months)} 个职位）")
+
+    report_lines.append("\n## 月度趋势")
+    report_lines.append("| 月份 | 岗位数 | 月薪中位数 |")
+    report_lines.append("|------|--------|------------|")
+    for point in months:
+        report_lines.append(f"| {point.bucket} | {point.postings} | {_salary(point)} |")
+    if len(months) >= 2:
+        change = (months[-1].postings - months[0].postings) / months[0].postings * 100
+        report_lines.append(f"\n岗位数较 {months[0].bucket} {'增长' if change >= 0 else '下降'} {abs(change):.1f}%")
+
+    report_lines.append("\n## 近期周度趋势")
+    for point in weeks:
+        report_lines.append(f"- {point.bucket} 当周：{point.postings} 个岗位，月薪中位数 {_salary(point)}")
+
+    skills = job_index.top_terms(job_index.FIELD_SKILL, keyword=industry, city=city, limit=10)
+    if skills:
+        report_lines.append("\n## 热门技能")
+        report_lines.append("、".join(f"{skill}({count})" for skill, count in skills))
+    companies = job_index.top_terms(job_index.FIELD_COMPANY, keyword=industry, city=city, limit=5)
+    if companies:
+        report_lines.append("\n## 招聘较多的公司")
+        report_lines.append("、".join(f"{company}({count})" for company, count in companies))
+    return "\n".join(report_lines)
+
+
 @tool
+@memoize_tool(ttl=3600, watch=["assets/jobs_data"])
 def get_employment_trend(industry: str, location: str = "", runtime: ToolRuntime = None) -> str:
     """
-    获取特定行业和地区的就业趋势报告。
+    获取特定行业和地区的就业趋势报告。本地已采集该方向的招聘数据时直接基于真实数据统计，否则联网搜索。
     
     Args:
         industry: 行业/职业方向，例如 "软件开发"、"市场营销"、"金融分析"
@@ -190,6 +234,10 @@ def get_employment_trend(industry: str, location: str = "", runtime: ToolRuntime
     Returns:
         就业趋势分析报告。
     """
+    local_report = _local_trend_report(industry, location)
+    if local_report:
+        return local_report
+
     if runtime is None:
         return "错误：缺少运行时上下文"
     
@@ -5,36 +5,17 @@
 """
 
 import os
+import copy
 import json
 import re
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-import matplotlib.font_manager as fm
+import threading
 from typing import Optional, List, Dict, Any
-from collections import Counter
+from collections import Counter, OrderedDict
 from langchain.tools import tool
-
-# 配置中文字体 - 优先使用系统中已确认的字体文件
-chinese_font = None
-
-# 优先使用文泉驿微米黑（支持中文，显示效果较好）
-preferred_font_path = '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc'
-if os.path.exists(preferred_font_path):
-    chinese_font = preferred_font_path
-else:
-    # 备用字体路径列表
-    font_paths = [
-        '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
-        '/usr/share/fonts/truetype/arphic/uming.ttc',
-        '/usr/share/fonts/truetype/arphic/ukai.ttc'
-    ]
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            chinese_font = font_path
-            break
-
+from tools.tool_cache import memoize_tool
+from tools.font_registry import font_data, resolve_cjk_font, truetype
+from tools import job_index
+from tools.chart_store import chart_path, claim_charts, register_chart
 
 def extract_keywords(text: str, max_words: int = 100) -> Dict[str, int]:
     """从文本中提取关键词"""
@@ -110,6 +91,16 @@ def get_sample_keywords(max_words: int = 100) -> Dict[str, int]:
     return dict(keywords[:max_words])
 
 
+def _indexed_weights(field: str, keyword: Optional[str] = None, city: Optional[str] = None,
+                     days: Optional[int] = None, limit: int = 100) -> Dict[str, int]:
+    """本地招聘数据中的高频词，出现次数换算为 1-100 的权重（最高频词为 100）"""
+    terms = job_index.top_terms(field, keyword=keyword, city=city, days=days, limit=limit)
+    if not terms:
+        return {}
+    top = terms[0][1]
+    return {term: max(1, round(count * 100 / top)) for term, count in terms}
+
+
 def format_wordcloud_result(word_freq: Dict[str, int], filepath: str, title: str) -> str:
     """格式化词云结果"""
     # 按权重排序
@@ -186,13 +177,84 @@ def format_wordcloud_result(word_freq: Dict[str, int], filepath: str, title: str
     return result
 
 
+# 渲染质量 -> (布局缩放比例, 输出倍率)
+# 词云耗时主要在布局时的积分图搜索，与布局面积成正比：先在缩小的画布上布局，再按 scale 放大绘制，
+# 输出尺寸与原先（1200x800、scale=2）一致，文字仍按矢量字体清晰绘制
+WORDCLOUD_QUALITY = {
+    "preview": (0.25, 1),
+    "standard": (0.5, 2),
+    "high": (1.0, 2),
+}
+WORDCLOUD_RANDOM_SEED = 42  # 固定随机种子，相同输入得到相同布局，便于缓存复用
+WORDCLOUD_LAYOUT_CACHE_SIZE = int(os.getenv("WORDCLOUD_LAYOUT_CACHE_SIZE", "32"))
+
+_layout_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_layout_lock = threading.Lock()
+
+
+def _get_layout(word_freq: Dict[str, int], width: int, height: int, max_words: int, quality: str,
+                font_path: Optional[str]):
+    """按（词频、尺寸、质量、字体）缓存已完成布局的 WordCloud 对象"""
+    from wordcloud import WordCloud
+
+    factor, output_scale = WORDCLOUD_QUALITY.get(quality, WORDCLOUD_QUALITY["standard"])
+    key = (tuple(sorted(word_freq.items())), width, height, max_words, factor, output_scale, font_path)
+    with _layout_lock:
+        cloud = _layout_cache.get(key)
+        if cloud is not None:
+            _layout_cache.move_to_end(key)
+            return cloud
+
+    cloud = WordCloud(
+        width=max(1, round(width * factor)),
+        height=max(1, round(height * factor)),
+        background_color='white',
+        # 传入已读入内存的字体，布局时反复创建字体不再读文件；None 时使用 wordcloud 自带字体（中文可能显示方框）
+        font_path=font_data(font_path) if font_path else None,
+        max_words=max_words,
+        relative_scaling=0.5,
+        min_font_size=max(1, round(10 * factor)),
+        margin=max(1, round(2 * factor)),
+        colormap='viridis',
+        prefer_horizontal=0.9,  # 优先水平显示文字
+        scale=output_scale / factor,  # 按原尺寸清晰绘制
+        random_state=WORDCLOUD_RANDOM_SEED,
+    ).generate_from_frequencies(word_freq)
+
+    with _layout_lock:
+        _layout_cache[key] = cloud
+        while len(_layout_cache) > WORDCLOUD_LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return cloud
+
+
+def _draw_title(image, title: str, font_path: Optional[str]):
+    """在词云图上方加白色标题栏，直接用 PIL 绘制（不再经过 matplotlib）"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    header = max(24, round(image.height * 0.09))
+    size = max(12, round(header * 0.45))
+    font = truetype(font_path, size) if font_path else ImageFont.load_default(size)
+
+    canvas = Image.new("RGB", (image.width, image.height + header), "white")
+    canvas.paste(image, (0, header))
+    draw = ImageDraw.Draw(canvas)
+    left, top, right, bottom = draw.textbbox((0, 0), title, font=font, stroke_width=1)
+    position = ((image.width - (right - left)) / 2 - left, (header - (bottom - top)) / 2 - top)
+    # 描边模拟粗体
+    draw.text(position, title, font=font, fill="#222222", stroke_width=1, stroke_fill="#222222")
+    return canvas
+
+
 def _generate_job_wordcloud_internal(
     text_data: Optional[str] = None,
     keywords: Optional[List[Dict[str, int]]] = None,
     title: str = "就业市场热门职位词云",
     max_words: int = 100,
     width: int = 1200,
-    height: int = 800
+    height: int = 800,
+    colormap: str = "viridis",
+    quality: str = "standard"
 ) -> str:
     """
     内部函数：生成就业市场词云图（不使用@tool装饰器）
@@ -204,6 +266,8 @@ def _generate_job_wordcloud_internal(
         max_words: 最大显示词数
         width: 图片宽度
         height: 图片高度
+        colormap: matplotlib 配色方案，如"viridis"、"plasma"、"Blues"
+        quality: 渲染质量，"preview"（快速预览）、"standard"（默认）或"high"（逐像素布局）
 
     Returns:
         包含词云文件路径和文本描述的字符串
@@ -221,56 +285,20 @@ def _generate_job_wordcloud_internal(
             # 从文本数据中提取关键词
             word_freq = extract_keywords(text_data, max_words)
         else:
-            # 使用示例数据
-            word_freq = get_sample_keywords(max_words)
+            # 优先使用本地招聘数据中的热门职位，没有数据时使用示例数据
+            word_freq = _indexed_weights(job_index.FIELD_TITLE, limit=max_words) or get_sample_keywords(max_words)
 
         if not word_freq:
             return "❌ 无法生成词云：没有提供有效的关键词数据"
 
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(14, 10))
-
-        # 生成词云
-        # 强制使用中文字体，确保中文能正确显示
-        if chinese_font and os.path.exists(chinese_font):
-            wordcloud = WordCloud(
-                width=width,
-                height=height,
-                background_color='white',
-                font_path=chinese_font,  # 使用完整字体路径
-                max_words=max_words,
-                relative_scaling=0.5,
-                min_font_size=10,
-                colormap='viridis',
-                prefer_horizontal=0.9,  # 优先水平显示文字
-                scale=2  # 提高清晰度
-            ).generate_from_frequencies(word_freq)
-
-            # 使用相同字体设置标题
-            title_font_prop = fm.FontProperties(fname=chinese_font)
-            ax.set_title(title, fontsize=16, fontweight='bold', pad=20,
-                        fontproperties=title_font_prop)
-        else:
-            # 如果没有中文字体，仍然生成词云但可能显示方框
-            wordcloud = WordCloud(
-                width=width,
-                height=height,
-                background_color='white',
-                max_words=max_words,
-                relative_scaling=0.5,
-                min_font_size=10,
-                colormap='viridis',
-                prefer_horizontal=0.9,
-                scale=2
-            ).generate_from_frequencies(word_freq)
-            ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-
-        # 显示词云
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis('off')
-        plt.tight_layout(pad=0)
-
-        plt.tight_layout(pad=0)
+        # 中文字体由 font_registry 统一解析；词云布局复用已读入内存的字体文件
+        chinese_font = resolve_cjk_font()
+        font_path = chinese_font.path if chinese_font else None
+
+        # 生成词云：布局按内容缓存，只换配色/标题时直接重新着色
+        cloud = _get_layout(word_freq, width, height, max_words, quality, font_path)
+        cloud = copy.copy(cloud).recolor(colormap=colormap, random_state=WORDCLOUD_RANDOM_SEED)
+        image = _draw_title(cloud.to_image(), title, font_path)
 
         # 保存词云
         # 过滤文件名中的特殊字符，避免系统解析错误
@@ -292,10 +320,19 @@ def _generate_job_wordcloud_internal(
         # 移除首尾的下划线
         safe_title = safe_title.strip('_')
 
-        filename = f"{safe_title}.png"
-        filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close()
+        # 文件名带参数哈希，其它会话用不同词频生成的同名词云不会覆盖本图
+        params = dict(words=word_freq, title=title, max_words=max_words, width=width, height=height,
+                      colormap=colormap, quality=quality)
+        filepath = chart_path(output_dir, safe_title, params)
+        # 先写临时文件再替换，避免同名词云并发生成时读到半个文件
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp_path, format="PNG")
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        register_chart(filepath, tool="wordcloud", params=params)
 
         # 生成文本描述
         return format_wordcloud_result(word_freq, filepath, title)
@@ -306,13 +343,16 @@ def _generate_job_wordcloud_internal(
 
 # 工具函数：调用内部函数生成就业市场词云
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts)
 def generate_job_wordcloud(
     text_data: Optional[str] = None,
     keywords: Optional[List[Dict[str, int]]] = None,
     title: str = "就业市场热门职位词云",
     max_words: int = 100,
     width: int = 1200,
-    height: int = 800
+    height: int = 800,
+    colormap: str = "viridis",
+    quality: str = "standard"
 ) -> str:
     """
     生成就业市场词云图
@@ -324,6 +364,8 @@ def generate_job_wordcloud(
         max_words: 最大显示词数
         width: 图片宽度
         height: 图片高度
+        colormap: 配色方案，如"viridis"、"plasma"、"Blues"
+        quality: 渲染质量，"preview"（快速预览）、"standard"（默认）或"high"
 
     Returns:
         包含词云文件路径和文本描述的字符串
@@ -334,15 +376,20 @@ def generate_job_wordcloud(
         title=title,
         max_words=max_words,
         width=width,
-        height=height
+        height=height,
+        colormap=colormap,
+        quality=quality
     )
 
 
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts)
 def generate_skill_wordcloud(
     skills_data: Optional[List[Dict[str, int]]] = None,
     skills_text: Optional[str] = None,
-    job_title: str = "数据分析师"
+    job_title: str = "数据分析师",
+    city: Optional[str] = None,
+    days: Optional[int] = None
 ) -> str:
     """
     生成技能需求词云图
@@ -350,36 +397,41 @@ def generate_skill_wordcloud(
     Args:
         skills_data: 技能数据，格式如[{"skill": "Python", "count": 95}, {"skill": "SQL", "count": 85}]
         skills_text: 技能文本数据，支持格式如"数据分析(95)、Python(90)、SQL(88)"
-        job_title: 职位名称，用于标题
+        job_title: 职位名称，用于标题；未提供技能数据时用于筛选本地招聘数据
+        city: 未提供技能数据时，只统计该城市的职位
+        days: 未提供技能数据时，只统计最近N天发布的职位
 
     Returns:
         包含词云文件路径和文本描述的字符串
     """
+    if not skills_data and skills_text:
+        # 从文本中解析技能数据
+        word_freq = parse_keyword_text(skills_text)
+        skills_data = [{"skill": k, "count": v} for k, v in word_freq.items()]
     if not skills_data:
-        if skills_text:
-            # 从文本中解析技能数据
-            word_freq = parse_keyword_text(skills_text)
-            skills_data = [{"skill": k, "count": v} for k, v in word_freq.items()]
-        else:
-            # 使用示例数据
-            skills_data = [
-                {"skill": "Python", "count": 95},
-                {"skill": "SQL", "count": 90},
-                {"skill": "Excel", "count": 85},
-                {"skill": "Tableau", "count": 70},
-                {"skill": "PowerBI", "count": 65},
-                {"skill": "机器学习", "count": 60},
-                {"skill": "统计学", "count": 55},
-                {"skill": "数据分析", "count": 95},
-                {"skill": "数据可视化", "count": 70},
-                {"skill": "Hadoop", "count": 50},
-                {"skill": "Spark", "count": 45},
-                {"skill": "Pandas", "count": 80},
-                {"skill": "NumPy", "count": 75},
-                {"skill": "Matplotlib", "count": 65},
-                {"skill": "沟通能力", "count": 60},
-                {"skill": "业务理解", "count": 70}
-            ]
+        # 本地招聘数据中统计的技能出现次数
+        word_freq = _indexed_weights(job_index.FIELD_SKILL, keyword=job_title, city=city, days=days, limit=50)
+        skills_data = [{"skill": k, "count": v} for k, v in word_freq.items()]
+    if not skills_data:
+        # 使用示例数据
+        skills_data = [
+            {"skill": "Python", "count": 95},
+            {"skill": "SQL", "count": 90},
+            {"skill": "Excel", "count": 85},
+            {"skill": "Tableau", "count": 70},
+            {"skill": "PowerBI", "count": 65},
+            {"skill": "机器学习", "count": 60},
+            {"skill": "统计学", "count": 55},
+            {"skill": "数据分析", "count": 95},
+            {"skill": "数据可视化", "count": 70},
+            {"skill": "Hadoop", "count": 50},
+            {"skill": "Spark", "count": 45},
+            {"skill": "Pandas", "count": 80},
+            {"skill": "NumPy", "count": 75},
+            {"skill": "Matplotlib", "count": 65},
+            {"skill": "沟通能力", "count": 60},
+            {"skill": "业务理解", "count": 70}
+        ]
 
     # 转换为关键词格式
     keywords = [{"word": item['skill'], "weight": item['count']} for item in skills_data]
@@ -400,9 +452,13 @@ def generate_skill_wordcloud(
 
 
 @tool
+@memoize_tool(ttl=1800, watch=["assets/jobs_data"], track_outputs=True, on_hit=claim_charts)
 def generate_company_wordcloud(
     company_data: Optional[List[Dict[str, int]]] = None,
-    industry: str = "互联网"
+    industry: str = "互联网",
+    keyword: Optional[str] = None,
+    city: Optional[str] = None,
+    days: Optional[int] = None
 ) -> str:
     """
     生成招聘公司词云图
@@ -410,10 +466,17 @@ def generate_company_wordcloud(
     Args:
         company_data: 公司数据，格式如[{"name": "字节跳动", "count": 120}, {"name": "腾讯", "count": 110}]
         industry: 行业名称
+        keyword: 未提供公司数据时，只统计该搜索关键词下的本地招聘数据（如"Python"）
+        city: 未提供公司数据时，只统计该城市的职位
+        days: 未提供公司数据时，只统计最近N天发布的职位
 
     Returns:
         包含词云文件路径和文本描述的字符串
     """
+    if not company_data:
+        # 本地招聘数据中各公司的职位数
+        word_freq = _indexed_weights(job_index.FIELD_COMPANY, keyword=keyword, city=city, days=days, limit=30)
+        company_data = [{"name": k, "count": v} for k, v in word_freq.items()]
     if not company_data:
         # 使用示例数据
         company_data = [
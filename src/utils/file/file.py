@@ -1,14 +1,50 @@
 import os
+import hashlib
+import threading
+import time
 import requests
 import uuid
 import chardet
+from collections import OrderedDict
 from io import BytesIO
 from typing import Literal,Callable, Any, Optional,Union
 from pydantic import BaseModel, Field, field_validator,PrivateAttr
 from urllib.parse import urlparse
-from pptx import Presentation
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 MAX_FILE_SIZE = 10 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 下载分块大小
+ENCODING_SNIFF_SIZE = 64 * 1024  # 编码探测只读取前 64KB
+DOWNLOAD_CACHE_MAX_ENTRIES = 128  # URL+ETag 下载缓存的最大条目数
+DOWNLOAD_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 下载缓存的总字节数上限
+DOWNLOAD_CACHE_MAX_AGE = 24 * 3600  # 下载缓存文件的最长保留时间（秒）
+ENCODING_MIN_CONFIDENCE = 0.8  # 前缀编码探测低于该置信度时改为全量探测
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    获取进程内共享的 requests.Session（连接池复用 + 幂等请求重试）
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                retry = Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(["GET", "HEAD"]),
+                )
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
 
 class File(BaseModel):
     """
@@ -90,6 +126,132 @@ def infer_file_category(path_or_url: str) -> tuple[str, str]:
 
     return 'default', ext_with_dot
 
+class _DownloadCache:
+    """
+    远程文件的本地下载缓存，缓存文件按 URL+ETag 定位
+    同一个上传文件在多轮对话中重复出现时，通过 If-None-Match 条件请求命中 304，避免重复下载
+    条目数、总字节数和存活时间都有上限；索引只在进程内，启动时清理目录里过期的缓存文件和残留的临时文件
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_entries: int = DOWNLOAD_CACHE_MAX_ENTRIES,
+        max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES,
+        max_age: float = DOWNLOAD_CACHE_MAX_AGE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # url -> (etag, 本地缓存路径, 字节数, 写入时间)，按最近使用排序
+        self._index: "OrderedDict[str, tuple[str, str, int, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._remove_stale_files()
+
+    def _path_for(self, url: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{url}\n{etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest)
+
+    def _remove_stale_files(self) -> None:
+        """
+        清理超过 max_age 的缓存文件（包括写入中断残留的 .tmp）
+        上一个进程的索引已丢失，这些文件不会再被命中；未过期的文件可能属于同目录下的其他 worker，保留
+        """
+        deadline = time.time() - self.max_age
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _pop(self, url: str) -> Optional[tuple[str, str, int, float]]:
+        entry = self._index.pop(url, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+        return entry
+
+    def lookup(self, url: str) -> Optional[tuple[str, str]]:
+        """返回 (etag, 本地路径)；未命中、已过期或缓存文件已被清理时返回 None"""
+        expired = None
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            if time.time() - entry[3] > self.max_age:
+                self._pop(url)
+                expired = entry[1]
+            elif not os.path.exists(entry[1]):
+                self._pop(url)
+                return None
+            else:
+                self._index.move_to_end(url)
+                return entry[0], entry[1]
+
+        try:
+            os.remove(expired)
+        except OSError:
+            pass
+        return None
+
+    def store(self, url: str, etag: Optional[str], content: Union[bytes, bytearray]) -> None:
+        """写入缓存；没有 ETag 的响应无法做条件请求，超过 max_bytes 的单个文件也不缓存"""
+        size = len(content)
+        if not etag or size > self.max_bytes:
+            return
+        path = self._path_for(url, etag)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 缓存写入失败不影响主流程
+            return
+
+        evicted = []
+        with self._lock:
+            old = self._pop(url)
+            if old and old[1] != path:
+                evicted.append(old[1])
+            self._index[url] = (etag, path, size, time.time())
+            self._total_bytes += size
+            while len(self._index) > self.max_entries or self._total_bytes > self.max_bytes:
+                old_url = next(iter(self._index))
+                evicted.append(self._pop(old_url)[1])
+
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _read_file_into_buffer(path: str) -> bytearray:
+    """按文件大小预分配缓冲区，readinto 直接写入，避免中间拷贝"""
+    size = os.path.getsize(path)
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    with open(path, 'rb', buffering=0) as f:
+        while pos < size:
+            n = f.readinto(view[pos:])
+            if not n:
+                break
+            pos += n
+    view.release()
+    if pos < size:
+        del buf[pos:]
+    return buf
+
+
 class FileOps:
     DOWNLOAD_DIR = "/tmp"
 
@@ -102,38 +264,81 @@ class FileOps:
         return file_obj.url
 
     @staticmethod
-    def _get_bytes_stream(file_obj:File) -> tuple[bytes, str]:
+    def _read_response_body(resp: requests.Response) -> bytearray:
+        """
+        读取响应 Body, 超出 MAX_FILE_SIZE 抛异常
+        声明了 Content-Length 且未压缩时预分配缓冲区, 分块直接写入, 不再经过 BytesIO.getvalue() 的整体拷贝
+        """
+        content_length = resp.headers.get('Content-Length')
+        declared = int(content_length) if content_length and content_length.isdigit() else None
+        if declared is not None and declared > MAX_FILE_SIZE:
+            raise Exception(
+                f"文件大小 ({declared} bytes) 超过限制 5MB，已终止下载。"
+            )
+
+        # gzip 等压缩编码下 Content-Length 是压缩后的大小，不能用于预分配
+        content_encoding = resp.headers.get('Content-Encoding', '').lower()
+        preallocate = declared is not None and content_encoding in ('', 'identity')
+        buf = bytearray(declared if preallocate else 0)
+        view = memoryview(buf) if preallocate else None
+        current_size = 0
+
+        # 场景：Header 缺失 Content-Length 或服务器 Header 欺骗
+        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if not chunk:
+                continue
+            n = len(chunk)
+            if current_size + n > MAX_FILE_SIZE:
+                raise Exception(f"检测到文件超过 5MB，已中断。")
+            if view is not None and current_size + n <= declared:
+                view[current_size:current_size + n] = chunk
+            else:
+                if view is not None:
+                    # 实际内容比声明的长，退化为追加写
+                    view.release()
+                    view = None
+                    del buf[current_size:]
+                buf.extend(chunk)
+            current_size += n
+
+        if view is not None:
+            view.release()
+            if current_size < declared:
+                del buf[current_size:]
+        return buf
+
+    @staticmethod
+    def _download_and_cache(url: str, resp: requests.Response) -> bytearray:
+        resp.raise_for_status()
+        content = FileOps._read_response_body(resp)
+        _download_cache.store(url, resp.headers.get('ETag'), content)
+        return content
+
+    @staticmethod
+    def _get_bytes_stream(file_obj:File) -> tuple[Union[bytes, bytearray], str]:
         """
         获取文件内容和后缀, 5MB大小限制检查, 超出抛异常
+        远程文件走共享连接池, 并按 URL+ETag 复用本地下载缓存
         """
         _, ext = infer_file_category(file_obj.url)
 
         if file_obj.is_remote:
+            cached = _download_cache.lookup(file_obj.url)
+            headers = {'If-None-Match': cached[0]} if cached else {}
             try:
                 # stream=True: 此时只下载 Headers，连接保持打开，还没下载 Body
-                with requests.get(file_obj.url, stream=True, timeout=60) as resp:
-                    resp.raise_for_status()
-
-                    content_length = resp.headers.get('Content-Length')
-                    if content_length and int(content_length) > MAX_FILE_SIZE:
-                        raise Exception(
-                            f"文件大小 ({int(content_length)} bytes) 超过限制 5MB，已终止下载。"
-                        )
-
-                    # 场景：Header 缺失 Content-Length 或服务器 Header 欺骗
-                    downloaded_content = BytesIO()
-                    current_size = 0
-
-                    # 分块读取，每块 8KB
-                    for chunk in resp.iter_content(chunk_size=8192):
-                        if chunk:
-                            current_size += len(chunk)
-                            if current_size > MAX_FILE_SIZE:
-                                raise Exception(f"检测到文件超过 5MB，已中断。")
-                            downloaded_content.write(chunk)
-
-                    # 获取完整 bytes
-                    return downloaded_content.getvalue(), ext
+                with get_http_session().get(file_obj.url, headers=headers, stream=True, timeout=60) as resp:
+                    if cached and resp.status_code == 304:
+                        try:
+                            return _read_file_into_buffer(cached[1]), ext
+                        except OSError:
+                            # 缓存文件在 304 返回前被清理（过期或其他 worker 启动清理），重新完整下载
+                            pass
+                    else:
+                        return FileOps._download_and_cache(file_obj.url, resp), ext
+
+                with get_http_session().get(file_obj.url, stream=True, timeout=60) as resp:
+                    return FileOps._download_and_cache(file_obj.url, resp), ext
 
             except requests.RequestException as e:
                 raise RuntimeError(f"网络请求失败: {e}")
@@ -148,8 +353,7 @@ class FileOps:
                  raise Exception(f"本地文件大小 ({file_size} bytes) 超过限制 5MB")
             '''
 
-            with open(file_obj.url, 'rb') as f:
-                return f.read(), ext
+            return _read_file_into_buffer(file_obj.url), ext
 
     @staticmethod
     def save_to_local(file_obj: File, filename: str) -> str:
@@ -172,10 +376,10 @@ class FileOps:
             local_path = os.path.join(FileOps.DOWNLOAD_DIR, filename)
 
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-            with requests.get(file_obj.url, headers=headers, stream=True, timeout=120) as r:
+            with get_http_session().get(file_obj.url, headers=headers, stream=True, timeout=120) as r:
                 r.raise_for_status()
                 with open(local_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                         f.write(chunk)
 
             return local_path
@@ -183,10 +387,11 @@ class FileOps:
             raise RuntimeError(f"Download failed for {file_obj.url}: {str(e)}")
 
     @staticmethod
-    def read_bytes(file_obj:File) -> bytes:
+    def read_bytes(file_obj:File) -> Union[bytes, bytearray]:
         """
         获取文件的原始二进制数据
         场景：上传到OSS、保存到本地、传给图像处理库
+        每次调用都是新分配的缓冲区，直接返回 bytearray，不再拷贝成 bytes
         """
         content, _ = FileOps._get_bytes_stream(file_obj)
         return content
@@ -203,18 +408,31 @@ class FileOps:
             if ext in ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx']:
                 return FileOps._parse_document_bytes(file_obj, content, ext)
 
-            # 默认直接读
-            charset = chardet.detect(content)
-            if 'encoding' in charset:
-                return content.decode(charset['encoding'])
-            else:
-                return content.decode('utf-8')
+            # 默认直接读，编码探测只看前 ENCODING_SNIFF_SIZE 字节
+            return FileOps._decode_text(content)
 
         except Exception as e:
             return f"[FileOps Error] Failed to read content: {str(e)}"
 
     @staticmethod
-    def _parse_document_bytes(file_obj: File, content: bytes, ext:str) -> str:
+    def _decode_text(content: Union[bytes, bytearray]) -> str:
+        detected = chardet.detect(content[:ENCODING_SNIFF_SIZE])
+        if len(content) > ENCODING_SNIFF_SIZE and (detected.get('confidence') or 0) < ENCODING_MIN_CONFIDENCE:
+            # 前缀探测置信度低时（如前缀里非 ASCII 字符太少），用全量内容重新探测
+            detected = chardet.detect(content)
+        encoding = detected.get('encoding') or 'utf-8'
+        # 前缀全是 ASCII 时 chardet 返回 ascii，后面出现中文会解码失败，按 utf-8 处理
+        if encoding.lower() == 'ascii':
+            encoding = 'utf-8'
+        try:
+            return content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            # 前缀探测不准时回退到全量探测
+            encoding = chardet.detect(content).get('encoding') or 'utf-8'
+            return content.decode(encoding, errors='replace')
+
+    @staticmethod
+    def _parse_document_bytes(file_obj: File, content: Union[bytes, bytearray], ext:str) -> str:
         stream = BytesIO(content)
         text_result = ""
 
@@ -244,6 +462,9 @@ class FileOps:
 
         return text_result
 
+
+_download_cache = _DownloadCache(os.path.join(FileOps.DOWNLOAD_DIR, "fileops_cache"))
+
 def read_docx(cont_stream) -> str:
     """
     使用docx2python按顺序读取内容
@@ -278,7 +499,9 @@ def read_docx(cont_stream) -> str:
     return "\n\n".join(all_parts)
 
 def read_ppt(file_input: Union[str, bytes, BytesIO]) -> str:
-    if not Presentation:
+    try:
+        from pptx import Presentation
+    except ImportError:
         return "[Error] 未安装 python-pptx 库，无法解析 PPT 文件"
 
     # 1. 统一转换为文件流对象 (BytesIO)
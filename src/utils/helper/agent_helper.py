@@ -1,3 +1,4 @@
+import re
 import uuid
 import json
 import os
@@ -130,15 +131,118 @@ def to_client_message(d: Dict[str, Any]) -> Tuple[ClientMessage, str]:
     ), d.get("session_id", "")
 
 
-def _merge_tool_call_chunks(chunks: List[Any]) -> List[Dict[str, Any]]:
-    merged: Dict[int, Dict[str, Any]] = {}
-    for chunk in chunks:
+def _chunk_part(value: Any) -> str:
+    # Normalize to string to avoid type errors during merge
+    if isinstance(value, list):
+        return "".join(str(x) for x in value)
+    return value or ""
+
+
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+_JSON_STRUCT_SPECIAL = re.compile(r'["{}\[\]]')
+_JSON_NON_SPACE = re.compile(r"\S")
+
+
+class _JsonObjectScanner:
+    """
+    Incrementally track whether streamed tool-call args form a complete JSON object.
+    Each feed only scans the new fragment (string / escape / depth state is kept),
+    so completeness is known without re-parsing the accumulated text.
+    """
+
+    __slots__ = ("depth", "in_string", "escape", "started", "complete", "invalid")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self.invalid = False
+
+    def feed(self, fragment: str) -> None:
+        pos, end = 0, len(fragment)
+        while pos < end and not self.invalid:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    pos += 1
+                    continue
+                m = _JSON_STRING_SPECIAL.search(fragment, pos)
+                if m is None:
+                    return
+                pos = m.end()
+                if m.group() == "\\":
+                    self.escape = True
+                else:
+                    self.in_string = False
+                continue
+            if not self.started or self.complete:
+                # Only whitespace may surround the top-level object
+                m = _JSON_NON_SPACE.search(fragment, pos)
+                if m is None:
+                    return
+                if self.complete or m.group() not in "{[":
+                    self.invalid = True
+                    return
+                pos = m.start()
+            m = _JSON_STRUCT_SPECIAL.search(fragment, pos)
+            if m is None:
+                return
+            pos = m.end()
+            ch = m.group()
+            if ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                self.started = True
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                elif self.depth < 0:
+                    self.invalid = True
+
+
+class _ToolCallBuffer:
+    __slots__ = ("index", "id_parts", "name_parts", "args_parts", "args_scanner")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id_parts: List[str] = []
+        self.name_parts: List[str] = []
+        self.args_parts: List[str] = []
+        self.args_scanner = _JsonObjectScanner()
+
+    def parameters(self) -> Dict[str, Any]:
+        """Parse args once; skip json.loads when the scanner already knows they are incomplete/invalid"""
+        scanner = self.args_scanner
+        if not scanner.complete or scanner.invalid:
+            return {}
+        try:
+            parsed = json.loads("".join(self.args_parts))
+        except Exception:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+
+class ToolCallChunkMerger:
+    """
+    Merge streamed tool_call_chunks in linear time: fragments are appended to per-index
+    list buffers and joined once at flush; chunk objects are not retained.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[int, _ToolCallBuffer] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._buffers)
+
+    def add(self, chunk: Any) -> None:
         # chunk can be dict or object
         if isinstance(chunk, dict):
             index = chunk.get("index")
-            c_id = chunk.get("id")
-            c_name = chunk.get("name")
-            c_args = chunk.get("args")
+            c_id, c_name, c_args = chunk.get("id"), chunk.get("name"), chunk.get("args")
         else:
             index = getattr(chunk, "index", None)
             c_id = getattr(chunk, "id", None)
@@ -146,27 +250,45 @@ def _merge_tool_call_chunks(chunks: List[Any]) -> List[Dict[str, Any]]:
             c_args = getattr(chunk, "args", None)
 
         if index is None:
-            continue
-
-        # Normalize to string to avoid type errors during merge
-        c_id_str = "".join(str(x) for x in c_id) if isinstance(c_id, list) else (c_id or "")
-        c_name_str = "".join(str(x) for x in c_name) if isinstance(c_name, list) else (c_name or "")
-        c_args_str = "".join(str(x) for x in c_args) if isinstance(c_args, list) else (c_args or "")
-
-        if index not in merged:
-            merged[index] = {
-                "index": index,
-                "id": c_id_str,
-                "name": c_name_str,
-                "args": c_args_str,
+            return
+
+        buf = self._buffers.get(index)
+        if buf is None:
+            buf = self._buffers[index] = _ToolCallBuffer(index)
+        id_part, name_part, args_part = _chunk_part(c_id), _chunk_part(c_name), _chunk_part(c_args)
+        if id_part:
+            buf.id_parts.append(id_part)
+        if name_part:
+            buf.name_parts.append(name_part)
+        if args_part:
+            buf.args_parts.append(args_part)
+            buf.args_scanner.feed(args_part)
+
+    def extend(self, chunks: List[Any]) -> None:
+        for chunk in chunks:
+            self.add(chunk)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Return merged tool calls (args parsed into "parameters") and reset"""
+        merged = [
+            {
+                "index": buf.index,
+                "id": "".join(buf.id_parts),
+                "name": "".join(buf.name_parts),
+                "args": "".join(buf.args_parts),
+                "parameters": buf.parameters(),
                 "type": "tool_call",
             }
-        else:
-            merged[index]["id"] += c_id_str
-            merged[index]["name"] += c_name_str
-            merged[index]["args"] += c_args_str
+            for buf in self._buffers.values()
+        ]
+        self._buffers = {}
+        return merged
+
 
-    return list(merged.values())
+def _merge_tool_call_chunks(chunks: List[Any]) -> List[Dict[str, Any]]:
+    merger = ToolCallChunkMerger()
+    merger.extend(chunks)
+    return merger.flush()
 
 
 def _item_to_server_messages(
@@ -193,7 +315,7 @@ def _item_to_server_messages(
             session_id=session_id,
             query_msg_id=query_msg_id,
             reply_id=reply_id,
-            msg_id=str(uuid.uuid4()),
+            msg_id="",  # 由 _iter_body_to_server_messages 按逻辑消息分配稳定 id
             sequence_id=seq,
             finish=finish,
             content=content,
@@ -291,29 +413,16 @@ def _iter_body_to_server_messages(
     # Keys are derived from meta to keep same msg_id across chunks
     stable_ids: Dict[Tuple[str, Any], str] = {}
 
-    accumulated_tool_chunks: List[Any] = []
+    tool_chunk_merger = ToolCallChunkMerger()
     accumulated_tool_response_content: Dict[str, str] = {}
 
     def _flush_tool_chunks(seq_num: int) -> Tuple[List[ServerMessage], int]:
-        nonlocal accumulated_tool_chunks
         msgs: List[ServerMessage] = []
-        if not accumulated_tool_chunks:
+        if not tool_chunk_merger:
             return msgs, seq_num
 
-        merged_tcs = _merge_tool_call_chunks(accumulated_tool_chunks)
-        accumulated_tool_chunks = []
-        for tc in merged_tcs:
-            raw_args = tc.get("args", {})
-            if isinstance(raw_args, str):
-                try:
-                    parsed = json.loads(raw_args)
-                    parameters = parsed if isinstance(parsed, dict) else {}
-                except Exception:
-                    parameters = {}
-            elif isinstance(raw_args, dict):
-                parameters = raw_args
-            else:
-                parameters = {}
+        for tc in tool_chunk_merger.flush():
+            parameters = tc["parameters"]
             tool_call_id = tc.get("id", "")
             tool_name = tc.get("name", "")
 
@@ -329,7 +438,7 @@ def _iter_body_to_server_messages(
                     session_id=session_id,
                     query_msg_id=query_msg_id,
                     reply_id=reply_id,
-                    msg_id=str(uuid.uuid4()),
+                    msg_id="",
                     sequence_id=seq_num,
                     finish=True,
                     content=content,
@@ -360,7 +469,7 @@ def _iter_body_to_server_messages(
         # because usually tool calls and text content are either separate or tool calls come first.
         # But let's be safe: only flush on ToolMessage or if is_last=True on AIMessageChunk.
 
-        if chunk_type == "ToolMessage" and accumulated_tool_chunks:
+        if chunk_type == "ToolMessage" and tool_chunk_merger:
             f_msgs, seq = _flush_tool_chunks(seq)
             flushed_msgs.extend(f_msgs)
 
@@ -368,15 +477,15 @@ def _iter_body_to_server_messages(
         if chunk_type == "AIMessageChunk":
             tc_chunks = getattr(chunk, "tool_call_chunks", None)
             if tc_chunks:
-                accumulated_tool_chunks.extend(tc_chunks)
+                tool_chunk_merger.extend(tc_chunks)
             # If we have accumulated chunks but this chunk has NO tool_call_chunks,
             # it implies the tool definition phase is likely over.
-            elif accumulated_tool_chunks:
+            elif tool_chunk_merger:
                 f_msgs, seq = _flush_tool_chunks(seq)
                 flushed_msgs.extend(f_msgs)
 
             # Flush if this is the last chunk
-            if is_last and accumulated_tool_chunks:
+            if is_last and tool_chunk_merger:
                 f_msgs, seq = _flush_tool_chunks(seq)
                 flushed_msgs.extend(f_msgs)
 
@@ -414,7 +523,7 @@ def _iter_body_to_server_messages(
                         session_id=session_id,
                         query_msg_id=query_msg_id,
                         reply_id=reply_id,
-                        msg_id=str(uuid.uuid4()),
+                        msg_id="",
                         sequence_id=seq,
                         finish=True,
                         content=content,
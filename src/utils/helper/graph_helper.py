@@ -3,6 +3,7 @@ import inspect
 import importlib
 import ast
 import textwrap
+import threading
 from pydantic import BaseModel
 from typing import get_type_hints,Type,Optional,get_origin,Union,get_args
 from langgraph.graph.state import CompiledStateGraph
@@ -16,9 +17,21 @@ def get_graph_instance(module_name):
             return obj
     return None
 
+_agent_instances = {}
+_agent_instances_lock = threading.Lock()
+
+
 def get_agent_instance(module_name, ctx):
-    module = importlib.import_module(module_name)
-    return module.build_agent(ctx)
+    # 编译后的 agent 不持有请求状态，按模块只构建一次并在请求间复用（预热时构建的实例即被复用）；
+    # 与请求相关的 ctx 通过 graph 调用的 context 传入，不在构建时绑定
+    agent = _agent_instances.get(module_name)
+    if agent is None:
+        with _agent_instances_lock:
+            agent = _agent_instances.get(module_name)
+            if agent is None:
+                module = importlib.import_module(module_name)
+                agent = _agent_instances[module_name] = module.build_agent(None)
+    return agent
 
 # return: func, input_class, output_class
 def get_graph_node_func_with_inout(graph, node_name):
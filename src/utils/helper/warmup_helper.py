@@ -0,0 +1,177 @@
+"""
+启动预热
+
+首个请求原本要承担 agent 构建（导入全部工具模块）、checkpointer 连接池、matplotlib 字体扫描、
+报告模板编译等开销。服务启动后在后台线程依次执行预热步骤，完成前 /ready 返回 503，
+负载均衡只把流量转发到已预热的实例；/health 仅表示进程存活，不受影响。
+
+配置（环境变量）：
+- WARMUP_ENABLED：是否预热，默认 true；关闭时启动即就绪
+- WARMUP_STEPS：预热步骤（逗号分隔），默认 agent,checkpointer,fonts,charts,report
+- WARMUP_SYNTHETIC_PROMPT：非空时额外以该提示词跑一次完整请求（会调用模型，默认关闭）
+
+生产环境使用 PostgreSQL 会话记忆时，main 额外加入 database 步骤（异步健康检查），数据库不可用时不就绪。
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.helper import graph_helper
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+DEFAULT_WARMUP_STEPS = "agent,checkpointer,fonts,charts,report"
+WARMUP_STEPS = [s.strip() for s in os.getenv("WARMUP_STEPS", DEFAULT_WARMUP_STEPS).split(",") if s.strip()]
+WARMUP_SYNTHETIC_PROMPT = os.getenv("WARMUP_SYNTHETIC_PROMPT", "")
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+def _warm_agent() -> None:
+    """导入 agents.agent（连带全部工具模块）并构建一次 agent"""
+    if graph_helper.is_agent_proj():
+        graph_helper.get_agent_instance("agents.agent", None)
+
+
+def _warm_checkpointer() -> None:
+    """创建会话记忆；生产环境会打开 PostgreSQL 连接池并建表"""
+    from storage.database.checkpointer import get_checkpointer
+    get_checkpointer()
+
+
+def _warm_fonts() -> None:
+    """导入 matplotlib 并完成中文字体扫描、样式配置"""
+    from tools.visualization_tool import _init_matplotlib
+    _init_matplotlib()
+
+
+def _warm_charts() -> None:
+    """离屏绘制一张含中文的小图，初始化 Agg 后端与字体缓存；同时导入词云依赖"""
+    from tools.visualization_tool import _new_figure
+    import wordcloud  # noqa: F401
+
+    fig, ax = _new_figure((2, 2))
+    ax.bar(["薪资"], [1])
+    ax.set_title("预热")
+    fig.canvas.draw()
+
+
+def _warm_report() -> None:
+    """编译 HTML 报告模板，初始化 Markdown 渲染与代码高亮"""
+    from tools.html_report_tool import REPORT_TEMPLATE, _get_template_env
+    from tools.report_assets import highlight_css, render_markdown
+
+    _get_template_env().get_template(REPORT_TEMPLATE)
+    render_markdown("## 预热\n\n```python\nprint('ok')\n```")
+    highlight_css()
+
+
+WARMUP_STEP_FUNCS: Dict[str, Callable[[], Any]] = {
+    "agent": _warm_agent,
+    "checkpointer": _warm_checkpointer,
+    "fonts": _warm_fonts,
+    "charts": _warm_charts,
+    "report": _warm_report,
+}
+
+
+class WarmupState:
+    """预热进度，供 /ready 查询（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = STATUS_PENDING
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == STATUS_READY
+
+    def _set(self, **kwargs) -> None:
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+    def _record(self, name: str, **info) -> None:
+        with self._lock:
+            self.steps.setdefault(name, {}).update(info)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = None
+            if self.started_at is not None:
+                elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+            return {
+                "status": self.status,
+                "elapsed_seconds": elapsed,
+                "steps": {name: dict(info) for name, info in self.steps.items()},
+            }
+
+
+warmup_state = WarmupState()
+
+
+def run_warmup(
+    steps: Optional[List[str]] = None,
+    *,
+    extra_steps: Optional[Dict[str, Callable[[], Any]]] = None,
+    state: Optional[WarmupState] = None,
+) -> WarmupState:
+    """
+    按顺序执行预热步骤（阻塞，调用方放到后台线程）
+    任一步骤失败则状态为 failed，/ready 持续返回 503，便于发现配置问题
+    """
+    state = state or warmup_state
+    funcs = {**WARMUP_STEP_FUNCS, **(extra_steps or {})}
+    names = list(WARMUP_STEPS if steps is None else steps)
+    names += [name for name in (extra_steps or {}) if name not in names]
+
+    state._set(status=STATUS_RUNNING, started_at=time.time(), finished_at=None)
+    failed = False
+    for name in names:
+        func = funcs.get(name)
+        if func is None:
+            logger.warning(f"Unknown warmup step: {name}")
+            state._record(name, status="skipped")
+            continue
+        state._record(name, status=STATUS_RUNNING)
+        start = time.perf_counter()
+        try:
+            func()
+            state._record(name, status=STATUS_READY, seconds=round(time.perf_counter() - start, 3))
+        except Exception as e:
+            failed = True
+            logger.error(f"Warmup step {name} failed: {e}", exc_info=True)
+            state._record(name, status=STATUS_FAILED, seconds=round(time.perf_counter() - start, 3), error=str(e))
+
+    state._set(status=STATUS_FAILED if failed else STATUS_READY, finished_at=time.time())
+    logger.info(f"Warmup finished: {state.snapshot()}")
+    return state
+
+
+def mark_ready(state: Optional[WarmupState] = None) -> WarmupState:
+    """不预热时直接标记就绪"""
+    state = state or warmup_state
+    now = time.time()
+    state._set(status=STATUS_READY, started_at=now, finished_at=now)
+    return state
+
+
+__all__ = [
+    "WARMUP_ENABLED",
+    "WARMUP_STEPS",
+    "WARMUP_SYNTHETIC_PROMPT",
+    "WarmupState",
+    "warmup_state",
+    "run_warmup",
+    "mark_ready",
+]
@@ -0,0 +1,239 @@
+"""
+SSE 编码
+
+流式回答的每个 token 都是一条 answer 消息。通用路径是 asdict(ServerMessage) + json.dumps，
+每个 token 都要递归复制整个消息结构再完整序列化一次。
+SSEEncoder 针对一次回复做增量编码：
+
+- 信封中不变的字段（type/session_id/query_msg_id/reply_id/log_id）及空的 content 字段按回复预渲染并缓存
+- answer/thinking 消息只序列化增量文本、msg_id、sequence_id 和 finish
+- 其他消息（tool_request、message_end 等）以及普通 dict 走通用序列化
+
+输出与 json.dumps(..., ensure_ascii=False) 的结果逐字节一致，客户端无需改动。
+
+coalesce_answers 是可选的合帧模式：把同一段回答的连续 token 合并为一帧（每 N 毫秒或满 M 字节发送一次），
+遇到 tool_request/tool_response/message_end 等其他消息立即发送，减少长回答的小包写入次数。
+"""
+
+import os
+import json
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from utils.messages.server import (
+    ServerMessage,
+    MESSAGE_TYPE_ANSWER,
+    MESSAGE_TYPE_THINKING,
+)
+
+SSE_PREFIX = "event: message\ndata: "
+SSE_SUFFIX = "\n\n"
+
+_CONTENT_FIELDS = ("answer", "thinking", "tool_request", "tool_response", "message_start", "message_end")
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def encode_sse_event(data: Any) -> str:
+    """通用路径：任意可 JSON 序列化的数据"""
+    return f"{SSE_PREFIX}{json.dumps(data, ensure_ascii=False, default=str)}{SSE_SUFFIX}"
+
+
+def _content_template(field_name: str) -> Tuple[str, str]:
+    """content 中只有 field_name 有值时，值前后的固定文本"""
+    idx = _CONTENT_FIELDS.index(field_name)
+    before = "".join(f'"{name}": null, ' for name in _CONTENT_FIELDS[:idx])
+    after = "".join(f', "{name}": null' for name in _CONTENT_FIELDS[idx + 1:])
+    return '{' + before + f'"{field_name}": ', after + '}'
+
+
+_TEXT_CONTENT_TEMPLATES = {
+    MESSAGE_TYPE_ANSWER: _content_template("answer"),
+    MESSAGE_TYPE_THINKING: _content_template("thinking"),
+}
+
+
+class SSEEncoder:
+    """一次流式回复使用一个实例（非线程安全）"""
+
+    def __init__(self):
+        self._heads: Dict[Tuple[str, str, str, str], str] = {}
+        self._tails: Dict[str, str] = {}
+        self._msg_ids: Dict[str, str] = {}
+
+    def _head(self, sm: ServerMessage) -> str:
+        key = (sm.type, sm.session_id, sm.query_msg_id, sm.reply_id)
+        head = self._heads.get(key)
+        if head is None:
+            head = (
+                f'{SSE_PREFIX}{{"type": {_dumps(sm.type)}, "session_id": {_dumps(sm.session_id)}, '
+                f'"query_msg_id": {_dumps(sm.query_msg_id)}, "reply_id": {_dumps(sm.reply_id)}, "msg_id": '
+            )
+            self._heads[key] = head
+        return head
+
+    def _tail(self, log_id: str) -> str:
+        tail = self._tails.get(log_id)
+        if tail is None:
+            tail = f', "log_id": {_dumps(log_id)}}}{SSE_SUFFIX}'
+            self._tails[log_id] = tail
+        return tail
+
+    def _msg_id(self, msg_id: str) -> str:
+        encoded = self._msg_ids.get(msg_id)
+        if encoded is None:
+            encoded = _dumps(msg_id)
+            self._msg_ids[msg_id] = encoded
+        return encoded
+
+    def encode(self, data: Any) -> str:
+        if isinstance(data, ServerMessage):
+            template = _TEXT_CONTENT_TEMPLATES.get(data.type)
+            if template is not None:
+                text = self._text_delta(data)
+                if text is not None and isinstance(data.msg_id, str) and isinstance(data.log_id, str):
+                    before, after = template
+                    return "".join((
+                        self._head(data),
+                        self._msg_id(data.msg_id),
+                        ', "sequence_id": ', str(int(data.sequence_id)),
+                        ', "finish": ', "true" if data.finish else "false",
+                        ', "content": ', before, _dumps(text), after,
+                        self._tail(data.log_id),
+                    ))
+            return encode_sse_event(data.dict())
+        return encode_sse_event(data)
+
+    @staticmethod
+    def _text_delta(sm: ServerMessage):
+        """只有对应的文本字段有值（且为 str）时返回该文本，否则走通用路径"""
+        content = sm.content
+        field_name = "answer" if sm.type == MESSAGE_TYPE_ANSWER else "thinking"
+        text = getattr(content, field_name)
+        if not isinstance(text, str):
+            return None
+        for name in _CONTENT_FIELDS:
+            if name != field_name and getattr(content, name) is not None:
+                return None
+        return text
+
+
+STREAM_COALESCE_MS = int(os.getenv("STREAM_COALESCE_MS", "0"))  # 默认合帧间隔，0 表示不合帧
+STREAM_COALESCE_BYTES = int(os.getenv("STREAM_COALESCE_BYTES", "2048"))  # 单帧累计达到该字节数立即发送
+
+
+@dataclass
+class CoalesceOptions:
+    interval_ms: int = 30
+    max_bytes: int = STREAM_COALESCE_BYTES
+
+
+def resolve_coalesce_options(params: Mapping[str, str]) -> Optional[CoalesceOptions]:
+    """
+    按请求参数解析合帧配置，未指定时使用 STREAM_COALESCE_MS/STREAM_COALESCE_BYTES
+    - coalesce_ms：合帧间隔（毫秒），0 关闭
+    - coalesce_bytes：单帧最大字节数
+    """
+    try:
+        interval_ms = int(params.get("coalesce_ms", STREAM_COALESCE_MS))
+        max_bytes = int(params.get("coalesce_bytes", STREAM_COALESCE_BYTES))
+    except (TypeError, ValueError):
+        return None
+    if interval_ms <= 0:
+        return None
+    return CoalesceOptions(interval_ms=interval_ms, max_bytes=max(1, max_bytes))
+
+
+def _is_answer_delta(item: Any) -> bool:
+    return (
+        isinstance(item, ServerMessage)
+        and item.type == MESSAGE_TYPE_ANSWER
+        and SSEEncoder._text_delta(item) is not None
+    )
+
+
+async def coalesce_answers(source: AsyncIterable[Any], options: CoalesceOptions) -> AsyncIterator[Any]:
+    """
+    合并同一段回答（相同 msg_id）的连续 answer 消息；输出的 sequence_id 重新连续编号。
+    等待下一条消息时不取消上游的 __anext__，超时只触发发送已缓冲的内容。
+    """
+    loop = asyncio.get_running_loop()
+    interval = options.interval_ms / 1000
+    it = source.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    buffer: Optional[ServerMessage] = None
+    parts: List[str] = []
+    size = 0
+    deadline = 0.0
+    next_seq: Optional[int] = None
+
+    def _renumber(item: Any) -> Any:
+        nonlocal next_seq
+        if isinstance(item, ServerMessage):
+            seq = item.sequence_id
+        elif isinstance(item, dict) and isinstance(item.get("sequence_id"), int):
+            seq = item["sequence_id"]
+        else:
+            return item
+        if next_seq is None:
+            next_seq = seq
+        if isinstance(item, ServerMessage):
+            item.sequence_id = next_seq
+        else:
+            item["sequence_id"] = next_seq
+        next_seq += 1
+        return item
+
+    def _flush() -> ServerMessage:
+        nonlocal buffer, parts, size
+        frame = buffer
+        frame.content.answer = "".join(parts)
+        buffer, parts, size = None, [], 0
+        return _renumber(frame)
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(it.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer is not None else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield _flush()
+                continue
+            try:
+                item = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            if _is_answer_delta(item):
+                if buffer is not None and (buffer.msg_id != item.msg_id or buffer.reply_id != item.reply_id):
+                    yield _flush()
+                if buffer is None:
+                    buffer = item
+                    deadline = loop.time() + interval
+                else:
+                    buffer.finish = item.finish
+                parts.append(item.content.answer)
+                size += len(item.content.answer.encode("utf-8"))
+                if size >= options.max_bytes or buffer.finish:
+                    yield _flush()
+            else:
+                if buffer is not None:
+                    yield _flush()
+                yield _renumber(item)
+        if buffer is not None:
+            yield _flush()
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+__all__ = [
+    "SSEEncoder",
+    "encode_sse_event",
+    "CoalesceOptions",
+    "resolve_coalesce_options",
+    "coalesce_answers",
+]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+HTML 报告渲染基准：分析章节较大时的 Markdown 渲染与整页写入耗时
+
+用法：python tests/benchmark_html_report.py [章节KB数]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from tools import report_assets
+from tools.html_report_tool import _render_html_report
+
+
+def _section(kb: int) -> str:
+    para = "### 行业分析\n\n数据分析岗位需求增长 `SQL` 与 \"Python\" 是核心技能，薪资中位数 18K。\n\n"
+    return para * (kb * 1024 // len(para.encode("utf-8")) + 1)
+
+
+def _bench(label, fn, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    print(f"{label:<24}{(time.perf_counter() - start) / rounds * 1000:8.2f} ms")
+
+
+def main():
+    kb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    text = _section(kb)
+    print(f"每个章节约 {len(text.encode('utf-8')) // 1024} KB")
+    _bench("markdown (cold)", lambda: (report_assets._markdown_cache.clear(), report_assets.render_markdown(text)), 5)
+    _bench("markdown (cached)", lambda: report_assets.render_markdown(text))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.html")
+        _bench("render to file", lambda: _render_html_report(
+            path,
+            profile_data={"name": "基准"},
+            employment_analysis=text,
+            recommendations=text,
+            action_plan=text,
+            chat_history=None,
+            report_type="general",
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+测试图表输出管理：按会话分页查询、多会话共享图表、TTL 与磁盘配额淘汰、不删除也不统计未登记的文件
+"""
+
+import os
+import sys
+import time
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+from tools import chart_store
+from tools.chart_store import ChartStore
+
+
+def _chart(charts_dir, name, size=1024):
+    path = os.path.join(charts_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return path
+
+
+@pytest.fixture
+def charts_dir(tmp_path):
+    path = tmp_path / "charts"
+    path.mkdir()
+    return str(path)
+
+
+def _store(charts_dir, tmp_path, **kwargs):
+    return ChartStore(charts_dir, str(tmp_path / "index" / "charts.sqlite3"), **kwargs)
+
+
+def test_list_filters_by_session_and_paginates(charts_dir, tmp_path):
+    store = _store(charts_dir, tmp_path)
+    _chart(charts_dir, "legacy.png")  # 目录中原有的文件，没有所属会话
+    for i in range(5):
+        store.register(_chart(charts_dir, f"a{i}.png"), tool="t", params={"i": i}, session_id="A")
+    store.register(_chart(charts_dir, "b0.png"), session_id="B")
+
+    records, total = store.list(session_id="A", page=1, page_size=2)
+    assert total == 5
+    assert [os.path.basename(r.path) for r in records] == ["a4.png", "a3.png"]  # 最新生成的在前
+    records, _ = store.list(session_id="A", page=3, page_size=2)
+    assert [os.path.basename(r.path) for r in records] == ["a0.png"]
+    assert records[0].params_hash == chart_store.params_hash({"i": 0})
+
+    records, total = store.list(page_size=100)
+    assert total == 7 and "legacy.png" in {os.path.basename(r.path) for r in records}
+
+    # 被手动删除的文件在查询时移除
+    os.remove(os.path.join(charts_dir, "b0.png"))
+    assert store.list(session_id="B") == ([], 0)
+
+
+def test_quota_evicts_least_recently_used_managed_charts(charts_dir, tmp_path):
+    store = _store(charts_dir, tmp_path, quota_mb=2.5 / 1024)  # 2.5 KB，只统计登记的图表
+    legacy = _chart(charts_dir, "legacy.png")
+    store.sync(force=True)
+    old = _chart(charts_dir, "old.png")
+    store.register(old, session_id="A")
+    used = _chart(charts_dir, "used.png")
+    store.register(used, session_id="A")
+    time.sleep(0.01)
+    store.touch(old)  # old 最近被报告引用过
+    new = _chart(charts_dir, "new.png")
+    store.register(new, session_id="A")
+
+    # 超出配额时淘汰最久未访问的 used；未登记的文件不删除，刚生成的文件不删除
+    assert not os.path.exists(used)
+    assert all(os.path.exists(path) for path in (legacy, old, new))
+    assert store.list()[1] == 3
+
+
+def test_ttl_evicts_expired_charts_only(charts_dir, tmp_path, monkeypatch):
+    store = _store(charts_dir, tmp_path, ttl_days=1)
+    legacy = _chart(charts_dir, "legacy.png")
+    os.utime(legacy, (0, 0))
+    store.sync(force=True)
+    stale = _chart(charts_dir, "stale.png")
+    store.register(stale, session_id="A")
+
+    real_time = time.time
+    monkeypatch.setattr(chart_store.time, "time", lambda: real_time() + 2 * 86400)
+    assert store.evict() == [os.path.join(charts_dir, "stale.png")]
+    assert not os.path.exists(stale) and os.path.exists(legacy)
+
+
+def test_list_generated_charts_tool_uses_current_session(tmp_path, monkeypatch):
+    from tools import visualization_tool
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(chart_store, "_store", None)
+    os.makedirs("assets/charts")
+    chart_store.get_chart_store().register(_chart("assets/charts", "mine.png"), session_id="s1")
+    chart_store.get_chart_store().register(_chart("assets/charts", "other.png"), session_id="s2")
+
+    monkeypatch.setattr(visualization_tool, "current_session_id", lambda: "s1")
+    result = visualization_tool.list_generated_charts.invoke({})
+    assert "mine.png" in result and "other.png" not in result
+    result = visualization_tool.list_generated_charts.invoke({"scope": "all", "page_size": 1})
+    assert "共找到 2 个图表文件（第 1/2 页）" in result and "page=2" in result
+
+
+def test_quota_ignores_unmanaged_files(charts_dir, tmp_path):
+    store = _store(charts_dir, tmp_path, quota_mb=2.5 / 1024)
+    legacy = _chart(charts_dir, "legacy.png", size=10 * 1024)  # 未登记的文件本身已超过配额
+    store.sync(force=True)
+    panels = [_chart(charts_dir, f"panel{i}.png") for i in range(2)]
+    for path in panels:
+        store.register(path, session_id="A")
+
+    assert all(os.path.exists(path) for path in [legacy] + panels)
+    assert store.list(session_id="A")[1] == 2
+
+
+def test_chart_shared_by_sessions(charts_dir, tmp_path):
+    store = _store(charts_dir, tmp_path)
+    path = _chart(charts_dir, "shared.png")
+    store.register(path, session_id="A")
+    store.register(path, session_id="B")  # 另一会话以相同参数重新生成
+    store.claim([path], session_id="C")  # 缓存命中直接复用
+    store.claim([os.path.join(charts_dir, "missing.png")], session_id="C")
+
+    for session in ("A", "B", "C"):
+        records, total = store.list(session_id=session)
+        assert total == 1 and records[0].session_id == "A"  # 记录保留最初生成的会话
+    assert store.list()[1] == 1
+
+
+def test_two_sessions_rendering_same_chart(tmp_path, monkeypatch):
+    from tools import visualization_tool
+    from tools.tool_cache import invalidate_tool_cache
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(chart_store, "_store", None)
+    invalidate_tool_cache("generate_salary_distribution_chart")
+
+    def _render(session, counts):
+        result = visualization_tool.generate_salary_distribution_chart.invoke(
+            {"job_title": "数据分析师", "salary_ranges": ["0-10k", "10k+"], "counts": counts},
+            config={"configurable": {"thread_id": session}},
+        )
+        return next(line for line in result.splitlines() if "assets/charts/" in line).split("：", 1)[1].strip()
+
+    try:
+        path_a = _render("A", [3, 5])
+        content_a = open(path_a, "rb").read()
+        assert _render("B", [3, 5]) == path_a  # 缓存命中，复用同一文件
+        path_b = _render("B", [8, 1])  # 同名图表、不同数据：写入另一个文件，不覆盖 A 的图表
+    finally:
+        invalidate_tool_cache("generate_salary_distribution_chart")
+
+    assert path_b != path_a and open(path_a, "rb").read() == content_a
+    store = chart_store.get_chart_store()
+    assert [r.path for r in store.list(session_id="A")[0]] == [path_a]
+    assert sorted(r.path for r in store.list(session_id="B")[0]) == sorted([path_a, path_b])
@@ -0,0 +1,52 @@
+"""
+测试图表并发绘制：各线程使用独立的 Figure，结果与顺序绘制逐字节一致
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from tools import visualization_tool
+
+
+def _jobs(out_dir):
+    jobs = []
+    for i in range(4):
+        jobs.append(("salary", dict(job_title=f"职位{i}", salary_ranges=["0-10k", "10-20k", "20k+"],
+                                    counts=[i + 1, 2 * i + 3, 5]), f"salary_{i}.png"))
+        jobs.append(("trend", dict(title=f"趋势{i}", labels=["1月", "2月", "3月"], values=[10, 10 + i, 20],
+                                   chart_type="bar" if i % 2 else "line"), f"trend_{i}.png"))
+        jobs.append(("skills", dict(skills=["Python", "SQL", "Excel"][: i % 3 + 1], counts=[9, 7, 4][: i % 3 + 1],
+                                    chart_type="pie" if i % 2 else "horizontal_bar"), f"skills_{i}.png"))
+    return [(kind, params, os.path.join(out_dir, name)) for kind, params, name in jobs]
+
+
+def test_concurrent_rendering_matches_sequential(tmp_path):
+    sequential, concurrent = tmp_path / "sequential", tmp_path / "concurrent"
+    sequential.mkdir()
+    concurrent.mkdir()
+
+    for kind, params, path in _jobs(sequential):
+        visualization_tool._render_figure(kind, params, path, dpi=60)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda job: visualization_tool._render_figure(*job, dpi=60), _jobs(concurrent)))
+
+    names = sorted(os.listdir(sequential))
+    assert names == sorted(os.listdir(concurrent)) and len(names) == 12
+    for name in names:
+        assert (sequential / name).read_bytes() == (concurrent / name).read_bytes(), name
+
+
+def test_rendering_does_not_use_pyplot_figure_registry(tmp_path):
+    import matplotlib.pyplot as plt
+
+    before = plt.get_fignums()
+    visualization_tool._render_figure("trend", dict(title="趋势", labels=["1月", "2月"], values=[1, 2]),
+                                      str(tmp_path / "trend.png"), dpi=60)
+    assert plt.get_fignums() == before
@@ -0,0 +1,134 @@
+"""
+测试会话记忆 checkpointer：压缩序列化、内存版 LRU 淘汰、生产类型的异步接口与连接预算
+"""
+
+import os
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from storage.database.checkpointer import BoundedMemorySaver, CompressedSerializer
+
+
+def test_compressed_serializer_round_trip():
+    serde = CompressedSerializer(threshold=64)
+    history = [HumanMessage(content="帮我分析数据分析师的就业前景"), AIMessage(content="| 岗位 | 薪资 |\n" * 200)]
+
+    type_, data = serde.dumps_typed(history)
+    assert type_.endswith("+zstd")
+    assert serde.loads_typed((type_, data)) == history
+
+    # 小对象不压缩
+    small_type, _ = serde.dumps_typed({"a": 1})
+    assert not small_type.endswith("+zstd")
+
+
+def _put(saver, thread_id):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, empty_checkpoint(), {}, {})
+
+
+def test_bounded_memory_saver_evicts_least_recent_thread():
+    saver = BoundedMemorySaver(max_threads=2, serde=CompressedSerializer())
+    _put(saver, "t1")
+    _put(saver, "t2")
+    _put(saver, "t1")  # t1 重新变为最近使用
+    _put(saver, "t3")
+
+    assert set(saver.storage.keys()) == {"t1", "t3"}
+    assert saver.get_tuple({"configurable": {"thread_id": "t2"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is not None
+
+
+def test_production_saver_supports_async_graph_calls():
+    import asyncio
+    import operator
+    from typing import Annotated, TypedDict
+
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import StateGraph, START, END
+
+    from storage.database.checkpointer import postgres_saver_class
+
+    memory = InMemorySaver()
+
+    class _Saver(postgres_saver_class()):
+        # 测试环境没有 PostgreSQL：同步 SQL 层替换为内存实现，异步接口沿用生产类型
+        def __init__(self):
+            BaseCheckpointSaver.__init__(self, serde=CompressedSerializer())
+
+        def get_tuple(self, config):
+            return memory.get_tuple(config)
+
+        def list(self, config, **kwargs):
+            return memory.list(config, **kwargs)
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            return memory.put(config, checkpoint, metadata, new_versions)
+
+        def put_writes(self, config, writes, task_id, task_path=""):
+            return memory.put_writes(config, writes, task_id, task_path)
+
+        def delete_thread(self, thread_id):
+            return memory.delete_thread(thread_id)
+
+    class State(TypedDict):
+        turns: Annotated[list, operator.add]
+
+    builder = StateGraph(State)
+    builder.add_node("reply", lambda state: {"turns": [len(state["turns"])]})
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    saver = _Saver()
+    graph = builder.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    async def _run():
+        await graph.ainvoke({"turns": ["q1"]}, config)
+        result = await graph.ainvoke({"turns": ["q2"]}, config)
+        history = [item async for item in saver.alist(config)]
+        await saver.adelete_thread("t1")
+        return result, history, await saver.aget_tuple(config)
+
+    result, history, deleted = asyncio.run(_run())
+    assert result["turns"] == ["q1", 1, "q2", 3]  # 第二轮读取到第一轮保存的状态
+    assert len(history) >= 2
+    assert deleted is None
+
+
+def test_postgres_pool_uses_reserved_connections(monkeypatch):
+    import psycopg_pool
+
+    from storage.database import checkpointer
+
+    pools = []
+
+    class _Pool:
+        def __init__(self, **kwargs):
+            pools.append(kwargs)
+
+    class _Saver:
+        def __init__(self, pool, serde=None):
+            pass
+
+        def setup(self):
+            pass
+
+    monkeypatch.setenv("PGDATABASE_URL", "postgresql://u:p@db:5432/app")
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.setenv("CHECKPOINT_POOL_SIZE", "3")
+    monkeypatch.setattr(psycopg_pool, "ConnectionPool", _Pool)
+    monkeypatch.setattr(checkpointer, "postgres_saver_class", lambda: _Saver)
+    monkeypatch.setattr(checkpointer, "CHECKPOINT_PRUNE_INTERVAL", 0)
+
+    checkpointer._create_postgres_checkpointer()
+    assert (pools[0]["min_size"], pools[0]["max_size"]) == (2, 3)
@@ -0,0 +1,119 @@
+"""
+测试数据库连接池配置与指标（使用 SQLite 文件库代替 PostgreSQL）
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from storage.database import db
+
+
+@pytest.fixture
+def sqlite_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setenv("PGDATABASE_URL", url)
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db, "_SessionLocal", None)
+    yield url
+    if db._engine is not None:
+        db._engine.dispose()
+
+
+def _pool_total(*engines):
+    return sum(sum(db.get_pool_sizing(engine)) for engine in engines)
+
+
+@pytest.mark.parametrize("budget,workers", [(40, 4), (100, 1), (100, 3), (7, 2), (4, 1)])
+def test_pools_share_one_budget(monkeypatch, budget, workers):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", str(budget))
+    monkeypatch.setenv("WEB_CONCURRENCY", str(workers))
+    # 同步、异步引擎与 checkpointer 连接池共用每进程预算，而不是各占一份
+    assert _pool_total("sync", "async") + db.get_pool_budget()["checkpoint"] <= budget // workers
+    assert db.get_pool_sizing("sync") >= (1, 0) and db.get_pool_sizing("async") >= (1, 0)
+    assert db.get_pool_budget()["checkpoint"] >= 1
+
+
+def test_checkpoint_pool_size_is_reserved_from_budget(monkeypatch):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    monkeypatch.setenv("CHECKPOINT_POOL_SIZE", "10")
+    assert db.get_pool_budget() == {"per_worker": 40, "checkpoint": 10, "sync": 15, "async": 15}
+    # 预留过多时仍给两个引擎各留一个连接
+    monkeypatch.setenv("CHECKPOINT_POOL_SIZE", "100")
+    assert db.get_pool_budget()["checkpoint"] == 38
+
+
+def test_engines_use_their_own_share(sqlite_url, monkeypatch):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.delenv("CHECKPOINT_POOL_SIZE", raising=False)
+    assert db.get_pool_budget() == {"per_worker": 10, "checkpoint": 2, "sync": 4, "async": 4}
+    assert db.get_pool_sizing("sync") == (2, 2)
+    kwargs = db._pool_kwargs(sqlite_url, db._TimedQueuePool, "async")
+    assert kwargs["pool_size"] + kwargs["max_overflow"] == 4
+
+
+def test_async_url_uses_async_drivers():
+    assert db._to_async_url("postgresql://u:p@h:5432/d").startswith("postgresql+psycopg://u:p@h")
+    assert db._to_async_url("sqlite:///tmp/a.db").startswith("sqlite+aiosqlite://")
+
+
+def test_sync_engine_reports_pool_metrics(sqlite_url):
+    session = db.get_session()
+    try:
+        assert session.execute(db.text("SELECT 1")).scalar() == 1
+        metrics = db.get_pool_metrics()["sync"]
+        assert metrics["checkedout"] == 1
+        assert metrics["checkouts"] >= 1
+    finally:
+        session.close()
+    assert db.get_pool_metrics()["sync"]["checkedout"] == 0
+
+
+def test_async_engine_health_check(sqlite_url, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setattr(db, "_async_engine", None)
+    monkeypatch.setattr(db, "_AsyncSessionLocal", None)
+
+    async def _run():
+        try:
+            engine = await db.get_async_engine()
+            assert await db.check_db_health(engine)
+            async with await db.get_async_session() as session:
+                assert (await session.execute(db.text("SELECT 1"))).scalar() == 1
+            assert "async" in db.get_pool_metrics()
+        finally:
+            await db.dispose_async_engine()
+
+    asyncio.run(_run())
+
+
+def test_async_engine_lock_is_per_event_loop():
+    async def _lock_pair():
+        return db._get_async_engine_lock(), db._get_async_engine_lock()
+
+    first, same = asyncio.run(_lock_pair())
+    second, _ = asyncio.run(_lock_pair())
+    assert first is same
+    assert first is not second
+
+
+def test_sync_engine_does_not_sleep_on_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("PGDATABASE_URL", f"sqlite:///{tmp_path / 'missing' / 'test.db'}")
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db.time, "sleep", lambda _: pytest.fail("time.sleep on the event loop"))
+
+    async def _connect():
+        db.get_engine()
+
+    with pytest.raises(db.OperationalError):
+        asyncio.run(_connect())
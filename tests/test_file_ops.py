@@ -0,0 +1,171 @@
+"""
+测试 FileOps 远程文件下载：URL+ETag 下载缓存（304 复用本地副本、容量与过期清理）、预分配缓冲区读取、编码探测
+"""
+
+import os
+import sys
+import time
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+from utils.file import file as file_module
+from utils.file.file import File, FileOps, _DownloadCache
+
+URL = "https://example.com/files/notes.txt"
+
+
+class _Response:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise file_module.requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class _Session:
+    """按顺序返回预置响应，并记录每次请求的头"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = _DownloadCache(str(tmp_path / "cache"), max_entries=2)
+    monkeypatch.setattr(file_module, "_download_cache", cache)
+    return cache
+
+
+def _use_session(monkeypatch, responses):
+    session = _Session(responses)
+    monkeypatch.setattr(file_module, "get_http_session", lambda: session)
+    return session
+
+
+def test_etag_hit_serves_cached_copy_on_304(cache, monkeypatch):
+    body = "第一行\nsecond line\n".encode("utf-8")
+    session = _use_session(monkeypatch, [
+        _Response(200, body, {"ETag": '"v1"', "Content-Length": str(len(body))}),
+        _Response(304),
+    ])
+
+    assert FileOps.read_bytes(File(url=URL)) == body
+    assert FileOps.extract_text(File(url=URL)) == body.decode("utf-8")
+    assert session.requests == [{}, {"If-None-Match": '"v1"'}]
+
+
+def test_changed_etag_replaces_cached_copy(cache, monkeypatch):
+    _use_session(monkeypatch, [
+        _Response(200, b"old", {"ETag": '"v1"'}),
+        _Response(200, b"new", {"ETag": '"v2"'}),
+    ])
+    FileOps.read_bytes(File(url=URL))
+    assert FileOps.read_bytes(File(url=URL)) == b"new"
+    # 旧版本的缓存文件被删除
+    assert os.listdir(cache.cache_dir) == [os.path.basename(cache.lookup(URL)[1])]
+
+
+def test_response_without_etag_is_not_cached(cache, monkeypatch):
+    session = _use_session(monkeypatch, [_Response(200, b"a"), _Response(200, b"b")])
+    FileOps.read_bytes(File(url=URL))
+    assert FileOps.read_bytes(File(url=URL)) == b"b"
+    assert session.requests == [{}, {}]
+    assert cache.lookup(URL) is None
+
+
+def test_cache_evicts_least_recently_used_entries(cache):
+    for i in range(3):
+        cache.store(f"{URL}?{i}", f'"e{i}"', b"x")
+    assert cache.lookup(f"{URL}?0") is None
+    assert cache.lookup(f"{URL}?2") is not None
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_read_response_body_handles_length_mismatch_and_limit(monkeypatch):
+    body = b"0123456789" * 10
+    # 声明长度小于实际长度时退化为追加写
+    assert FileOps._read_response_body(_Response(200, body, {"Content-Length": "10"})) == body
+    # 声明长度大于实际长度时截断预分配的缓冲区
+    assert FileOps._read_response_body(_Response(200, body, {"Content-Length": "500"})) == body
+
+    monkeypatch.setattr(file_module, "MAX_FILE_SIZE", 50)
+    with pytest.raises(Exception):
+        FileOps._read_response_body(_Response(200, body))
+    with pytest.raises(Exception):
+        FileOps._read_response_body(_Response(200, body, {"Content-Length": "100"}))
+
+
+def test_read_bytes_returns_download_buffer_without_copy(cache, monkeypatch):
+    _use_session(monkeypatch, [_Response(200, b"abc", {"Content-Length": "3"})])
+    content = FileOps.read_bytes(File(url=URL))
+    assert isinstance(content, bytearray) and content == b"abc"
+
+
+def test_304_with_removed_cache_file_downloads_again(cache, monkeypatch):
+    session = _use_session(monkeypatch, [
+        _Response(200, b"v1", {"ETag": '"v1"'}),
+        _Response(304),
+        _Response(200, b"v1", {"ETag": '"v1"'}),
+    ])
+    FileOps.read_bytes(File(url=URL))
+    path = cache.lookup(URL)[1]
+    # lookup 之后、读取之前缓存文件被其他 worker 清理
+    monkeypatch.setattr(cache, "lookup", lambda url: ('"v1"', path))
+    os.remove(path)
+    assert FileOps.read_bytes(File(url=URL)) == b"v1"
+    assert session.requests == [{}, {"If-None-Match": '"v1"'}, {}]
+
+
+def test_cache_bounds_total_bytes_and_age(tmp_path, monkeypatch):
+    cache = _DownloadCache(str(tmp_path), max_entries=10, max_bytes=10, max_age=60)
+    cache.store(f"{URL}?big", '"e"', b"x" * 11)
+    assert cache.lookup(f"{URL}?big") is None
+    for i in range(3):
+        cache.store(f"{URL}?{i}", f'"e{i}"', b"x" * 4)
+    assert cache.lookup(f"{URL}?0") is None
+    assert len(os.listdir(tmp_path)) == 2
+
+    now = time.time()
+    monkeypatch.setattr(file_module.time, "time", lambda: now + 61)
+    assert cache.lookup(f"{URL}?2") is None
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_startup_removes_expired_cache_files(tmp_path):
+    stale, fresh = tmp_path / "stale", tmp_path / "fresh.tmp"
+    stale.write_bytes(b"old")
+    fresh.write_bytes(b"new")
+    old = time.time() - 120
+    os.utime(stale, (old, old))
+    _DownloadCache(str(tmp_path), max_age=60)
+    assert os.listdir(tmp_path) == ["fresh.tmp"]
+
+
+def test_low_confidence_prefix_falls_back_to_full_detection():
+    # 前 64KB 几乎都是 ASCII，只有一个中文字，前缀探测会误判为单字节编码
+    content = ("a" * 65530 + "中文" + "这是一段很长的中文内容，" * 300).encode("gbk")
+    assert FileOps._decode_text(content) == content.decode("gbk")
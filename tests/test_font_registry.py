@@ -0,0 +1,80 @@
+"""
+测试中文字体注册表：解析结果持久化、字体对象与字体文件在调用间复用
+"""
+
+import os
+import sys
+import json
+import threading
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import matplotlib
+import pytest
+
+from tools import font_registry
+
+FONT_PATH = os.path.join(os.path.dirname(matplotlib.__file__), "mpl-data", "fonts", "ttf", "DejaVuSans.ttf")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("FONT_CACHE_FILE", str(tmp_path / "fonts.json"))
+    monkeypatch.delenv("CHINESE_FONT_PATH", raising=False)
+    monkeypatch.setattr(font_registry, "CJK_FONT_CANDIDATES", [("DejaVu Sans", FONT_PATH)])
+    font_registry.reset_font_registry()
+    yield tmp_path / "fonts.json"
+    font_registry.reset_font_registry()
+
+
+def test_resolution_is_persisted_and_reused(registry, monkeypatch):
+    font = font_registry.resolve_cjk_font()
+    assert font == font_registry.FontInfo("DejaVu Sans", FONT_PATH)
+    assert json.loads(registry.read_text(encoding="utf-8"))["path"] == FONT_PATH
+
+    # 新进程（重置后）直接读缓存文件，不再探测路径或扫描字体列表
+    font_registry.reset_font_registry()
+    monkeypatch.setattr(font_registry, "CJK_FONT_CANDIDATES", [])
+    monkeypatch.setattr(font_registry, "_scan_font_manager", lambda: pytest.fail("should use cache"))
+    assert font_registry.resolve_cjk_font() == font
+
+
+def test_font_objects_are_shared(registry):
+    assert font_registry.font_properties() is font_registry.font_properties()
+    assert font_registry.font_properties().get_file() == FONT_PATH
+    assert font_registry.truetype(FONT_PATH, 24) is font_registry.truetype(FONT_PATH, 24)
+
+
+def test_wordcloud_calls_reuse_loaded_font_file(registry, monkeypatch, tmp_path):
+    import wordcloud.wordcloud as wordcloud_module
+    from PIL import ImageFont
+    from tools import wordcloud_tool
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wordcloud_tool, "_layout_cache", wordcloud_tool.OrderedDict())
+    monkeypatch.setattr(wordcloud_tool, "register_chart", lambda *args, **kwargs: None)
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda path, *a, **kw: opened.append(path) or real_open(path, *a, **kw))
+
+    def _call(words):
+        # 每次工具调用在不同线程中执行
+        results = []
+        worker = threading.Thread(target=lambda: results.append(
+            wordcloud_tool._generate_job_wordcloud_internal(None, words, "技能词云", width=200, height=120)))
+        worker.start()
+        worker.join()
+        return results[0]
+
+    assert "词云图已生成" in _call([{"word": "Python", "weight": 9}, {"word": "SQL", "weight": 6}])
+    assert "词云图已生成" in _call([{"word": "Java", "weight": 8}, {"word": "Docker", "weight": 3}])  # 布局不同，需要重新创建字体
+    info = font_registry.font_data.cache_info()
+    # 第二次调用命中进程内缓存，字体文件只读取一次
+    assert info.misses == 1 and info.hits >= 1
+    assert opened.count(FONT_PATH) == 1
+    # 不修改第三方模块
+    assert wordcloud_module.ImageFont is ImageFont
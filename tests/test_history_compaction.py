@@ -0,0 +1,54 @@
+"""
+测试会话历史压缩：超出 token 预算时压缩较早轮次的大块工具结果，保留文件引用
+"""
+
+import os
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+from agents.history import COMPACTED_MARKER, compact_history
+
+
+def _history():
+    table = "| 岗位 | 公司 | 薪资 |\n" + "| 数据分析师 | 某公司 | 15-25K |\n" * 300
+    return [
+        HumanMessage(content="读取本地招聘数据", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[{"name": "read_local_jobs", "args": {}, "id": "c1"}]),
+        ToolMessage(content=f"数据文件：assets/jobs_data/数据分析师.xlsx\n{table}", tool_call_id="c1", name="read_local_jobs", id="t1"),
+        AIMessage(content="已读取数据", id="a2"),
+        HumanMessage(content="再生成薪资图", id="h2"),
+        AIMessage(content="", id="a3", tool_calls=[{"name": "read_local_jobs", "args": {}, "id": "c2"}]),
+        ToolMessage(content=table, tool_call_id="c2", name="read_local_jobs", id="t2"),
+    ]
+
+
+def test_under_budget_is_untouched():
+    assert compact_history(_history(), token_budget=10 ** 6) == []
+
+
+def test_old_tool_results_are_compacted_with_references():
+    messages = _history()
+    replacements = compact_history(messages, token_budget=1000)
+
+    # 只压缩上一轮的工具结果，本轮（最后一条用户消息之后）保持完整
+    assert [m.id for m in replacements] == ["t1"]
+    compacted = replacements[0]
+    assert compacted.content.startswith(COMPACTED_MARKER)
+    assert "assets/jobs_data/数据分析师.xlsx" in compacted.content
+    assert compacted.tool_call_id == "c1"
+
+    # 按 id 覆盖原消息，顺序不变
+    merged = add_messages(messages, replacements)
+    assert [m.id for m in merged] == [m.id for m in messages]
+    assert merged[2].content == compacted.content
+
+    # 已压缩的内容不会重复压缩
+    assert compact_history(merged, token_budget=1000) == []
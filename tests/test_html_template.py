@@ -0,0 +1,115 @@
+"""
+测试 HTML 报告模板：Markdown 服务端渲染、离线导出
+"""
+
+import os
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from tools import report_assets
+from tools.html_report_tool import _generate_html_content, _render_html_report
+
+
+MARKDOWN = (
+    "## 分析\n\n```python\nprint(`${x}`)\n```\n"
+    "引号 \"双\" '单' 反斜杠 \\d+ 与 Windows 换行\r\n"
+    "</script><script>alert(1)</script>\n" * 3
+)
+
+
+def test_markdown_rendered_once_and_cached(monkeypatch):
+    calls = []
+    parser = report_assets._markdown_parser()
+    render = parser.render
+    monkeypatch.setattr(parser, "render", lambda text: calls.append(text) or render(text))
+    report_assets._markdown_cache.clear()
+
+    html = report_assets.render_markdown(MARKDOWN)
+    assert report_assets.render_markdown(MARKDOWN) == html
+    assert len(calls) == 1
+    # 代码块在服务端高亮，原始 HTML 按文本输出
+    assert '<code class="language-python">' in html and '<span class="nb">print</span>' in html
+    assert "</script>" not in html and "&lt;/script&gt;" in html
+
+
+def test_rendered_report_embeds_sections(tmp_path):
+    kwargs = dict(
+        profile_data={"name": "<张三>", "skills": ["Python", "SQL"]},
+        employment_analysis=MARKDOWN,
+        recommendations="- 建议一",
+        action_plan="1. 计划",
+        chat_history=None,
+        report_type="targeted",
+    )
+    html = _generate_html_content(output_filename="x.html", **kwargs)
+    # 用户画像字段经过 HTML 转义，脚本只出现模板自身的标签
+    assert "&lt;张三&gt;" in html
+    assert "求职方向分析报告" in html and "深度对话记录" not in html
+    # 页面不再在浏览器端解析 Markdown
+    assert "marked" not in html and "hljs" not in html
+    assert str(report_assets.render_markdown(MARKDOWN)) in html
+
+    # 流式写文件与一次性渲染结果一致
+    path = tmp_path / "report.html"
+    _render_html_report(str(path), **kwargs)
+    assert path.read_text(encoding="utf-8") == html
+
+
+def test_offline_report_has_no_external_references(tmp_path, monkeypatch):
+    from PIL import Image
+
+    monkeypatch.setenv("COZE_WORKSPACE_PATH", str(tmp_path))
+    charts_dir = tmp_path / "assets" / "charts"
+    charts_dir.mkdir(parents=True)
+    Image.new("RGB", (2400, 1200), "white").save(charts_dir / "薪资分布.png")
+
+    fa_dir = tmp_path / "assets" / "vendor" / "fontawesome"
+    (fa_dir / "css").mkdir(parents=True)
+    (fa_dir / "webfonts").mkdir()
+    (fa_dir / "webfonts" / "fa-solid-900.woff2").write_bytes(b"woff2")
+    (fa_dir / "css" / "all.min.css").write_text(
+        '.fa{display:inline-block}.fa-compass:before{content:"\\f14e"}.fa-ghost:before{content:"\\f6e2"}'
+        '@keyframes fa-spin{0%{transform:rotate(0)}to{transform:rotate(1turn)}}'
+        '@font-face{font-family:"Font Awesome 6 Free";font-weight:900;'
+        'src:url(../webfonts/fa-solid-900.woff2) format("woff2"),url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+        '@font-face{font-family:"Font Awesome 6 Brands";src:url(../webfonts/fa-brands-400.woff2) format("woff2")}',
+        encoding="utf-8",
+    )
+
+    html = _generate_html_content(
+        profile_data={"name": "李四"},
+        employment_analysis="## 市场\n\n![图](assets/charts/薪资分布.png)\n\n```python\nprint('hi')\n```",
+        recommendations="| 城市 | 薪资 |\n| --- | --- |\n| 上海 | 20K |",
+        action_plan="<script>alert(1)</script>",
+        chat_history=None,
+        report_type="confused",
+        output_filename="offline.html",
+        charts=["薪资分布.png", "不存在.png"],
+        offline=True,
+    )
+    assert "https://" not in html and "marked.parse" not in html
+    assert html.count("data:image/webp;base64,") == 2
+    assert "<table>" in html and "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert '<span class="nb">print</span>' in html
+    # 图标样式只保留用到的图标，字体内联
+    assert "fa-compass" in html and "fa-ghost" not in html and "Brands" not in html
+    assert "data:font/woff2;base64," in html and "@keyframes fa-spin{0%" in html
+
+
+def test_markdown_autolinks_bare_urls_and_escapes_raw_html():
+    report_assets._markdown_cache.clear()
+    html = report_assets.render_markdown(
+        "官网 https://example.com/jobs?a=1。也可访问 www.example.org, 或 [指南](https://a.cn) "
+        "<https://b.cn> `https://c.cn` <b>粗</b> javascript:alert(1)"
+    )
+    assert '<a href="https://example.com/jobs?a=1">https://example.com/jobs?a=1</a>。' in html
+    assert '<a href="http://www.example.org">www.example.org</a>,' in html
+    assert html.count("<a href=") == 4
+    assert "<code>https://c.cn</code>" in html
+    assert "&lt;b&gt;粗&lt;/b&gt;" in html and "<b>" not in html
+    assert 'href="javascript' not in html
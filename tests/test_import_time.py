@@ -0,0 +1,45 @@
+"""
+测试冷启动导入：注册工具时不加载绘图/数据分析等重依赖（-X importtime 统计）
+"""
+
+import os
+import sys
+import subprocess
+
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+
+# 只在首次使用时才应导入的模块
+HEAVY_MODULES = {"matplotlib", "pandas", "numpy", "wordcloud", "bs4", "pptx", "markdown_it"}
+
+
+def _import_profile(module: str):
+    """返回 [(累计耗时us, 模块名)]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=src_path,
+        env={**os.environ, "PYTHONPATH": src_path, "COZE_WORKSPACE_PATH": workspace_path},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile.append((int(cumulative), name.strip()))
+    return profile
+
+
+def test_agent_import_skips_heavy_dependencies():
+    profile = _import_profile("agents.agent")
+    loaded = {name.split(".")[0] for _, name in profile}
+    assert not HEAVY_MODULES & loaded
+
+    # 输出耗时最多的顶层依赖，便于定位新增的重导入（pytest -s 查看）
+    top_level = sorted((t, name) for t, name in profile if "." not in name)[-10:]
+    print("\nimport agents.agent 耗时 TOP10（累计，ms）")
+    for cumulative, name in reversed(top_level):
+        print(f"  {cumulative / 1000:8.1f}  {name}")
@@ -0,0 +1,133 @@
+"""
+测试招聘数据词频索引：增量更新、按关键词/城市/时间窗口查询
+"""
+
+import os
+import sys
+import time
+import datetime
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pandas as pd
+import pytest
+
+from tools import job_index
+from tools.job_index import JobIndex, parse_monthly_salary, parse_publish_date
+
+TODAY = datetime.date(2025, 3, 20)
+
+
+def _write(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False, encoding="utf-8-sig")
+    # 保证 mtime 变化可被察觉
+    stamp = time.time() + len(rows)
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def index(tmp_path):
+    data_dir = tmp_path / "jobs_data"
+    data_dir.mkdir()
+    return JobIndex(str(data_dir), str(tmp_path / "index" / "jobs.sqlite3"))
+
+
+def test_incremental_counts_and_filters(index, monkeypatch):
+    data_dir = index.data_dir
+    python_sz = os.path.join(data_dir, "Python_深圳_招聘数据.csv")
+    _write(python_sz, [
+        {"职位名称": "Python开发工程师（应届）", "公司名称": "腾讯", "工作地点": "深圳-南山区",
+         "发布时间": "2025-03-18", "职位描述": "熟悉 python、Django 和 MySQL，会用 Docker"},
+        {"职位名称": "数据分析师", "公司名称": "腾讯", "工作地点": "深圳", "发布时间": "2025-01-02",
+         "技能标签": "SQL、Python、Excel"},
+    ])
+    assert index.refresh() == 1
+    assert index.refresh() == 0  # 目录未变化时不重新读取
+
+    assert index.top_terms("company") == [("腾讯", 2)]
+    assert dict(index.top_terms("title"))["Python开发工程师"] == 1
+    skills = dict(index.top_terms("skill", limit=50))
+    assert skills["Python"] == 2  # 同一职位内重复出现只计一次
+    assert skills["Docker"] == 1 and skills["SQL"] == 1
+    assert dict(index.top_terms("skill", days=30, today=TODAY)) == {
+        "Python": 1, "Django": 1, "MySQL": 1, "Docker": 1}
+
+    # 新增文件只统计该文件
+    java_bj = os.path.join(data_dir, "Java_北京_招聘数据.csv")
+    _write(java_bj, [{"职位名称": "Java工程师", "公司名称": "字节跳动", "工作地点": "北京", "发布时间": "03-19"}])
+    monkeypatch.setattr(job_index, "read_rows", lambda path, _read=job_index.read_rows: (
+        _read(path) if path == java_bj else pytest.fail(f"unchanged file re-read: {path}")))
+    assert index.refresh() == 1
+    assert index.posting_count() == 3
+    assert index.posting_count(keyword="Java工程师") == 1
+    assert index.top_terms("company", city="北京") == [("字节跳动", 1)]
+
+    # 文件被覆盖后替换其计数，删除后计数一并删除
+    monkeypatch.undo()
+    _write(java_bj, [{"职位名称": "Java工程师", "公司名称": "美团", "工作地点": "北京"}] * 3)
+    index.refresh()
+    assert index.top_terms("company", city="北京") == [("美团", 3)]
+    os.remove(python_sz)
+    index.refresh()
+    assert index.posting_count() == 3
+    assert index.top_terms("company", city="深圳") == []
+
+
+def test_csv_and_excel_of_same_crawl_counted_once(index):
+    rows = [{"职位名称": "前端开发", "公司名称": "京东", "职位描述": "React / Vue"}]
+    _write(os.path.join(index.data_dir, "前端_上海_招聘数据.csv"), rows)
+    pd.DataFrame(rows).to_excel(os.path.join(index.data_dir, "前端_上海_招聘数据.xlsx"), index=False)
+    index.refresh()
+    assert index.posting_count() == 1
+    assert index.top_terms("company", city="上海") == [("京东", 1)]
+
+
+def test_parse_publish_date():
+    assert parse_publish_date("2024年1月5日", TODAY) == datetime.date(2024, 1, 5)
+    assert parse_publish_date("12-30", TODAY) == datetime.date(2024, 12, 30)  # 跨年
+    assert parse_publish_date("3天前", TODAY) == datetime.date(2025, 3, 17)
+    assert parse_publish_date("刚刚", TODAY) == TODAY
+    assert parse_publish_date(float("nan"), TODAY) is None
+
+
+def test_trend_buckets_count_and_median_salary(index):
+    _write(os.path.join(index.data_dir, "Python_深圳_招聘数据.csv"), [
+        {"职位名称": "Python开发", "工作地点": "深圳", "发布时间": "2025-02-03", "薪资": "1-1.5万/月"},
+        {"职位名称": "Python开发", "工作地点": "深圳", "发布时间": "2025-02-05", "薪资": "8-10千/月"},
+        {"职位名称": "Python开发", "工作地点": "深圳", "发布时间": "2025-03-18", "薪资": "面议"},
+        {"职位名称": "Python开发", "工作地点": "深圳", "薪资": "20k"},  # 没有发布时间，不计入趋势
+    ])
+    _write(os.path.join(index.data_dir, "Python_北京_招聘数据.csv"), [
+        {"职位名称": "Python开发", "工作地点": "北京", "发布时间": "2025-02-10", "薪资": "24万/年"},
+    ])
+    index.refresh()
+
+    months = index.trend(keyword="Python")
+    assert [(p.bucket, p.postings, p.salary_samples) for p in months] == [("2025-02", 3, 3), ("2025-03", 1, 0)]
+    assert months[0].median_salary == 12.5  # 9k、12.5k、20k 的中位数
+    assert months[1].median_salary is None
+
+    weeks = index.trend(keyword="Python", city="深圳", period="week")
+    assert [(p.bucket, p.postings) for p in weeks] == [("2025-02-03", 2), ("2025-03-17", 1)]
+    assert weeks[0].median_salary == (9 + 12.5) / 2
+
+    # 范围查询只返回范围内的时间桶
+    assert [p.bucket for p in index.trend(since=datetime.date(2025, 3, 1))] == ["2025-03"]
+    assert index.trend(keyword="Java") == []
+
+
+def test_parse_monthly_salary():
+    assert parse_monthly_salary("4.5-6千/月") == 5.25
+    assert parse_monthly_salary("15-25K·13薪") == 20
+    assert parse_monthly_salary("150元/天") == pytest.approx(3.2625)
+    assert parse_monthly_salary("8000-12000") == 10
+    # 区间两端各自带单位
+    assert parse_monthly_salary("1.5万-2万/月") == 17.5
+    assert parse_monthly_salary("8千-1万") == 9
+    assert parse_monthly_salary("1-1.5万/月") == 12.5
+    assert parse_monthly_salary("20万/年") == pytest.approx(16.667, abs=1e-3)
+    assert parse_monthly_salary("面议") is None
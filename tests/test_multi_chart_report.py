@@ -0,0 +1,135 @@
+"""
+测试综合分析报告：一次绘制全部面板、单独出图（含子进程并行绘制）、原子写入、示例数据不缓存
+"""
+
+import os
+import re
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+from tools import visualization_tool
+from tools.tool_cache import invalidate_tool_cache
+
+SALARY = {"ranges": ["0-10k", "10-20k", "20k+"], "counts": [5, 12, 3]}
+TREND = {"labels": ["1月", "2月", "3月"], "values": [10, 14, 20]}
+SKILLS = {"skills": ["Python", "SQL", "Excel"], "counts": [9, 7, 4]}
+
+
+def _stem(path):
+    """去掉文件名中的参数哈希：assets/charts/<前缀>_<哈希>.png -> <前缀>.png"""
+    return re.sub(r"_[0-9a-f]{8}\.png$", ".png", os.path.basename(path))
+
+
+@pytest.fixture
+def charts_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    invalidate_tool_cache("generate_multi_chart_report")
+    yield tmp_path / "assets" / "charts"
+    invalidate_tool_cache("generate_multi_chart_report")
+
+
+def test_grid_layout_renders_one_figure_once(charts_dir, monkeypatch):
+    saved = []
+    save = visualization_tool._save_figure
+
+    def _recording_save(fig, path, dpi):
+        saved.append(path)
+        save(fig, path, dpi)
+
+    monkeypatch.setattr(visualization_tool, "_save_figure", _recording_save)
+
+    result = visualization_tool.generate_multi_chart_report.invoke({
+        "job_title": "数据分析师", "salary_data": SALARY, "trend_data": TREND, "skill_data": SKILLS,
+    })
+    assert result.startswith("# 📊 数据分析师 综合分析报告")
+    assert "薪资分布图已生成" in result and "趋势图已生成" in result and "技能需求分布图已生成" in result
+    assert [_stem(path) for path in saved] == ["数据分析师_综合分析.png"]
+    assert os.path.dirname(saved[0]) == os.path.join("assets", "charts")
+    assert os.listdir(charts_dir) == [os.path.basename(saved[0])]
+
+
+def test_separate_layout_writes_each_chart(charts_dir, monkeypatch):
+    monkeypatch.setattr(visualization_tool, "_local_trend_series", lambda *args, **kwargs: None)
+
+    result = visualization_tool.generate_multi_chart_report.invoke({
+        "job_title": "前端开发", "salary_data": SALARY, "skill_data": SKILLS, "layout": "separate",
+    })
+    # 没有趋势数据时不再生成随机曲线
+    assert "未生成需求趋势图" in result
+    assert sorted(_stem(name) for name in os.listdir(charts_dir)) == ["前端开发_薪资分布.png", "技能需求分布_横向柱状图.png"]
+
+
+def test_parallel_separate_layout_renders_in_spawned_processes(charts_dir, monkeypatch):
+    registered = []
+
+    def _recording_register(path, **kwargs):
+        # 登记在父进程中进行，且所有子进程已完成写入
+        registered.append((path, os.path.isfile(path), kwargs["params"]["kind"]))
+
+    monkeypatch.setattr(visualization_tool, "register_chart", _recording_register)
+    monkeypatch.setattr(visualization_tool, "_process_pool", None)
+    try:
+        result = visualization_tool.generate_multi_chart_report.invoke({
+            "job_title": "测试工程师", "salary_data": SALARY, "trend_data": TREND, "skill_data": SKILLS,
+            "layout": "separate", "parallel": True,
+        })
+        pool = visualization_tool._process_pool
+        assert pool is not None and pool._mp_context.get_start_method() == "spawn"
+    finally:
+        if visualization_tool._process_pool is not None:
+            visualization_tool._process_pool.shutdown(wait=True)
+
+    assert result.startswith("# 📊 测试工程师 综合分析报告")
+    assert [(_stem(path), exists, kind) for path, exists, kind in registered] == [
+        ("测试工程师_薪资分布.png", True, "salary"),
+        ("测试工程师需求趋势.png", True, "trend"),
+        ("技能需求分布_横向柱状图.png", True, "skills"),
+    ]
+
+
+def test_save_figure_is_atomic(tmp_path):
+    class _BrokenFigure:
+        def savefig(self, path, **kwargs):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+
+    target = tmp_path / "chart.png"
+    target.write_bytes(b"old")
+    with pytest.raises(OSError):
+        visualization_tool._save_figure(_BrokenFigure(), str(target))
+    # 失败时保留旧文件，不留下临时文件
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["chart.png"]
+
+
+def test_sample_data_results_are_not_cached(charts_dir, monkeypatch):
+    from tools.tool_cache import get_tool_cache_metrics
+
+    monkeypatch.setattr(visualization_tool, "_local_skill_counts", lambda *args, **kwargs: None)
+    invalidate_tool_cache("generate_salary_distribution_chart")
+    try:
+        report = visualization_tool.generate_multi_chart_report.invoke(
+            {"job_title": "运营专员", "trend_data": TREND, "layout": "separate"})
+        salary = visualization_tool.generate_salary_distribution_chart.invoke({"job_title": "运营专员"})
+        # 示例数据每次重新生成，不进入缓存，也就不会分给其它会话
+        metrics = get_tool_cache_metrics()
+        assert metrics["generate_multi_chart_report"]["entries"] == 0
+        assert metrics["generate_salary_distribution_chart"]["entries"] == 0
+
+        # 基于真实数据的结果照常缓存
+        visualization_tool.generate_salary_distribution_chart.invoke(
+            {"job_title": "运营专员", "salary_ranges": SALARY["ranges"], "counts": SALARY["counts"]})
+        assert get_tool_cache_metrics()["generate_salary_distribution_chart"]["entries"] == 1
+    finally:
+        invalidate_tool_cache("generate_salary_distribution_chart")
+
+    assert "薪资分布、技能需求未提供数据，使用随机生成的示例数据" in report
+    assert "薪资分布未提供数据，使用随机生成的示例数据" in salary
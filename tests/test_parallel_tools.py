@@ -0,0 +1,179 @@
+"""
+测试并行工具调用：完成即推送、按工具超时、同轮限流（超时的工具结束前仍占用名额）、共享线程池
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from langchain.agents import create_agent
+from langchain.tools import tool
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agents import tool_execution
+from agents.tool_execution import ParallelToolCallMiddleware
+
+running = 0
+peak = 0
+_lock = threading.Lock()
+
+
+def _track(seconds):
+    global running, peak
+    with _lock:
+        running += 1
+        peak = max(peak, running)
+    time.sleep(seconds)
+    with _lock:
+        running -= 1
+
+
+@tool
+def slow_chart(title: str) -> str:
+    """生成耗时较长的图表"""
+    _track(0.6)
+    return f"{title} done"
+
+
+@tool
+def fast_chart(title: str) -> str:
+    """生成很快的图表"""
+    _track(0.05)
+    return f"{title} done"
+
+
+@tool
+def stuck_spider(keyword: str) -> str:
+    """一直不返回的爬虫"""
+    time.sleep(2)
+    return "never"
+
+
+class _ScriptedModel(BaseChatModel):
+    replies: list
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self.replies.pop(0))])
+
+
+def test_results_stream_as_they_finish_with_timeout():
+    calls = [
+        {"name": "slow_chart", "args": {"title": "薪资图"}, "id": "c1"},
+        {"name": "fast_chart", "args": {"title": "技能图"}, "id": "c2"},
+        {"name": "fast_chart", "args": {"title": "词云"}, "id": "c3"},
+        {"name": "stuck_spider", "args": {"keyword": "数据分析"}, "id": "c4"},
+    ]
+    model = _ScriptedModel(replies=[AIMessage(content="开始", tool_calls=calls), AIMessage(content="完成")])
+    agent = create_agent(
+        model=model,
+        tools=[slow_chart, fast_chart, stuck_spider],
+        middleware=[ParallelToolCallMiddleware(3, timeouts={"stuck_spider": 0.3})],
+    )
+
+    tool_messages = []
+    for message, _ in agent.stream({"messages": [{"role": "user", "content": "生成图表"}]}, stream_mode="messages"):
+        if isinstance(message, ToolMessage):
+            tool_messages.append(message)
+
+    # 每个结果只推送一次，慢工具最后到达
+    assert sorted(m.tool_call_id for m in tool_messages) == ["c1", "c2", "c3", "c4"]
+    assert tool_messages[-1].tool_call_id == "c1"
+    timed_out = next(m for m in tool_messages if m.tool_call_id == "c4")
+    assert timed_out.status == "error" and "超时" in timed_out.content
+    assert peak <= 3
+
+
+def _request(name, call_id, thread_id=None):
+    runtime = SimpleNamespace(config={"configurable": {"thread_id": thread_id}}) if thread_id else None
+    return SimpleNamespace(tool_call={"name": name, "id": call_id}, runtime=runtime)
+
+
+def test_timed_out_tool_keeps_its_slot_until_it_finishes():
+    middleware = ParallelToolCallMiddleware(1, timeouts={"stuck": 0.1})
+    finished = threading.Event()
+    started = []
+
+    def _stuck(request):
+        time.sleep(0.5)
+        finished.set()
+        return ToolMessage(content="late", tool_call_id="s1", name="stuck")
+
+    def _next(request):
+        started.append(finished.is_set())
+        return ToolMessage(content="ok", tool_call_id="n1", name="next")
+
+    result = middleware.wrap_tool_call(_request("stuck", "s1"), _stuck)
+    assert result.status == "error" and "超时" in result.content
+    # 同一轮的下一个调用要等超时的工具真正结束后才能执行
+    assert middleware.wrap_tool_call(_request("next", "n1"), _next).content == "ok"
+    assert started == [True]
+    assert middleware._limiter._slots == {}
+
+
+def test_async_timed_out_tool_keeps_its_slot_until_it_finishes():
+    middleware = ParallelToolCallMiddleware(1, timeouts={"stuck": 0.1})
+    order = []
+
+    async def _stuck(request):
+        await asyncio.sleep(0.4)
+        order.append("stuck")
+        return ToolMessage(content="late", tool_call_id="s1", name="stuck")
+
+    async def _next(request):
+        order.append("next")
+        return ToolMessage(content="ok", tool_call_id="n1", name="next")
+
+    async def _run():
+        result = await middleware.awrap_tool_call(_request("stuck", "s1"), _stuck)
+        assert result.status == "error"
+        assert (await middleware.awrap_tool_call(_request("next", "n1"), _next)).content == "ok"
+
+    asyncio.run(_run())
+    assert order == ["stuck", "next"]
+    assert middleware._async_limiter._slots == {}
+
+
+def test_stuck_tools_count_against_the_shared_executor(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(tool_execution, "_tool_executor", executor)
+    middleware = ParallelToolCallMiddleware(4, timeouts={"stuck": 0.1})
+    finished = threading.Event()
+    threads = []
+
+    def _stuck(request):
+        threads.append(threading.current_thread())
+        time.sleep(0.4)
+        finished.set()
+        return ToolMessage(content="late", tool_call_id="s1", name="stuck")
+
+    def _next(request):
+        threads.append(threading.current_thread())
+        return ToolMessage(content=str(finished.is_set()), tool_call_id="n1", name="next")
+
+    try:
+        assert middleware.wrap_tool_call(_request("stuck", "s1", "A"), _stuck).status == "error"
+        # 另一个会话的调用不受本轮名额限制，但仍要等共享线程池中超时的工具结束
+        assert middleware.wrap_tool_call(_request("next", "n1", "B"), _next).content == "True"
+    finally:
+        executor.shutdown(wait=True)
+    # 线程在调用之间复用
+    assert threads[0] is threads[1]
@@ -0,0 +1,335 @@
+"""
+测试 S3 存储：共享 token 提供者（single-flight 刷新、鉴权失败后失效）、并发分片上传与中止、批量操作、按范围读取
+"""
+
+import os
+import sys
+import time
+import json
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+from botocore.exceptions import ClientError
+from botocore.awsrequest import AWSResponse
+
+from storage.s3.s3_storage import S3SyncStorage, StorageTokenProvider
+
+
+class _CountingProvider(StorageTokenProvider):
+    """_fetch_token 不访问外部服务，按调用次数生成 token"""
+
+    def __init__(self, tokens=None, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.tokens = tokens
+        self.delay = delay
+        self.fetches = 0
+        self._fetch_lock = threading.Lock()
+
+    def _fetch_token(self):
+        time.sleep(self.delay)
+        with self._fetch_lock:
+            self.fetches += 1
+            return self.tokens[self.fetches - 1] if self.tokens else f"token-{self.fetches}"
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def _storage(provider=None):
+    return S3SyncStorage(endpoint_url="http://s3.test", access_key="ak", secret_key="sk",
+                         bucket_name="bucket", token_provider=provider or _CountingProvider())
+
+
+def test_concurrent_callers_share_one_refresh():
+    provider = _CountingProvider(delay=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        tokens = list(pool.map(lambda _: provider.get_token(), range(16)))
+    assert provider.fetches == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_token_refreshed_before_jwt_expiry():
+    now = time.time()
+    provider = _CountingProvider(tokens=[_jwt(now + 30), _jwt(now + 3600)], refresh_skew=60)
+    first = provider.get_token()
+    # 距离过期不足 refresh_skew，提前刷新
+    assert provider.get_token() != first
+    provider.get_token()
+    assert provider.fetches == 2
+
+
+class _Raw:
+    def __init__(self, body=b""):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def _send_responses(client, statuses, seen_headers):
+    """在 before-send 阶段返回预置的 HTTP 响应，请求不出进程；其余事件钩子照常执行"""
+    statuses = list(statuses)
+
+    def _send(request, **kwargs):
+        seen_headers.append(request.headers.get("x-storage-token"))
+        status = statuses.pop(0)
+        headers = {"Content-Length": "3"} if status == 200 else {}
+        return AWSResponse(request.url, status, headers, _Raw())
+
+    client.meta.events.register("before-send.s3", _send)
+
+
+def test_auth_error_invalidates_cached_token():
+    provider = _CountingProvider()
+    storage = _storage(provider)
+    seen = []
+    _send_responses(storage._get_client(), [403, 200], seen)
+
+    assert storage.file_exists(file_key="a.txt") is False
+    assert provider._token is None
+    assert storage.get_file_size(file_key="a.txt") == 3
+    # 第二次请求使用重新获取的 token
+    assert seen == [b"token-1", b"token-2"]
+
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    def read(self):
+        return self.data
+
+    def iter_chunks(self, chunk_size):
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeClient:
+    """内存中的 S3 客户端桩：记录调用顺序，可对指定分片/对象注入失败"""
+
+    def __init__(self, part_delay=0.0, fail_part=None, fail_names=()):
+        self.objects = {}
+        self.events = []
+        self.part_delay = part_delay
+        self.fail_part = fail_part
+        self.fail_names = set(fail_names)
+        self.parts = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _log(self, *event):
+        with self._lock:
+            self.events.append(event)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self._log("part-start", PartNumber)
+            if PartNumber == self.fail_part:
+                raise RuntimeError(f"part {PartNumber} failed")
+            time.sleep(self.part_delay)
+            self.parts[PartNumber] = bytes(Body)
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            self._log("part-end", PartNumber)
+            with self._lock:
+                self.active -= 1
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        assert numbers == sorted(numbers)
+        self.objects[Key] = b"".join(self.parts[n] for n in numbers)
+        self._log("complete")
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._log("abort")
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        if any(Key.startswith(name.rsplit(".", 1)[0] + "_") for name in self.fail_names):
+            raise RuntimeError(f"put {Key} failed")
+        self.objects[Key] = bytes(Body)
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[Key]
+        if Range is not None:
+            start, _, end = Range[len("bytes="):].partition("-")
+            data = data[int(start):int(end) + 1 if end else None]
+        self._log("get", Range)
+        return {"Body": _Body(data)}
+
+    def delete_objects(self, Bucket, Delete):
+        deleted = []
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+            deleted.append({"Key": obj["Key"]})
+        return {"Deleted": deleted}
+
+
+def _fake_storage(client):
+    storage = _storage()
+    storage._client = client
+    return storage
+
+
+def _chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_multipart_upload_assembles_parts_concurrently():
+    client = _FakeClient(part_delay=0.05)
+    storage = _fake_storage(client)
+    data = os.urandom(10 * 1000 + 123)
+    progress = []
+
+    key = storage.trunk_upload_file(chunk_iter=_chunks(data, 777), file_name="big.bin", part_size=1000,
+                                    max_concurrency=3, progress_callback=lambda n, _: progress.append(n))
+
+    assert client.objects[key] == data
+    assert sorted(client.parts) == list(range(1, 12))
+    assert 1 < client.max_active <= 3
+    assert progress[-1] == len(data)
+
+
+def test_multipart_upload_empty_input_uploads_one_part():
+    client = _FakeClient()
+    key = _fake_storage(client).trunk_upload_file(chunk_iter=[], file_name="empty.bin", part_size=1000)
+    assert client.objects[key] == b""
+
+
+def test_multipart_upload_aborts_after_running_parts_finish():
+    client = _FakeClient(part_delay=0.2, fail_part=3)
+    storage = _fake_storage(client)
+    with pytest.raises(RuntimeError, match="part 3 failed"):
+        storage.trunk_upload_file(chunk_iter=_chunks(b"x" * 8000, 1000), file_name="big.bin",
+                                  part_size=1000, max_concurrency=3)
+
+    assert client.events[-1] == ("abort",)
+    assert ("complete",) not in client.events
+    # 中止时没有仍在上传的分片，中止后也不再发起新的分片
+    started = [e[1] for e in client.events if e[0] == "part-start"]
+    ended = [e[1] for e in client.events if e[0] == "part-end"]
+    assert sorted(started) == sorted(ended)
+
+
+def _items(*names):
+    return [{"file_content": name.encode(), "file_name": name} for name in names]
+
+
+def test_upload_many_returns_keys_in_order():
+    client = _FakeClient()
+    keys = _fake_storage(client).upload_many(items=_items("a.txt", "b.txt", "c.txt"), max_concurrency=2)
+    assert [client.objects[k] for k in keys] == [b"a.txt", b"b.txt", b"c.txt"]
+
+
+def test_upload_many_rolls_back_on_partial_failure():
+    client = _FakeClient(fail_names=["b.txt"])
+    with pytest.raises(RuntimeError, match="failed"):
+        _fake_storage(client).upload_many(items=_items("a.txt", "b.txt", "c.txt"))
+    assert client.objects == {}
+
+
+def test_upload_many_validates_names_before_uploading():
+    client = _FakeClient()
+    with pytest.raises(ValueError):
+        _fake_storage(client).upload_many(items=_items("a.txt", "bad name.txt"))
+    assert client.objects == {}
+
+
+def test_async_upload_many_rolls_back_on_partial_failure():
+    import asyncio
+    from storage.s3.s3_storage import AsyncS3Storage
+
+    client = _FakeClient(fail_names=["c.txt"])
+    storage = AsyncS3Storage(_fake_storage(client), max_concurrency=2)
+    with pytest.raises(RuntimeError, match="failed"):
+        asyncio.run(storage.upload_many(items=_items("a.txt", "b.txt", "c.txt")))
+    assert client.objects == {}
+
+
+def test_delete_many_batches_requests(monkeypatch):
+    from storage.s3 import s3_storage
+
+    monkeypatch.setattr(s3_storage, "DELETE_OBJECTS_MAX_KEYS", 2)
+    client = _FakeClient()
+    client.objects = {f"k{i}": b"" for i in range(5)}
+    calls = []
+    delete_objects = client.delete_objects
+    client.delete_objects = lambda **kw: calls.append(len(kw["Delete"]["Objects"])) or delete_objects(**kw)
+
+    result = _fake_storage(client).delete_many(file_keys=[f"k{i}" for i in range(5)] + ["k0"])
+    assert calls == [2, 2, 1]
+    assert result == {"deleted": [f"k{i}" for i in range(5)], "errors": []}
+    assert client.objects == {}
+
+
+def test_exists_many():
+    client = _FakeClient()
+    client.objects = {"a": b"", "c": b""}
+    assert _fake_storage(client).exists_many(file_keys=["a", "b", "c", "a"]) == {"a": True, "b": False, "c": True}
+
+
+def _ranges(client):
+    return [e[1] for e in client.events if e[0] == "get"]
+
+
+def test_read_range_and_iter_file():
+    client = _FakeClient()
+    client.objects = {"data.bin": bytes(range(100))}
+    storage = _fake_storage(client)
+
+    assert storage.read_range(file_key="data.bin", start=10, end=19) == bytes(range(10, 20))
+    assert storage.read_range(file_key="data.bin", start=95) == bytes(range(95, 100))
+    with pytest.raises(ValueError):
+        storage.read_range(file_key="data.bin", start=5, end=4)
+
+    chunks = list(storage.iter_file(file_key="data.bin", chunk_size=30))
+    assert [len(c) for c in chunks] == [30, 30, 30, 10] and b"".join(chunks) == bytes(range(100))
+    assert b"".join(storage.iter_file(file_key="data.bin", start=90, chunk_size=4)) == bytes(range(90, 100))
+    # 整个对象读取时不带 Range 头
+    assert _ranges(client) == ["bytes=10-19", "bytes=95-", None, "bytes=90-"]
+
+
+def test_object_reader_seek_issues_range_requests():
+    client = _FakeClient()
+    client.objects = {"data.bin": bytes(range(100))}
+    storage = _fake_storage(client)
+
+    with storage.open_file(file_key="data.bin", buffer_size=16) as f:
+        assert f.seekable()
+        assert f.seek(-8, os.SEEK_END) == 92
+        assert f.read(8) == bytes(range(92, 100))
+        assert f.read() == b""
+        f.seek(20)
+        assert f.read(4) == bytes(range(20, 24))
+        assert f.tell() == 24
+        f.seek(6, os.SEEK_CUR)
+        assert f.read(2) == bytes([30, 31])
+        with pytest.raises(ValueError):
+            f.seek(-1)
+    # 只请求被读取的范围，单次请求不超过缓冲区大小，也不越过对象末尾；缓冲区内的 seek 不再发起请求
+    assert _ranges(client) == ["bytes=92-99", "bytes=20-35"]
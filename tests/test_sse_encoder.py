@@ -0,0 +1,102 @@
+"""
+测试 SSE 编码器：增量编码结果与通用 json.dumps 逐字节一致
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from utils.helper.agent_helper import agent_iter_server_messages
+from utils.messages.server import ServerMessage, ServerMessageContent, MESSAGE_TYPE_THINKING
+from utils.messages.sse import (
+    CoalesceOptions,
+    SSEEncoder,
+    coalesce_answers,
+    encode_sse_event,
+    resolve_coalesce_options,
+)
+
+
+def _legacy(sm: ServerMessage) -> str:
+    return f"event: message\ndata: {json.dumps(sm.dict(), ensure_ascii=False, default=str)}\n\n"
+
+
+def _items():
+    meta = {"langgraph_node": "model", "langgraph_checkpoint_ns": "model:1"}
+    for token in ["数据分析师", "的平均薪资", ' 为 "15K"\n', "\\ 😀"]:
+        yield AIMessageChunk(content=token, id="run-1"), meta
+    yield AIMessageChunk(content="", id="run-1", tool_call_chunks=[
+        {"index": 0, "id": "call_1", "name": "generate_trend_chart", "args": '{"title": "趋势"}'}
+    ]), {**meta, "chunk_position": "last"}
+    yield ToolMessage(content="图表已生成", tool_call_id="call_1"), {"langgraph_node": "tools"}
+    yield AIMessageChunk(content="完成", id="run-2"), {**meta, "chunk_position": "last"}
+
+
+def test_encoder_matches_json_dumps_for_whole_reply():
+    messages = list(agent_iter_server_messages(
+        _items(), session_id="s1", query_msg_id="q1", local_msg_id="q1", run_id="r1", log_id="log-1",
+    ))
+    assert {m.type for m in messages} >= {"message_start", "answer", "tool_request", "tool_response", "message_end"}
+
+    encoder = SSEEncoder()
+    for sm in messages:
+        assert encoder.encode(sm) == _legacy(sm)
+
+    # 同一段回答的 msg_id 保持稳定
+    answer_ids = {m.msg_id for m in messages if m.type == "answer" and m.content.answer != "完成"}
+    assert len(answer_ids) == 1 and "" not in answer_ids
+
+
+def test_encoder_thinking_and_fallbacks():
+    encoder = SSEEncoder()
+    thinking = ServerMessage(type=MESSAGE_TYPE_THINKING, session_id="s", reply_id="r", msg_id="m", sequence_id=3,
+                             content=ServerMessageContent(thinking="思考中"))
+    assert encoder.encode(thinking) == _legacy(thinking)
+
+    # 非字符串内容走通用路径
+    blocks = ServerMessage(type="answer", content=ServerMessageContent(answer=[{"type": "text", "text": "hi"}]))
+    assert encoder.encode(blocks) == _legacy(blocks)
+
+    plain = {"type": "message_end", "run_id": "r", "message": "超时"}
+    assert encoder.encode(plain) == encode_sse_event(plain)
+
+
+def test_coalesce_answers_batches_tokens_and_flushes_on_other_messages():
+    def _answer(text, seq, finish=False, msg_id="a1"):
+        return ServerMessage(type="answer", reply_id="r", msg_id=msg_id, sequence_id=seq, finish=finish,
+                             content=ServerMessageContent(answer=text))
+
+    async def _source():
+        yield ServerMessage(type="message_start", reply_id="r", msg_id="s", sequence_id=1)
+        for i in range(5):
+            yield _answer(f"词{i}", i + 2)
+        await asyncio.sleep(0.08)  # 超过合帧间隔，已缓冲内容先发送
+        yield _answer("尾", 7)
+        yield ServerMessage(type="tool_request", reply_id="r", msg_id="t", sequence_id=8)
+        yield _answer("完成", 9, finish=True, msg_id="a2")
+        yield {"type": "message_end", "sequence_id": 10}
+
+    async def _collect():
+        return [m async for m in coalesce_answers(_source(), CoalesceOptions(interval_ms=20, max_bytes=1024))]
+
+    frames = asyncio.run(_collect())
+    kinds = [(f["type"] if isinstance(f, dict) else f.type) for f in frames]
+    assert kinds == ["message_start", "answer", "answer", "tool_request", "answer", "message_end"]
+    assert frames[1].content.answer == "词0词1词2词3词4"
+    assert frames[2].content.answer == "尾"
+    assert frames[4].finish is True
+    # 合帧后 sequence_id 仍然连续
+    assert [(f["sequence_id"] if isinstance(f, dict) else f.sequence_id) for f in frames] == [1, 2, 3, 4, 5, 6]
+
+    assert resolve_coalesce_options({}) is None
+    assert resolve_coalesce_options({"coalesce_ms": "25"}).interval_ms == 25
+
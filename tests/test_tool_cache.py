@@ -0,0 +1,76 @@
+"""
+测试工具结果缓存：参数规范化、监视目录失效、输出文件校验与统计
+"""
+
+import os
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from langchain.tools import tool
+
+from tools.tool_cache import get_tool_cache_metrics, invalidate_tool_cache, memoize_tool
+
+
+def test_cache_hits_with_normalized_args_and_invalidates_on_new_files(tmp_path):
+    calls = []
+
+    @tool
+    @memoize_tool(ttl=60, watch=[str(tmp_path)])
+    def cached_list_files(keyword: str, limit: int = 10) -> str:
+        """列出文件"""
+        calls.append(keyword)
+        return f"{keyword}: {sorted(os.listdir(tmp_path))[:limit]}"
+
+    assert cached_list_files.invoke({"keyword": "数据分析"}) == "数据分析: []"
+    # 多余空白与显式传入默认值命中同一缓存
+    cached_list_files.invoke({"keyword": "  数据分析 ", "limit": 10})
+    assert len(calls) == 1
+
+    # 目录中新增文件后缓存失效
+    (tmp_path / "数据分析_招聘数据.xlsx").write_bytes(b"x")
+    assert "数据分析_招聘数据.xlsx" in cached_list_files.invoke({"keyword": "数据分析"})
+    assert len(calls) == 2
+
+    invalidate_tool_cache("cached_list_files")
+    cached_list_files.invoke({"keyword": "数据分析"})
+    assert len(calls) == 3
+
+    metrics = get_tool_cache_metrics()["cached_list_files"]
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 3
+
+
+def test_tracked_outputs_and_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("assets/charts")
+    calls = []
+
+    @memoize_tool(ttl=60, track_outputs=True)
+    def cached_chart(title: str) -> str:
+        calls.append(title)
+        if not title:
+            return "❌ 生成失败"
+        path = f"assets/charts/{title}.png"
+        with open(path, "wb") as f:
+            f.write(b"png")
+        return f"**保存路径**：{path}"
+
+    cached_chart("薪资分布")
+    cached_chart("薪资分布")
+    assert len(calls) == 1
+
+    # 输出文件被删除后重新生成
+    os.remove("assets/charts/薪资分布.png")
+    cached_chart("薪资分布")
+    assert len(calls) == 2
+    assert os.path.exists("assets/charts/薪资分布.png")
+
+    # 错误结果不缓存
+    cached_chart("")
+    cached_chart("")
+    assert len(calls) == 4
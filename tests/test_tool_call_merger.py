@@ -0,0 +1,46 @@
+"""
+测试流式工具调用分片合并：线性时间拼接、参数完整后才解析
+"""
+
+import os
+import sys
+import json
+from types import SimpleNamespace
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from utils.helper.agent_helper import ToolCallChunkMerger, _merge_tool_call_chunks
+
+
+def test_tool_call_chunks_merge_incrementally():
+    args = json.dumps({"title": "报告", "sections": [{"heading": '含"引号"与\\反斜杠{', "markdown": "内容 " * 50}] * 200},
+                      ensure_ascii=False)
+    chunks = [{"index": 0, "id": "call_1", "name": "generate_html_report", "args": args[:5]}]
+    chunks += [{"index": 0, "id": None, "name": None, "args": args[i:i + 7]} for i in range(5, len(args), 7)]
+    chunks.append({"index": 1, "id": "call_2", "name": "list_generated_charts", "args": "{}"})
+
+    merged = _merge_tool_call_chunks(chunks)
+    assert [tc["id"] for tc in merged] == ["call_1", "call_2"]
+    assert merged[0]["args"] == args
+    assert merged[0]["parameters"] == json.loads(args)
+    assert merged[1]["parameters"] == {}
+
+    # 参数未传输完整时不解析
+    assert _merge_tool_call_chunks(chunks[:10])[0]["parameters"] == {}
+
+
+def test_merger_accepts_objects_and_resets_after_flush():
+    merger = ToolCallChunkMerger()
+    assert not merger
+    merger.add(SimpleNamespace(index=0, id="call_1", name="search_51job", args='{"keyword": '))
+    merger.add({"index": 0, "id": None, "name": None, "args": '"数据分析"}'})
+    merger.add({"index": None, "args": "ignored"})
+    assert merger
+
+    [call] = merger.flush()
+    assert call["name"] == "search_51job" and call["parameters"] == {"keyword": "数据分析"}
+    assert not merger and merger.flush() == []
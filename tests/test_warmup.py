@@ -0,0 +1,82 @@
+"""
+测试启动预热与就绪检查、agent 复用与按请求注入的模型请求头
+"""
+
+import os
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from utils.helper.warmup_helper import WarmupState, mark_ready, run_warmup
+
+
+def test_warmup_records_steps_and_becomes_ready():
+    state = WarmupState()
+    assert not state.ready and state.snapshot()["status"] == "pending"
+
+    run_warmup(["fonts", "charts", "report"], extra_steps={"noop": lambda: time.sleep(0.01)}, state=state)
+    snapshot = state.snapshot()
+    assert state.ready
+    assert list(snapshot["steps"]) == ["fonts", "charts", "report", "noop"]
+    assert all(step["status"] == "ready" for step in snapshot["steps"].values())
+    assert snapshot["steps"]["noop"]["seconds"] >= 0.01
+
+
+def test_failed_step_keeps_instance_unready():
+    def _broken():
+        raise RuntimeError("db unreachable")
+
+    state = run_warmup(["report", "unknown"], extra_steps={"db": _broken}, state=WarmupState())
+    steps = state.snapshot()["steps"]
+    assert not state.ready and state.status == "failed"
+    assert steps["unknown"]["status"] == "skipped"
+    assert steps["db"] == {"status": "failed", "seconds": steps["db"]["seconds"], "error": "db unreachable"}
+
+    assert mark_ready(WarmupState()).ready
+
+
+def test_agent_built_once_and_reused(monkeypatch):
+    from utils.helper import graph_helper
+
+    built = []
+    module = types.ModuleType("fake_agent_module")
+    module.build_agent = lambda ctx: built.append(ctx) or object()
+    monkeypatch.setitem(sys.modules, "fake_agent_module", module)
+    monkeypatch.setattr(graph_helper, "_agent_instances", {})
+
+    first = graph_helper.get_agent_instance("fake_agent_module", None)
+    assert graph_helper.get_agent_instance("fake_agent_module", SimpleNamespace(logid="req-2")) is first
+    # 构建时不绑定请求上下文
+    assert built == [None]
+
+
+def test_request_headers_follow_runtime_context():
+    from coze_coding_utils.runtime_ctx.context import new_context
+    from langchain.agents.middleware.types import ModelRequest
+    from agents.request_headers import RequestHeadersMiddleware
+
+    middleware = RequestHeadersMiddleware()
+    seen = []
+
+    def _request(context, settings=None):
+        return ModelRequest(model=None, system_prompt=None, messages=[], tool_choice=None, tools=[],
+                            response_format=None, state={}, runtime=SimpleNamespace(context=context),
+                            model_settings=settings or {})
+
+    for logid in ("log-1", "log-2"):
+        ctx = new_context(method="stream", headers={"X-Tt-Logid": logid})
+        middleware.wrap_model_call(_request(ctx, {"extra_headers": {"x-a": "1"}}), lambda r: seen.append(r.model_settings))
+    middleware.wrap_model_call(_request(None), lambda r: seen.append(r.model_settings))
+
+    assert seen == [
+        {"extra_headers": {"x-a": "1", "x-tt-logid": "log-1"}},
+        {"extra_headers": {"x-a": "1", "x-tt-logid": "log-2"}},
+        {},
+    ]
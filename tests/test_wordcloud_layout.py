@@ -0,0 +1,72 @@
+"""
+测试词云快速渲染：布局缓存复用、换色不重新布局、PIL 直接绘制标题
+"""
+
+import os
+import sys
+
+# 添加src目录到路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+src_path = os.path.join(workspace_path, "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+from PIL import Image
+
+from tools import wordcloud_tool
+
+KEYWORDS = [{"word": w, "weight": 100 - i * 5} for i, w in enumerate(
+    ["Python", "数据分析", "SQL", "机器学习", "Java", "沟通能力", "Excel", "Spark", "算法", "可视化"])]
+
+
+@pytest.fixture
+def charts_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    wordcloud_tool._layout_cache.clear()
+    yield tmp_path / "assets" / "charts"
+    wordcloud_tool._layout_cache.clear()
+
+
+def test_layout_is_reused_when_only_colors_or_title_change(charts_cwd, monkeypatch):
+    import wordcloud
+
+    calls = []
+    init = wordcloud.WordCloud.__init__
+
+    def _counting(self, *args, **kwargs):
+        calls.append(1)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(wordcloud.WordCloud, "__init__", _counting)
+
+    internal = wordcloud_tool._generate_job_wordcloud_internal
+    assert "词云图已生成" in internal(None, KEYWORDS, "技能词云", width=400, height=300)
+    assert "词云图已生成" in internal(None, KEYWORDS, "技能词云 换色", width=400, height=300, colormap="plasma")
+    assert len(calls) == 1
+
+    # 缓存中的布局不被换色修改
+    cached = next(iter(wordcloud_tool._layout_cache.values()))
+    assert cached.colormap == "viridis"
+
+    # 质量或尺寸变化时重新布局
+    internal(None, KEYWORDS, "预览", width=400, height=300, quality="preview")
+    assert len(calls) == 2
+
+
+def test_output_size_and_title_band(charts_cwd):
+    internal = wordcloud_tool._generate_job_wordcloud_internal
+    internal(None, KEYWORDS, "标准", width=400, height=300)
+    internal(None, KEYWORDS, "预览", width=400, height=300, quality="preview")
+
+    # 文件名为 <标题>_<参数哈希>.png
+    standard = Image.open(next(charts_cwd.glob("标准_*.png")))
+    preview = Image.open(next(charts_cwd.glob("预览_*.png")))
+    header = round(600 * 0.09)
+    assert standard.size == (800, 600 + header)
+    assert preview.width == 400
+
+    # 标题栏为白底，中间有深色文字
+    band = standard.convert("L").crop((0, 0, standard.width, header))
+    assert band.getextrema()[0] < 100
+    assert band.getpixel((2, 2)) == 255